@@ -5,6 +5,7 @@ from abc import abstractmethod
 
 from core.ScriptBase import ScriptBase
 from jobs.JobRunner import JobRunner
+from jobs.batching import shard_jobs
 from core.config import Config
 
 
@@ -36,7 +37,9 @@ class BatchScriptBase(ScriptBase):
         return base_config
 
     def start(self):
-        self.job_runner = JobRunner()
+        self.job_runner = JobRunner(max_concurrent=self.config.max_concurrent_jobs, executor=self.config.job_executor,
+                                    daemon_socket=self.config.daemon_socket, on_failure=self.config.on_failure,
+                                    max_retries=self.config.max_retries)
         self.print_setup_info()
         try:
             self.run()
@@ -45,8 +48,24 @@ class BatchScriptBase(ScriptBase):
             sys.exit(1)
         finally:
             self.job_runner.stop()
+        failed_jobs = self.job_runner.failed_jobs
+        if failed_jobs:
+            self.logger.error('{} of its jobs did not succeed: {}'.format(
+                len(failed_jobs), ', '.join('{} ({})'.format(job.job_id(), status.value)
+                                            for job, status in failed_jobs.items())))
+            sys.exit(1)
         self.logger.info('{} completed without errors.'.format(self.name))
 
     @abstractmethod
-    def run(self):
+    def get_jobs(self, source_dir: pathlib.Path, project_dir: pathlib.Path, platform) -> list:
+        """
+        Get the munge jobs making up this batch, with any ordering constraints between them declared as dependencies.
+        This does not require the script to have been initialized, so that openmunge.py can plan every batch up front.
+        """
         raise NotImplementedError
+
+    def run(self):
+        jobs = self.get_jobs(self.config.source_dir, self.config.project_dir, self.config.platform)
+        self.job_runner.add_jobs(shard_jobs(jobs, self.config.files_per_shard, self.job_runner.max_concurrent))
+        self.job_runner.start()
+        self.job_runner.wait()
@@ -6,12 +6,12 @@ class CommonBatchScript(BatchScriptBase):
     def __init__(self):
         super().__init__('CommonBatch')
 
-    def run(self):
-        base_args = (self.config.source_dir, self.config.project_dir, self.config.platform)
+    def get_jobs(self, source_dir, project_dir, platform) -> list:
+        base_args = (source_dir, project_dir, platform)
 
-        batch = []
+        jobs = []
 
-        batch.extend([
+        jobs.extend([
             OdfMungeJob(['$*.odf'], *base_args),
             ConfigMungeJob(['*.fx'], *base_args),
             ConfigMungeJob(['$*.combo'], *base_args),
@@ -31,9 +31,10 @@ class CommonBatchScript(BatchScriptBase):
         # Munge sprites
         # Merge localization
 
-        # batch.append(LocalizeMunge(['*.cfg'], *base_args))
+        # jobs.append(LocalizeMunge(['*.cfg'], *base_args))
+
+        return jobs
 
-        self.job_runner.add_batch(batch)
-        self.job_runner.start()
-        self.job_runner.wait()
+    def run(self):
+        super().run()
         self.logger.info('Common done!'.format(self.config.source_dir.stem))
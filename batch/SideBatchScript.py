@@ -6,12 +6,12 @@ class SideBatchScript(BatchScriptBase):
     def __init__(self):
         super().__init__('SideBatch')
 
-    def run(self):
-        base_args = (self.config.source_dir, self.config.project_dir, self.config.platform)
+    def get_jobs(self, source_dir, project_dir, platform) -> list:
+        base_args = (source_dir, project_dir, platform)
 
-        batch = []
+        jobs = []
 
-        batch.extend([
+        jobs.extend([
             OdfMungeJob(['$*.odf'], *base_args),
             ConfigMungeJob(['effects/*.fx'], *base_args),
             ConfigMungeJob(['$*.combo'], *base_args),
@@ -20,7 +20,8 @@ class SideBatchScript(BatchScriptBase):
             ConfigMungeJob(['*.snd', '*.mus'], *base_args, hash_strings=True)
         ])
 
-        self.job_runner.add_batch(batch)
-        self.job_runner.start()
-        self.job_runner.wait()
+        return jobs
+
+    def run(self):
+        super().run()
         self.logger.info('Side {} done!'.format(self.config.source_dir.stem))
@@ -1,32 +1,36 @@
 from batch.BatchScriptBase import BatchScriptBase
 from jobs.MungeJob import WorldMungeJob, ConfigMungeJob, OdfMungeJob, PlanningMungeJob
+from mungers.util.FileIndex import get_file_index
 
 
 class WorldBatchScript(BatchScriptBase):
     def __init__(self):
         super().__init__('WorldBatch')
 
-    def run(self):
-        base_args = (self.config.source_dir, self.config.project_dir, self.config.platform)
+    def get_jobs(self, source_dir, project_dir, platform) -> list:
+        base_args = (source_dir, project_dir, platform)
 
-        batch = []
+        jobs = []
 
-        batch.extend([
+        layer_job = WorldMungeJob(['$*.lyr'], *base_args)  # All non-base layers
+        world_job = WorldMungeJob(['$*.wld'], *base_args).depends_on(layer_job)  # The base layer, ties it all together
+        jobs.extend([
             OdfMungeJob(['$*.odf'], *base_args),
             # ModelMungeJob(['$*.msh'], *base_args),
             # TextureMungeJob(['$*.tga', '$*.pic'], *base_args),
             # TerrainMungeJob(['$*.ter'], *base_args),
-            WorldMungeJob(['$*.lyr'], *base_args),  # All non-base layers
-            WorldMungeJob(['$*.wld'], *base_args),  # The base layer, ties it all together
+            layer_job,
+            world_job,
         ])
 
         path_jobs = []
-        for wld_file in self.config.source_dir.glob('**/*.wld'):
+        wld_files = get_file_index(source_dir).find(source_dir, lambda entry: entry.suffix == '.wld')
+        for wld_file in wld_files:
             path_jobs.append(ConfigMungeJob(['$*.pth'], *base_args, output_file=wld_file.stem.lower(),
                                             extension='.path', chunk_id='path'))
-        batch.extend(path_jobs)
+        jobs.extend(path_jobs)
 
-        batch.extend([
+        jobs.extend([
             PlanningMungeJob(['$*.pln'], *base_args),
             ConfigMungeJob(['$*.sky'], *base_args, chunk_id='sky'),
             ConfigMungeJob(['$*.fx'], *base_args, extension='.envfx', chunk_id='fx'),
@@ -37,7 +41,8 @@ class WorldBatchScript(BatchScriptBase):
             ConfigMungeJob(['$*.pvs'], *base_args, extension='.povs', chunk_id='PORT'),
         ])
 
-        self.job_runner.add_batch(batch)
-        self.job_runner.start()
-        self.job_runner.wait()
+        return jobs
+
+    def run(self):
+        super().run()
         self.logger.info('World {} done!'.format(self.config.source_dir.stem))
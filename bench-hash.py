@@ -0,0 +1,74 @@
+"""Benchmarks hashing names into magic numbers, comparing the uncached FNV-1a hash with magic() and magic_many()."""
+
+import argparse
+import random
+import sys
+import time
+
+from core.util import hashing
+from core.util.hashing import KNOWN_NAMES, fnv1a_hash_str, magic, magic_many
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num-strings',
+                        type=int,
+                        default=200000,
+                        help='The number of strings to hash, like the property names of a large world. '
+                             'Default: %(default)s.')
+    parser.add_argument('--num-unique',
+                        type=int,
+                        default=2000,
+                        help='The number of distinct strings among them besides the known names. '
+                             'Default: %(default)s.')
+    parser.add_argument('--repeat',
+                        type=int,
+                        default=3,
+                        help='How many times to run each benchmark, keeping the fastest. Default: %(default)s.')
+    return parser.parse_args()
+
+
+def make_strings(num_strings: int, num_unique: int, rng: random.Random) -> list:
+    """Mix known names with other ones in random case, the way names are spelled in hand-edited files."""
+    names = list(KNOWN_NAMES) + ['CustomProperty{}'.format(i) for i in range(num_unique)]
+    strings = []
+    for _ in range(num_strings):
+        name = rng.choice(names)
+        strings.append(name if rng.random() < 0.8 else name.upper())
+    return strings
+
+
+def best_time(repeat: int, func, setup=None):
+    result = None
+    best = float('inf')
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    args = parse_args()
+    strings = make_strings(args.num_strings, args.num_unique, random.Random(0))
+    print('Hashing {} strings'.format(len(strings)))
+
+    uncached_time, expected = best_time(args.repeat, lambda: [fnv1a_hash_str(string) for string in strings])
+    print('{:16s}: {:7.3f}s'.format('fnv1a_hash_str', uncached_time))
+    results = []
+    for name, func, setup in (('magic, cold', lambda: [magic(string) for string in strings],
+                               hashing._magic_lower.cache_clear),
+                              ('magic, warm', lambda: [magic(string) for string in strings], None),
+                              ('magic_many', lambda: magic_many(strings), None)):
+        elapsed, result = best_time(args.repeat, func, setup)
+        results.append(result)
+        print('{:16s}: {:7.3f}s ({:.1f}x)'.format(name, elapsed, uncached_time / elapsed))
+    if any(result != expected for result in results):
+        print('The hashes are different!')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""Benchmarks parsing config files with the pyparsing grammar and the hand-written parser, using large .pth files."""
+
+import argparse
+import pathlib
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import pyparsing as pp
+
+from core.config import get_global_config
+from mungers.ast.Args import Arg
+from mungers.ast.ConfigDoc import ConfigDoc
+from mungers.parsers.ConfigParser import ConfigParser
+from mungers.parsers.FastConfigParser import FastConfigParser
+from mungers.parsers.ParseStats import get_parse_stats
+from mungers.parsers.ParserOptions import ParserOptions
+from util.constants import Platform
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num-paths',
+                        type=int,
+                        default=100,
+                        help='The number of paths in each synthetic .pth file. Default: %(default)s.')
+    parser.add_argument('--nodes-per-path',
+                        type=int,
+                        default=20,
+                        help='The number of nodes in each path of the synthetic .pth files. Default: %(default)s.')
+    parser.add_argument('--num-files',
+                        type=int,
+                        default=4,
+                        help='The number of synthetic .pth files. Default: %(default)s.')
+    parser.add_argument('--files',
+                        type=pathlib.Path,
+                        nargs='+',
+                        help='Parse these existing config files instead of generating synthetic ones.')
+    parser.add_argument('--packrat',
+                        action='store_true',
+                        help='Enable pyparsing packrat memoization for the pyparsing grammar.')
+    parser.add_argument('--repeat',
+                        type=int,
+                        default=3,
+                        help='How many times to run each benchmark, keeping the fastest. Default: %(default)s.')
+    return parser.parse_args()
+
+
+def make_pth_file(path: pathlib.Path, num_paths: int, nodes_per_path: int, rng: random.Random):
+    """Write a .pth file laid out like the ones ZeroEditor saves, with random node positions."""
+    lines = ['Version(10);', 'PathCount({});'.format(num_paths), '']
+    for p in range(num_paths):
+        lines.extend(['Path("path_{}")'.format(p), '{', '\tData(0);', '\tPathTime(0.000000);',
+                      '\tSplineType("Hermite");', '', '\tProperties(0)', '\t{', '\t}', '',
+                      '\tNodes({})'.format(nodes_per_path), '\t{'])
+        for _ in range(nodes_per_path):
+            position = ', '.join('{:.6f}'.format(rng.uniform(-500.0, 500.0)) for _ in range(3))
+            lines.extend(['\t\tNode()', '\t\t{', '\t\t\tPosition({});'.format(position), '\t\t\tData(0);',
+                          '\t\t\tRotation(1.000000, 0.000000, 0.000000, 0.000000);', '\t\t\tProperties(0)',
+                          '\t\t\t{', '\t\t\t}', '\t\t}'])
+        lines.extend(['\t}', '', '}', ''])
+    path.write_text('\n'.join(lines))
+
+
+def best_time(repeat: int, func):
+    result = None
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def describe(node):
+    """Reduce a parsed node to plain values, so that the results of both parsers can be compared."""
+    if isinstance(node, Arg):
+        return type(node).__name__, node.value
+    if isinstance(node, (list, tuple)):
+        return [describe(x) for x in node]
+    return type(node).__name__, node.name, describe(node.args), None if node.body is None else describe(node.body)
+
+
+def main():
+    args = parse_args()
+    # Platform conditional blocks are expanded while parsing, so the parsers need a platform
+    get_global_config().platform = Platform.PC
+    temp_dir = None
+    files = args.files
+    if files is None:
+        temp_dir = tempfile.mkdtemp(prefix='openmunge-bench-')
+        rng = random.Random(0)
+        files = [pathlib.Path(temp_dir) / 'bench{}.pth'.format(i) for i in range(args.num_files)]
+        for file in files:
+            make_pth_file(file, args.num_paths, args.nodes_per_path, rng)
+    total_size = sum(file.stat().st_size for file in files)
+    print('Parsing {} files, {:.1f} MiB in total'.format(len(files), total_size / 2 ** 20))
+
+    if args.packrat:
+        pp.ParserElement.enable_packrat()
+    try:
+        options = ParserOptions(document_cls=ConfigDoc)
+        results = dict()
+        times = dict()
+        for name, parser in (('pyparsing', ConfigParser(options)), ('fast', FastConfigParser(options))):
+            get_parse_stats().reset()
+            times[name], results[name] = best_time(args.repeat,
+                                                   lambda: [parser.parse_file(file).instances for file in files])
+            print('{:9s}: {:7.3f}s ({:.1f} MiB/s)'.format(name, times[name], total_size / 2 ** 20 / times[name]))
+            if args.packrat and name == 'pyparsing':
+                stats = get_parse_stats()
+                print('packrat: {} hits, {} misses'.format(stats.packrat_hits, stats.packrat_misses))
+        if describe(results['fast']) != describe(results['pyparsing']):
+            print('The parsers produced different results!')
+            sys.exit(1)
+        print('Speedup: {:.1f}x'.format(times['pyparsing'] / times['fast']))
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Benchmarks reading and merging many .req files, comparing the pyparsing grammar with the streaming reader."""
+
+import argparse
+import pathlib
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from mungers.util.ReqDatabase import ReqDatabase
+from mungers.util.req_parser import parse_req_file
+from mungers.util.req_reader import ReqIndex, merge_req_files, read_req_file
+
+SECTIONS = ('class', 'config', 'texture', 'model', 'lvl', 'script', 'path', 'congraph', 'envfx')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num-files',
+                        type=int,
+                        default=5000,
+                        help='The number of synthetic .req files. Default: %(default)s.')
+    parser.add_argument('--entries',
+                        type=int,
+                        default=40,
+                        help='The number of entries in each synthetic .req file. Default: %(default)s.')
+    parser.add_argument('--tree',
+                        type=pathlib.Path,
+                        help='Read the .req files of this existing tree instead of generating synthetic ones.')
+    parser.add_argument('--repeat',
+                        type=int,
+                        default=3,
+                        help='How many times to run each benchmark, keeping the fastest. Default: %(default)s.')
+    return parser.parse_args()
+
+
+def make_files(root: pathlib.Path, num_files: int, num_entries: int) -> list:
+    """Write num_files .req files as ReqDatabase writes them, whose entries mostly overlap with each other's."""
+    rng = random.Random(0)
+    database = ReqDatabase()
+    files = []
+    for i in range(num_files):
+        database.clear()
+        for _ in range(num_entries):
+            with database.open_section(rng.choice(SECTIONS)) as section:
+                section.append('item_{}'.format(rng.randrange(num_files * 2)))
+        file = root / 'file{}.req'.format(i)
+        database.write(file)
+        files.append(file)
+    database.clear()
+    return files
+
+
+def merge_parsed(files) -> ReqIndex:
+    index = ReqIndex()
+    for file in files:
+        for section in parse_req_file(file):
+            index.add_section(section.header, section.entries)
+    return index
+
+
+def best_time(repeat: int, func):
+    result = None
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    args = parse_args()
+    temp_dir = None
+    if args.tree is None:
+        temp_dir = tempfile.mkdtemp(prefix='openmunge-bench-')
+        print('Generating {} files in {}...'.format(args.num_files, temp_dir))
+        files = make_files(pathlib.Path(temp_dir), args.num_files, args.entries)
+    else:
+        files = sorted(args.tree.glob('**/*.req'))
+
+    try:
+        parse_time, parsed = best_time(args.repeat, lambda: [parse_req_file(file) for file in files])
+        print('pyparsing:  {:6.3f}s ({} files)'.format(parse_time, len(files)))
+        read_time, read = best_time(args.repeat, lambda: [read_req_file(file) for file in files])
+        print('reader:     {:6.3f}s ({:.1f}x pyparsing)'.format(read_time, parse_time / read_time))
+        if [[(s.header, s.entries) for s in sections] for sections in parsed] != \
+                [[(s.header, s.entries) for s in sections] for sections in read]:
+            print('The reader does not match pyparsing!')
+            sys.exit(1)
+
+        parse_merge_time, parse_index = best_time(args.repeat, lambda: merge_parsed(files))
+        print('pyparsing merge: {:6.3f}s'.format(parse_merge_time))
+        merge_time, index = best_time(args.repeat, lambda: merge_req_files(files))
+        print('reader merge:    {:6.3f}s ({:.1f}x pyparsing, {} sections, {} entries)'.format(
+            merge_time, parse_merge_time / merge_time, len(index.sections),
+            sum(len(section) for section in index.sections.values())))
+        if list(index) != list(parse_index):
+            print('The merged index does not match pyparsing!')
+            sys.exit(1)
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
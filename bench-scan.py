@@ -0,0 +1,92 @@
+"""Benchmarks scanning a project tree for munge inputs, comparing pathlib globbing with the file index."""
+
+import argparse
+import pathlib
+import shutil
+import sys
+import tempfile
+import time
+
+from mungers.util.FileIndex import FileIndex, DEFAULT_SCAN_THREADS
+
+SUFFIXES = ('.odf', '.msh', '.tga', '.fx', '.combo', '.req', '.snd')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num-files',
+                        type=int,
+                        default=100000,
+                        help='The number of files in the synthetic tree. Default: %(default)s.')
+    parser.add_argument('--files-per-dir',
+                        type=int,
+                        default=50,
+                        help='The number of files in each directory of the synthetic tree. Default: %(default)s.')
+    parser.add_argument('--tree',
+                        type=pathlib.Path,
+                        help='Scan this existing tree instead of generating a synthetic one.')
+    parser.add_argument('--threads',
+                        type=int,
+                        nargs='+',
+                        default=[1, DEFAULT_SCAN_THREADS],
+                        help='The numbers of scanning threads to benchmark. Default: %(default)s.')
+    parser.add_argument('--repeat',
+                        type=int,
+                        default=3,
+                        help='How many times to run each benchmark, keeping the fastest. Default: %(default)s.')
+    return parser.parse_args()
+
+
+def make_tree(root: pathlib.Path, num_files: int, files_per_dir: int):
+    """Lay out num_files empty files in a data_ABC-like tree of sides and worlds, files_per_dir to a directory."""
+    num_dirs = max(1, num_files // files_per_dir)
+    for i in range(num_files):
+        dir_num = i % num_dirs
+        parent = 'Sides' if dir_num % 2 else 'Worlds'
+        directory = root / parent / 'P{:03d}'.format(dir_num % 97) / 'd{}'.format(dir_num)
+        if i < num_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+        (directory / 'file{}{}'.format(i, SUFFIXES[i % len(SUFFIXES)])).touch()
+
+
+def best_time(repeat: int, func):
+    result = None
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    args = parse_args()
+    temp_dir = None
+    root = args.tree
+    if root is None:
+        temp_dir = tempfile.mkdtemp(prefix='openmunge-bench-')
+        root = pathlib.Path(temp_dir)
+        print('Generating {} files in {}...'.format(args.num_files, root))
+        make_tree(root, args.num_files, args.files_per_dir)
+
+    try:
+        glob_time, glob_files = best_time(args.repeat, lambda: [file for file in root.glob('**/*') if file.is_file()])
+        print('pathlib glob: {:8.3f}s ({} files)'.format(glob_time, len(glob_files)))
+        file_index = None
+        for num_threads in args.threads:
+            scan_time, file_index = best_time(args.repeat, lambda: FileIndex.scan(root, num_threads=num_threads))
+            print('scan, {:2d} threads: {:5.3f}s ({} files, {:.1f}x glob)'.format(
+                num_threads, scan_time, len(file_index.entries), glob_time / scan_time))
+            if len(file_index.entries) != len(glob_files):
+                print('The file index does not match the glob!')
+                sys.exit(1)
+        if file_index is not None:
+            query_time, odf_files = best_time(args.repeat, lambda: file_index.find_input_files(root, ['$*.odf']))
+            print('query $*.odf:    {:5.3f}s ({} files)'.format(query_time, len(odf_files)))
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
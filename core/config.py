@@ -4,8 +4,9 @@ import os
 import pathlib
 from collections import ChainMap
 
-from util.arg_parsing import PositiveNumberArgumentType
-from util.constants import Platform, ALL_PLATFORMS, ENV_VAR_PREFIX
+from util.arg_parsing import PositiveNumberArgumentType, BoolArgumentType
+from util.constants import Platform, ALL_PLATFORMS, ENV_VAR_PREFIX, JobExecutor, JOB_EXECUTORS, \
+    DEFAULT_DAEMON_SOCKET, FailurePolicy, FAILURE_POLICIES, ParserEngine, PARSER_ENGINES
 from util.logs import setup_logger
 
 
@@ -304,6 +305,111 @@ class GlobalConfig(Config):
                         help='The number of munge jobs that can be run simultaneously. If left unspecified, will '
                              'default to the number of CPUs available.')
 
+        self.add_option('job_executor',
+                        metavar='EXECUTOR',
+                        type=JobExecutor,
+                        choices=JOB_EXECUTORS,
+                        default=JobExecutor.PROCESS,
+                        sections=[self.name],
+                        help='How munge jobs are executed. "process" starts a new Python process for every job, '
+                             '"pool" runs jobs in long-lived worker processes that only import the mungers once, and '
+                             '"daemon" sends jobs to a running "openmunge.py serve" daemon. Choices: %(choices)s. '
+                             'Default: {default}.')
+
+        self.add_option('daemon_socket',
+                        type=pathlib.Path,
+                        default=DEFAULT_DAEMON_SOCKET,
+                        sections=[self.name],
+                        help='The Unix socket on which the munge daemon listens for jobs. Default: {default}.')
+
+        self.add_option('on_failure',
+                        metavar='POLICY',
+                        type=FailurePolicy,
+                        choices=FAILURE_POLICIES,
+                        default=FailurePolicy.CONTINUE,
+                        sections=[self.name],
+                        help='What to do when a munge job fails. "continue" runs every other job regardless, "skip" '
+                             'skips the jobs which depend on the failed one, "cancel" also cancels every job that has '
+                             'not started yet, and "terminate" also stops the jobs that are still running. '
+                             'Choices: %(choices)s. Default: {default}.')
+
+        self.add_option('max_retries',
+                        metavar='NUM_RETRIES',
+                        type=int,
+                        default=0,
+                        sections=[self.name],
+                        help='The number of times a munge job is retried after failing with a transient OS error, '
+                             'e.g. running out of file handles or memory. Default: {default}.')
+
+        self.add_option('files_per_shard',
+                        metavar='NUM_FILES',
+                        type=int,
+                        default=100,
+                        sections=[self.name],
+                        help='Munge jobs whose input files are munged separately (e.g. ODFs and worlds) are split into '
+                             'shards of at least this many input files, which run in parallel. 0 disables sharding. '
+                             'Default: {default}.')
+
+        self.add_option('build_cache',
+                        metavar='BOOL',
+                        type=BoolArgumentType(),
+                        default=True,
+                        sections=[self.name],
+                        help='When true, munge jobs are skipped if their input files, options and OpenMunge version '
+                             'are unchanged since the last run and all of their outputs still exist. Default: '
+                             '{default}.')
+
+        self.add_option('watch_interval',
+                        metavar='SECONDS',
+                        type=float,
+                        default=1.0,
+                        sections=[self.name],
+                        help='How often the project files are checked for changes with --watch. Changes are only '
+                             'munged once a check finds no further changes. Default: {default}.')
+
+        self.add_option('parser_engine',
+                        metavar='ENGINE',
+                        type=ParserEngine,
+                        choices=PARSER_ENGINES,
+                        default=ParserEngine.FAST,
+                        sections=[self.name],
+                        help='How config files (.wld, .pth, .fx, .sky etc.) and .odf files are parsed. "fast" uses '
+                             'hand-written parsers, "pyparsing" the original pyparsing grammar and line-by-line .odf '
+                             'parser. Both produce the same output. Choices: %(choices)s. Default: {default}.')
+
+        self.add_option('parse_cache_size',
+                        metavar='MIB',
+                        type=int,
+                        default=128,
+                        sections=[self.name],
+                        help='The maximum size of the cache of parsed config files in _BUILD, which lets munge jobs '
+                             'skip parsing files that have not changed. The least recently used files are evicted '
+                             'first. 0 disables the cache. Default: {default}.')
+
+        self.add_option('parse_processes',
+                        metavar='NUM_PROCESSES',
+                        type=int,
+                        default=0,
+                        sections=[self.name],
+                        help='How many processes a munge job may use to parse its input files, if it has many or large '
+                             'ones. 0 shares the CPUs between the jobs that may run at once, 1 parses them in the '
+                             'process of the job itself, e.g. for debugging. Default: {default}.')
+
+        self.add_option('file_index',
+                        type=pathlib.Path,
+                        show_in_cli=False,
+                        show_in_cfg=False,
+                        help='The location of an index of the project files saved by openmunge.py, which munge jobs '
+                             'use to find their input files without walking their source directories.')
+
+        self.add_option('concurrent_jobs',
+                        type=int,
+                        default=1,
+                        show_in_cli=False,
+                        show_in_cfg=False,
+                        help='How many munge jobs the job runner may run at once, which share the CPUs that a job '
+                             'parses its input files with.')
+
 
 _global_config = GlobalConfig()
 
@@ -312,6 +418,13 @@ def get_global_config():
     return _global_config
 
 
+def reset_global_config():
+    """Discard the global config so that it can be set up again, e.g. by a worker process before its next job."""
+    global _global_config
+    _global_config = GlobalConfig()
+    return _global_config
+
+
 def setup_global_config(cli_arg_parser, args=None):
     if _global_config.is_initialized():
         return _global_config
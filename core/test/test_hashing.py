@@ -0,0 +1,42 @@
+import unittest
+
+from parameterized import parameterized
+
+from core.util.hashing import KNOWN_NAMES, fnv1a_hash_str, magic, magic_many
+
+
+class HashingTest(unittest.TestCase):
+    @parameterized.expand([
+        ('known name', 'ChildRotation'),
+        ('other name', 'SomeOtherName'),
+        ('empty', ''),
+        ('symbols', 'a_b@[1]'),
+    ])
+    def test_magic(self, _name: str, string: str):
+        expected = fnv1a_hash_str(string)
+        self.assertEqual(magic(string), expected)
+        self.assertEqual(magic(string.upper()), expected)
+        self.assertEqual(magic(string.lower()), expected)
+
+    def test_magic_known_names(self):
+        self.assertEqual([magic(name) for name in KNOWN_NAMES], [fnv1a_hash_str(name) for name in KNOWN_NAMES])
+
+    def test_magic_shared(self):
+        self.assertIs(magic('FooBar'), magic('fooBAR'))
+
+    def test_magic_many(self):
+        strings = ['Texture', 'texture', 'Foo', 'Foo', 'bar', '']
+        self.assertEqual(magic_many(strings), [fnv1a_hash_str(string) for string in strings])
+        self.assertEqual(magic_many(iter(strings)), magic_many(strings))
+
+    def test_non_ascii(self):
+        # Lower-casing the Kelvin sign gives an ASCII k, which must not be mistaken for it
+        for string in ('K', 'caf\xe9'):
+            with self.assertRaises(UnicodeEncodeError):
+                magic(string)
+            with self.assertRaises(UnicodeEncodeError):
+                magic_many([string])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,33 @@
 import struct
+from functools import lru_cache
 
 FNV_PRIME = 16777619
 OFFSET_BASIS = 2166136261
 U32_MASK = 2**32-1
 
+# The hashes of strings that are not known names are kept in a bounded cache, since some mungers hash every string
+# value of their inputs
+MAGIC_CACHE_SIZE = 65536
+# Names that the mungers look for or that are common in config and .odf files, which are hashed once up front
+KNOWN_NAMES = (
+    # Platform conditional blocks
+    'pc', 'ps2', 'xbox',
+    # World, region, hint and barrier files
+    'Version', 'SaveType', 'LightName', 'TerrainName', 'SkyName', 'PathName', 'Object', 'Region', 'Hint', 'Barrier',
+    'ChildRotation', 'ChildPosition', 'SeqNo', 'NetworkId', 'Team', 'Label', 'PerceivedTeam', 'Position', 'Rotation',
+    'Size', 'Corner', 'Flag', 'Name', 'Type',
+    # Planning files
+    'Hub', 'Connection', 'Pos', 'Radius', 'Start', 'End', 'OneWay', 'JetJump', 'Jump', 'Dynamic',
+    # Config files
+    'Texture', 'Geometry', 'Data', 'Properties', 'Nodes', 'Node', 'Path', 'PathCount', 'PathTime', 'SplineType',
+    'Effect', 'Color', 'Light', 'Scale',
+    # .odf files
+    'ClassLabel', 'ClassParent', 'GeometryName', 'GeometryScale', 'AnimationName', 'MaxHealth', 'MapTexture',
+    'IconTexture', 'HealthType', 'WeaponName', 'OrdnanceName', 'ExplosionName', 'FoleyFXGroup', 'ChunkGeometryName',
+)
+
+_LOWER_BYTES = bytes(byte | 0x20 for byte in range(256))
+
 
 def fnv1a_hash(buffer: bytes) -> bytes:
     result = OFFSET_BASIS
@@ -18,4 +42,48 @@ def fnv1a_hash_str(string: str) -> bytes:
     return fnv1a_hash(str_bytes)
 
 
-magic = fnv1a_hash_str
+def _fnv1a_hash_lower(buffer: bytes) -> bytes:
+    """Like fnv1a_hash(), but with the case folding done up front by bytes.translate() rather than for each byte."""
+    result = OFFSET_BASIS
+    for byte in buffer.translate(_LOWER_BYTES):
+        result = ((result ^ byte) * FNV_PRIME) & U32_MASK
+    return struct.pack('<I', result)
+
+
+# The hash ignores case, so that names are keyed by their lower-cased form
+_KNOWN_HASHES = {name.lower(): fnv1a_hash_str(name) for name in KNOWN_NAMES}
+
+
+@lru_cache(maxsize=MAGIC_CACHE_SIZE)
+def _magic_lower(lower: str) -> bytes:
+    return _fnv1a_hash_lower(bytes(lower, 'ascii'))
+
+
+def magic(string: str) -> bytes:
+    """
+    Get the magic number (FNV-1a hash) of a string, which is the same as fnv1a_hash_str() but cached. Every occurrence
+    of a cached string gets the same bytes object, which AST nodes share instead of each holding a copy.
+    """
+    if not string.isascii():
+        # Can't be hashed, and lower() could turn it into an ASCII string that can
+        return fnv1a_hash_str(string)
+    lower = string.lower()
+    try:
+        return _KNOWN_HASHES[lower]
+    except KeyError:
+        return _magic_lower(lower)
+
+
+def magic_many(strings) -> list:
+    """Get the magic numbers of an iterable of strings, e.g. all of the property names of a file, as a list."""
+    known_hashes = _KNOWN_HASHES
+    magic_lower = _magic_lower
+    hashes = []
+    for string in strings:
+        if not string.isascii():
+            hashes.append(fnv1a_hash_str(string))
+            continue
+        lower = string.lower()
+        hash_ = known_hashes.get(lower)
+        hashes.append(hash_ if hash_ is not None else magic_lower(lower))
+    return hashes
@@ -1,4 +1,5 @@
 from abc import ABC
+import importlib
 import pathlib
 
 from jobs.JobBase import JobBase
@@ -8,6 +9,24 @@ class BatchJob(JobBase, ABC):
     def get_executable_path(self):
         return pathlib.Path(self.config.cwd, 'run-batch').with_suffix('.py')
 
+    def get_batch_script_cls(self):
+        batch_script_name = '{}BatchScript'.format(self.get_task().capitalize())
+        try:
+            mod = importlib.import_module('batch.{}'.format(batch_script_name))
+        except ModuleNotFoundError:
+            return None
+        return getattr(mod, batch_script_name, None)
+
+    def expand(self):
+        """
+        Get the munge jobs that run-batch.py would run for this batch, so that they can be scheduled directly instead
+        of in a nested job runner. Returns None if there is no batch script to expand.
+        """
+        batch_script_cls = self.get_batch_script_cls()
+        if batch_script_cls is None:
+            return None
+        return batch_script_cls().get_jobs(self.source_dir, self.project_dir, self.platform)
+
     def _get_name_prefix(self):
         batch_job = 'BatchJob'
         name_prefix = self.__class__.__name__.replace(batch_job, '')
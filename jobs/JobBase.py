@@ -7,8 +7,10 @@ import time
 from abc import abstractmethod, ABC
 
 from jobs.JobRunner import JobStatus, COMPLETE_STATUSES
+from jobs.WorkerPool import max_rss_to_bytes
 from core.config import get_global_config
-from util.constants import Platform
+from mungers.util.FileIndex import find_shared_file_index
+from util.constants import Platform, EXIT_TRANSIENT_FAILURE
 
 
 class JobBase(ABC):
@@ -20,17 +22,34 @@ class JobBase(ABC):
         self.log_file_path = None
         self.log_file = None
         self.process = None
+        self.worker_pool = None
 
         self.time_submit = None
         self.time_start = None
         self.time_finish = None
 
+        # Resource usage of the job's process, where the platform can measure it
+        self.cpu_time = None
+        self.max_rss = None
+
         self.source_dir = source_dir
         self.project_dir = project_dir
         self.platform = platform
 
+        self.dependencies = []
+        self.attempts = 0
+        # How many jobs the job runner may run at once, this one included. Set by the runner when it submits the job.
+        self.concurrent_jobs = 1
+
         self.config = get_global_config()
 
+    def depends_on(self, *jobs):
+        """Declare jobs which must finish before this one can start. Returns self to allow chaining."""
+        for job in jobs:
+            if job is not self and job not in self.dependencies:
+                self.dependencies.append(job)
+        return self
+
     def job_id(self):
         munge_type = self._get_name_prefix()
         source_stem = self.source_dir.stem
@@ -65,6 +84,11 @@ class JobBase(ABC):
     def _get_name_prefix(self):
         ...
 
+    def build_task_args(self) -> list:
+        return [self.get_task(),
+                '--source-dir', str(self.source_dir),
+                '--output-dir', str(self.get_output_dir())]
+
     def build_cli_args(self) -> list:
         which_python = shutil.which('python')
         if which_python is None:
@@ -84,35 +108,78 @@ class JobBase(ABC):
         if not app_path.exists() or not app_path.is_file():
             raise OSError('{job}: {path} does not exist or is not executable.'.format(job=self.job_id(), path=app_path))
         cmd.append(str(app_path))
-        cmd.append(self.get_task())
-
-        cmd.extend(['--source-dir', str(self.source_dir)])
-        cmd.extend(['--output-dir', str(self.get_output_dir())])
+        cmd.extend(self.build_task_args())
 
         return cmd
 
-    def prepare(self, job_runner_log):
+    def build_env(self) -> dict:
+        env = os.environ | self.config.get_options_as_env_dict('project_dir', 'platform', 'config_file', 'log_level',
+                                                               'job_executor', 'build_cache', 'daemon_socket',
+                                                               'files_per_shard', 'on_failure', 'max_retries',
+                                                               'parser_engine', 'parse_cache_size',
+                                                               'parse_processes')
+        # Let the job find its input files in the index of the project, if one was saved, instead of walking the tree
+        file_index = find_shared_file_index(self.source_dir)
+        if file_index is not None and file_index.path is not None:
+            env[self.config.get_option_as_env_var('file_index')] = str(file_index.path)
+        env[self.config.get_option_as_env_var('concurrent_jobs')] = str(self.concurrent_jobs)
+        return env
+
+    def prepare(self, job_runner_log, worker_pool=None):
         if self.id is None:
             self.id = self.run_signature()
 
         self.runner_log = job_runner_log
+        self.worker_pool = worker_pool
+        self.attempts += 1
 
-        # Set up log file for this job
+        # Set up log file for this job. Retries add to the log of the earlier attempts rather than replacing it.
+        if self.log_file:
+            self.log_file.close()
         log_dir = self.config.cwd / 'logs'
         if not log_dir.exists():
             log_dir.mkdir(parents=True, exist_ok=True)
         self.log_file_path = log_dir / '{j_id}.log'.format(j_id=self.job_id())
-        self.log_file = open(self.log_file_path, 'w')
+        self.log_file = open(self.log_file_path, 'w' if self.attempts == 1 else 'a')
 
     def execute(self):
         self.time_start = time.time()
         # popen stuff...
         job_args = self.build_cli_args()
-        sub_env = os.environ | self.config.get_options_as_env_dict('project_dir', 'platform', 'config_file',
-                                                                   'log_level')
+        sub_env = self.build_env()
         self.runner_log.info('{j_id} args: {args}'.format(j_id=self.job_id(), args=' '.join(job_args)))
         self.process = subprocess.Popen(job_args, stdout=self.log_file, stderr=self.log_file, env=sub_env)
 
+    def wait(self):
+        """Block until the job's process has exited, collecting its resource usage where possible."""
+        if self.process is None:
+            return
+        if isinstance(self.process, subprocess.Popen) and hasattr(os, 'wait4'):
+            try:
+                _, wait_status, usage = os.wait4(self.process.pid, 0)
+            except ChildProcessError:
+                # Somebody else reaped the process already
+                self.process.wait()
+                return
+            # The process has been reaped, so Popen can no longer find out its exit status for itself
+            self.process.returncode = os.waitstatus_to_exitcode(wait_status)
+            self.cpu_time = usage.ru_utime + usage.ru_stime
+            self.max_rss = max_rss_to_bytes(usage.ru_maxrss)
+            return
+        self.process.wait()
+        resource_usage = getattr(self.process, 'resource_usage', None)
+        if resource_usage is not None:
+            self.cpu_time = resource_usage['cpu_time']
+            self.max_rss = resource_usage['max_rss']
+
+    def terminate(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+
+    def is_transient_failure(self) -> bool:
+        """Whether the job failed in a way that may succeed if it is run again."""
+        return self.process is not None and self.process.returncode == EXIT_TRANSIENT_FAILURE
+
     def update(self):
         ...
 
@@ -0,0 +1,60 @@
+import json
+import pathlib
+import threading
+
+from util.file_util import atomic_write
+
+DEFAULT_JOB_DURATION = 1.0
+JOB_HISTORY_FILE_NAME = 'job_history.json'
+
+
+class JobHistory:
+    """
+    A small on-disk record of how long each job took the last few times it ran successfully, keyed by job ID. Durations
+    are smoothed so that a single unusually fast or slow run does not throw off the estimates.
+    """
+    SMOOTHING = 0.5
+
+    def __init__(self, path: pathlib.Path):
+        self.path = pathlib.Path(path)
+        self.durations = dict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with self.path.open('r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        durations = data.get('durations', {}) if isinstance(data, dict) else {}
+        self.durations = {job_id: float(duration) for job_id, duration in durations.items()
+                          if isinstance(duration, (int, float))}
+
+    def estimate(self, job_id: str) -> float:
+        """Get the expected duration of a job, falling back to the mean of all known durations for unknown jobs."""
+        with self._lock:
+            duration = self.durations.get(job_id)
+            if duration is not None:
+                return duration
+            if self.durations:
+                return sum(self.durations.values()) / len(self.durations)
+        return DEFAULT_JOB_DURATION
+
+    def record(self, job_id: str, duration: float):
+        with self._lock:
+            previous = self.durations.get(job_id)
+            if previous is not None:
+                duration = JobHistory.SMOOTHING * duration + (1.0 - JobHistory.SMOOTHING) * previous
+            self.durations[job_id] = duration
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = dict(durations=dict(sorted(self.durations.items())))
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path, json.dumps(data, indent=2))
@@ -1,9 +1,10 @@
 import queue
 import threading
 import time
-from datetime import datetime
 
-from util.constants import StrEnum
+from jobs.MungeDaemon import DaemonClient
+from jobs.WorkerPool import WorkerPool
+from util.constants import StrEnum, JobExecutor, DEFAULT_DAEMON_SOCKET, FailurePolicy, TRANSIENT_ERRNOS
 from util.logs import setup_logger
 
 
@@ -13,38 +14,109 @@ class JobStatus(StrEnum):
     RUNNING = 'running'
     SUCCESS = 'success'
     ERROR = 'error'
+    SKIPPED = 'skipped'
+    CANCELLED = 'cancelled'
 
 
 COMPLETE_STATUSES = (JobStatus.SUCCESS, JobStatus.ERROR)
 
 
 class JobRunner:
-    RUNNER_SLEEP_TIME = 0.1
-    RUNNER_WAIT_TIME = 0.1
     RUNNER_WAIT_REPORT_TIME = 30.0
+    # A job which fails transiently is retried after a delay which doubles with each attempt, up to the maximum, to give
+    # whatever resource it ran out of time to free up
+    RETRY_DELAY = 1.0
+    RETRY_MAX_DELAY = 30.0
 
-    def __init__(self, max_concurrent=None):
+    def __init__(self, max_concurrent=None, executor=JobExecutor.PROCESS, history=None, daemon_socket=None,
+                 on_failure=FailurePolicy.CONTINUE, max_retries=0, retry_delay=RETRY_DELAY):
         # Cap max concurrent at number of cpus
         from multiprocessing import cpu_count
         self.max_concurrent = max_concurrent or 999_999_999
         self.max_concurrent = min(self.max_concurrent, cpu_count())
 
-        self.batches = queue.Queue()
-
         self.logger = setup_logger('JobRunner')
+
+        # Workers are only started once there are jobs that can use them. The daemon has its own workers, and its client
+        # stands in for a worker pool. Without a daemon to send them to, jobs run in a worker pool as run-munger.py
+        # would run them locally.
+        self.worker_pool = None
+        if executor == JobExecutor.DAEMON:
+            daemon_client = DaemonClient(daemon_socket or DEFAULT_DAEMON_SOCKET)
+            if daemon_client.ping():
+                self.worker_pool = daemon_client
+            else:
+                self.logger.warning('No munge daemon is listening on {}, running jobs in a worker pool instead'
+                                    .format(daemon_client.socket_path))
+                executor = JobExecutor.POOL
+        if executor == JobExecutor.POOL:
+            self.worker_pool = WorkerPool(self.max_concurrent)
+        # Jobs running in a pool or the daemon are limited by its workers, which the daemon may have more or fewer of
+        self.concurrent_jobs = self.max_concurrent
+        if self.worker_pool is not None and self.worker_pool.size:
+            self.concurrent_jobs = self.worker_pool.size
+
+        # Durations from previous runs, used to start the jobs on the longest chains first. Optional.
+        self.history = history
+
+        self.on_failure = on_failure
+        self.max_retries = max_retries or 0
+        self.retry_delay = retry_delay
+        self._cancelled = False
+        self._terminated_jobs: set = set()
+
         self._thread = threading.Thread(target=self._run,)
         self._running = False
 
-        self._current_batch: queue.Queue = queue.Queue()
+        # Finished jobs, new batches and stop requests are all delivered through the event queue, so the runner thread
+        # sleeps until there is something to do rather than polling the running jobs
+        self._events: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+
+        # Jobs are scheduled as a dependency graph: a pending job is submitted once every job it depends on has finished
+        self._known_jobs: set = set()
+        self._new_jobs: queue.Queue = queue.Queue()
+        self._pending_jobs: list = []
+        # Jobs waiting out their retry delay, which are put back in the retried jobs queue once it is over
+        self._retrying_jobs: set = set()
+        self._retried_jobs: queue.Queue = queue.Queue()
         self._running_jobs: list = []
-        self._has_work = False
+        self._finished_jobs: dict = dict()
+        self._priorities: dict = dict()
+
+    @property
+    def finished_jobs(self) -> dict:
+        """Every job that has finished so far, mapped to its final status."""
+        return dict(self._finished_jobs)
+
+    @property
+    def failed_jobs(self) -> dict:
+        """Every job that has finished without succeeding, whether it failed, was skipped or was cancelled."""
+        return {job: status for job, status in self._finished_jobs.items() if status != JobStatus.SUCCESS}
+
+    def add_job(self, job) -> None:
+        self.add_jobs([job])
+
+    def add_jobs(self, jobs: list) -> None:
+        """
+        Schedule jobs to be run. Jobs are started in the order they were added, as soon as all of their dependencies
+        have finished. Dependencies which were never added to the runner are added along with their dependants.
+        """
+        with self._lock:
+            self._idle.clear()
+            for job in jobs:
+                self._new_jobs.put(job)
+        self._events.put(None)
 
     def add_batch(self, batch: list) -> None:
-        self.batches.put(batch)
+        """Schedule a batch of jobs. Batches are just groups of jobs; ordering between them comes from dependencies."""
+        self.add_jobs(batch)
 
     def add_batches(self, batches: list) -> None:
         for batch in batches:
-            self.batches.put(batch)
+            self.add_batch(batch)
 
     def start(self):
         if self._running:
@@ -57,76 +129,247 @@ class JobRunner:
     def _run(self):
         # Main blocking loop
         while self._running:
-            num_running = len(self._running_jobs)
-            num_pending_in_batch = self._current_batch.qsize()
-            num_batches_remaining = self.batches.qsize()
-            self._has_work = num_running or num_pending_in_batch or num_batches_remaining
-
-            if num_running:
-                for i in range(num_running - 1, -1, -1):
-                    job = self._running_jobs[i]
-                    try:
-                        job.update()
-                        job_status = job.status()
-                    except Exception as e:
-                        self.logger.exception('Error while updating job status for {j_id}'.format(j_id=job.job_id()),
-                                              exc_info=e)
-                        job_status = JobStatus.ERROR
-
-                    if job_status in COMPLETE_STATUSES:
-                        self.logger.info('{j_id} status: {status}'.format(j_id=job.job_id(), status=job_status))
-
-                        try:
-                            job.complete(job_status)
-                        except Exception as e:
-                            self.logger.exception('Unable to complete job {j_id}'.format(j_id=job.job_id()), exc_info=e)
-
-                        num_pending_in_batch = self._current_batch.qsize()
-                        del self._running_jobs[i]
-
-                        self.logger.info('{njobs} jobs pending in current batch, {nbatches} batches remaining'
-                                         .format(njobs=num_pending_in_batch, nbatches=self.batches.qsize()))
-
-            if num_pending_in_batch:
-                num_to_submit = min(num_pending_in_batch, self.max_concurrent - num_running)
-                for i in range(num_to_submit):
-                    try:
-                        job = self._current_batch.get()
-                    except (IndexError, queue.Empty):
-                        break
-
-                    try:
-                        job.prepare(self.logger)
-                        job.execute()
-                        self._running_jobs.append(job)
-                    except Exception as e:
-                        self.logger.exception('Unable to submit job {j_id}'.format(j_id=job.job_id()), exc_info=e)
-                        job.complete(JobStatus.ERROR)
-
-            if num_batches_remaining:
-                next_batch = self.batches.get()
-                for job in next_batch:
-                    job.time_submit = time.time()
-                    self._current_batch.put(job)
-
-            time.sleep(JobRunner.RUNNER_SLEEP_TIME)
+            self._dequeue_new_jobs()
+            self._submit_jobs()
+            with self._lock:
+                if not (self._running_jobs or self._pending_jobs or self._retrying_jobs) and self._new_jobs.empty():
+                    self._idle.set()
+
+            job = self._events.get()
+            if job is not None:
+                self._finish_job(job)
+
+    def _dequeue_new_jobs(self):
+        while not self._retried_jobs.empty():
+            job = self._retried_jobs.get()
+            self._retrying_jobs.discard(job)
+            self._pending_jobs.insert(0, job)
+        if self._new_jobs.empty():
+            return
+        while not self._new_jobs.empty():
+            self._add_pending_job(self._new_jobs.get())
+        self._update_priorities()
+
+    def _estimate_duration(self, job) -> float:
+        if self.history is None:
+            return 1.0
+        return self.history.estimate(job.job_id())
+
+    def _update_priorities(self):
+        """
+        Prioritise pending jobs by the expected length of the longest chain of work they start, i.e. their own expected
+        duration plus that of their most expensive chain of dependants. Submitting in this order starts the critical
+        path as early as possible, and among independent jobs it starts the longest ones first.
+        """
+        dependants = {job: [] for job in self._pending_jobs}
+        for job in self._pending_jobs:
+            for dependency in job.dependencies:
+                if dependency in dependants:
+                    dependants[dependency].append(job)
+
+        priorities = dict()
+        visiting = set()
+
+        def priority(job):
+            if job in priorities:
+                return priorities[job]
+            if job in visiting:
+                return 0.0  # Circular dependency, which _submit_jobs will report
+            visiting.add(job)
+            longest_chain = max((priority(dependant) for dependant in dependants[job]), default=0.0)
+            visiting.discard(job)
+            priorities[job] = self._estimate_duration(job) + longest_chain
+            return priorities[job]
+
+        for pending_job in self._pending_jobs:
+            priority(pending_job)
+        # Sorting is stable, so jobs of equal priority keep the order in which they were added
+        self._pending_jobs.sort(key=lambda j: priorities[j], reverse=True)
+        self._priorities = priorities
+
+    def _add_pending_job(self, job):
+        if job in self._known_jobs:
+            return
+        self._known_jobs.add(job)
+        for dependency in job.dependencies:
+            self._add_pending_job(dependency)
+        job.time_submit = time.time()
+        self._pending_jobs.append(job)
+
+    def _is_ready(self, job) -> bool:
+        return all(dependency in self._finished_jobs for dependency in job.dependencies)
+
+    def _end_job(self, job, status: JobStatus, reason: str):
+        """Finish a job that never ran."""
+        self.logger.warning('{j_id} {status}: {reason}'.format(j_id=job.job_id(), status=status.value, reason=reason))
+        job.complete(status)
+        self._finished_jobs[job] = status
+
+    def _skip_jobs(self):
+        """Skip or cancel pending jobs according to the failure policy."""
+        if self._cancelled:
+            for job in self._pending_jobs:
+                self._end_job(job, JobStatus.CANCELLED, 'cancelled because an earlier job failed')
+            self._pending_jobs.clear()
+            return
+        if self.on_failure == FailurePolicy.CONTINUE:
+            return
+        # Skipping a job can fail the jobs that depend on it in turn, so keep going until nothing else is skipped
+        skipped = True
+        while skipped:
+            skipped = False
+            for job in list(self._pending_jobs):
+                failed_dependencies = [dependency for dependency in job.dependencies
+                                       if self._finished_jobs.get(dependency, JobStatus.SUCCESS) != JobStatus.SUCCESS]
+                if not failed_dependencies:
+                    continue
+                self._pending_jobs.remove(job)
+                self._end_job(job, JobStatus.SKIPPED, 'skipped because {} did not succeed'
+                              .format(', '.join(dependency.job_id() for dependency in failed_dependencies)))
+                skipped = True
+
+    def _should_retry(self, job) -> bool:
+        return not self._cancelled and job.attempts <= self.max_retries
+
+    def _retry_job(self, job, reason: str):
+        delay = min(self.retry_delay * 2 ** max(job.attempts - 1, 0), self.RETRY_MAX_DELAY)
+        self.logger.warning('{j_id} {reason}, retrying in {delay:.1f}s (attempt {n} of {max})'
+                            .format(j_id=job.job_id(), reason=reason, delay=delay, n=job.attempts + 1,
+                                    max=self.max_retries + 1))
+        self._retrying_jobs.add(job)
+        timer = threading.Timer(delay, self._requeue_job, args=(job,))
+        timer.daemon = True
+        timer.start()
+
+    def _requeue_job(self, job):
+        self._retried_jobs.put(job)
+        self._events.put(None)
+
+    def _handle_failure(self, job):
+        if self.on_failure not in (FailurePolicy.CANCEL, FailurePolicy.TERMINATE) or self._cancelled:
+            return
+        self.logger.error('{j_id} failed, cancelling all jobs which have not started yet'.format(j_id=job.job_id()))
+        self._cancelled = True
+        if self.on_failure == FailurePolicy.TERMINATE:
+            for running_job in self._running_jobs:
+                self.logger.error('Terminating {j_id}'.format(j_id=running_job.job_id()))
+                self._terminated_jobs.add(running_job)
+                try:
+                    running_job.terminate()
+                except Exception as e:
+                    self.logger.exception('Unable to terminate {j_id}'.format(j_id=running_job.job_id()), exc_info=e)
+
+    def _submit_jobs(self):
+        self._skip_jobs()
+        index = 0
+        while index < len(self._pending_jobs) and len(self._running_jobs) < self.max_concurrent:
+            job = self._pending_jobs[index]
+            if not self._is_ready(job):
+                index += 1
+                continue
+            del self._pending_jobs[index]
+            self._submit_job(job)
+
+        if self._pending_jobs and not self._running_jobs and not self._retrying_jobs and \
+                not any(map(self._is_ready, self._pending_jobs)):
+            # Nothing is running and nothing can start, so the remaining jobs must have circular dependencies
+            for job in self._pending_jobs:
+                self.logger.error('{j_id} can never start because of a circular dependency'
+                                  .format(j_id=job.job_id()))
+                job.complete(JobStatus.ERROR)
+                self._finished_jobs[job] = JobStatus.ERROR
+            self._pending_jobs.clear()
+
+    def _submit_job(self, job):
+        job.concurrent_jobs = self.concurrent_jobs
+        try:
+            job.prepare(self.logger, worker_pool=self.worker_pool)
+            job.execute()
+        except Exception as e:
+            self.logger.exception('Unable to submit job {j_id}'.format(j_id=job.job_id()), exc_info=e)
+            if isinstance(e, OSError) and e.errno in TRANSIENT_ERRNOS and self._should_retry(job):
+                self._retry_job(job, 'could not be started')
+                return
+            job.complete(JobStatus.ERROR)
+            self._finished_jobs[job] = JobStatus.ERROR
+            self._handle_failure(job)
+            return
+        self._running_jobs.append(job)
+        threading.Thread(target=self._watch_job, args=(job,), daemon=True).start()
+
+    def _watch_job(self, job):
+        try:
+            job.wait()
+        except Exception as e:
+            self.logger.exception('Error while waiting for job {j_id}'.format(j_id=job.job_id()), exc_info=e)
+        self._events.put(job)
+
+    def _finish_job(self, job):
+        try:
+            job.update()
+            job_status = job.status()
+        except Exception as e:
+            self.logger.exception('Error while updating job status for {j_id}'.format(j_id=job.job_id()), exc_info=e)
+            job_status = JobStatus.ERROR
+        if job_status not in COMPLETE_STATUSES:
+            job_status = JobStatus.ERROR
+        if job in self._terminated_jobs:
+            job_status = JobStatus.CANCELLED
+        elif job_status == JobStatus.ERROR and job.is_transient_failure() and self._should_retry(job):
+            self._running_jobs.remove(job)
+            self._retry_job(job, 'failed with a transient error')
+            return
+
+        self.logger.info('{j_id} status: {status}'.format(j_id=job.job_id(), status=job_status))
+
+        try:
+            job.complete(job_status)
+        except Exception as e:
+            self.logger.exception('Unable to complete job {j_id}'.format(j_id=job.job_id()), exc_info=e)
+
+        self._running_jobs.remove(job)
+        self._finished_jobs[job] = job_status
+        if self.history is not None and job_status == JobStatus.SUCCESS and job.time_start and job.time_finish:
+            self.history.record(job.job_id(), job.time_finish - job.time_start)
+
+        if job_status == JobStatus.ERROR:
+            self._handle_failure(job)
+
+        self.logger.info('{njobs} jobs pending, {nrunning} jobs running'
+                         .format(njobs=len(self._pending_jobs), nrunning=len(self._running_jobs)))
+
+    def estimate_remaining_time(self) -> float:
+        """
+        Estimate how long the remaining jobs will take, as the larger of the remaining critical path and the remaining
+        work spread evenly across the job slots.
+        """
+        now = time.time()
+        running_left = [max(self._estimate_duration(job) - (now - (job.time_start or now)), 0.0)
+                        for job in list(self._running_jobs)]
+        pending_jobs = list(self._pending_jobs)
+        priorities = self._priorities
+        pending_work = sum(self._estimate_duration(job) for job in pending_jobs)
+        critical_path = max([priorities.get(job, 0.0) for job in pending_jobs] + running_left, default=0.0)
+        return max(critical_path, (sum(running_left) + pending_work) / self.max_concurrent)
 
     def wait(self):
-        time.sleep(2*JobRunner.RUNNER_SLEEP_TIME)  # To avoid an instantly-returning job locking things up
-        t = datetime.now()
-        while self._has_work:
-            delta = datetime.now() - t
-            if delta.seconds >= JobRunner.RUNNER_WAIT_REPORT_TIME:
-                self.logger.info('{njobs} jobs are still running. '
-                                 '{npending} jobs are pending in the current batch. '
-                                 '{nbatches} batches are waiting.'
-                                 .format(njobs=len(self._running_jobs), npending=self._current_batch.qsize(),
-                                         nbatches=self.batches.qsize()))
-                t = datetime.now()
-            time.sleep(JobRunner.RUNNER_WAIT_TIME)
+        while not self._idle.wait(timeout=JobRunner.RUNNER_WAIT_REPORT_TIME):
+            message = '{njobs} jobs are still running. {npending} jobs are waiting to start.'\
+                .format(njobs=len(self._running_jobs), npending=len(self._pending_jobs))
+            if self.history is not None:
+                message += ' About {:.0f}s remaining.'.format(self.estimate_remaining_time())
+            self.logger.info(message)
 
     def stop(self):
         if self._thread and self._running:
             self.logger.info('Stopping JobRunner...')
             self._running = False
+            self._events.put(None)
             self._thread.join(timeout=10.0)
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
+        if self.history is not None:
+            try:
+                self.history.save()
+            except OSError as e:
+                self.logger.warning('Unable to save job history to {}: {}'.format(self.history.path, e))
@@ -0,0 +1,270 @@
+import collections
+import json
+import os
+import pathlib
+import signal
+import socket
+import socketserver
+import threading
+import time
+import traceback
+import uuid
+
+from jobs.WorkerPool import WorkerPool
+from util.logs import setup_logger
+
+DAEMON_PROTOCOL_VERSION = 2
+# How long a cancel is kept for a munge request which hasn't arrived yet, and how many finished requests are remembered
+# so that cancels which arrive after them are ignored
+CANCEL_WAIT_TIME = 60.0
+NUM_FINISHED_REQUESTS = 1024
+
+
+def _send_message(file, message: dict):
+    file.write(json.dumps(message).encode('utf-8') + b'\n')
+    file.flush()
+
+
+def _recv_message(file):
+    line = file.readline()
+    if not line:
+        raise ConnectionError('The connection was closed before a message was received')
+    return json.loads(line.decode('utf-8'))
+
+
+def _check_owner(path: pathlib.Path):
+    """Refuse to use a socket, or a directory for one, which belongs to another user, who could be impersonating us."""
+    if hasattr(os, 'getuid') and path.stat().st_uid != os.getuid():
+        raise PermissionError('{} belongs to another user'.format(path))
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        munge_daemon = self.server.munge_daemon
+        try:
+            request = _recv_message(self.rfile)
+        except (ConnectionError, ValueError) as e:
+            munge_daemon.logger.warning('Ignoring malformed request: {}'.format(e))
+            return
+        response = munge_daemon.handle_request(request)
+        try:
+            _send_message(self.wfile, response)
+        except OSError:
+            pass
+
+
+# Windows has no Unix socket server, but MungeDaemon refuses to start there before this would ever be instantiated
+class _UnixServer(getattr(socketserver, 'ThreadingUnixStreamServer', socketserver.ThreadingTCPServer)):
+    daemon_threads = True
+
+    def __init__(self, socket_path, munge_daemon):
+        self.munge_daemon = munge_daemon
+        super().__init__(str(socket_path), _RequestHandler)
+
+
+class MungeDaemon:
+    """
+    A resident process which runs munge requests in a pool of warm workers. Each worker imports the mungers once and
+    keeps whatever they cache (grammars, parse caches, file indexes) between requests, so that small munges don't pay
+    for interpreter startup and setup every time. Requests are accepted over a Unix socket; see DaemonClient.
+    """
+    def __init__(self, socket_path: pathlib.Path, num_workers: int):
+        self.socket_path = pathlib.Path(socket_path)
+        self.logger = setup_logger('MungeDaemon')
+        self.worker_pool = WorkerPool(num_workers)
+        self.server = None
+        self._num_requests = 0
+        self._lock = threading.Lock()
+        # By request id: the processes of the munge requests being run, the times of cancels for requests which haven't
+        # arrived yet, and the most recently finished requests
+        self._processes = dict()
+        self._cancelled_requests = dict()
+        self._finished_requests = collections.OrderedDict()
+
+    def handle_request(self, request: dict) -> dict:
+        command = request.get('command')
+        if command == 'ping':
+            return dict(ok=True, version=DAEMON_PROTOCOL_VERSION, pid=os.getpid(), num_workers=self.worker_pool.size)
+        if command == 'shutdown':
+            self.logger.info('Shutdown requested')
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return dict(ok=True)
+        if command == 'cancel':
+            return self.cancel_request(request.get('request_id'))
+        if command != 'munge':
+            return dict(ok=False, error='Unknown command {}'.format(command))
+
+        request_id = request.get('request_id')
+        with self._lock:
+            self._num_requests += 1
+            request_num = self._num_requests
+        try:
+            # Checked for a cancel and registered in one go, so that a cancel either finds the process or stops it
+            # from ever being submitted
+            with self._lock:
+                if self._cancelled_requests.pop(request_id, None) is not None:
+                    process = None
+                else:
+                    process = self.worker_pool.submit(request['task'], request['args'], request['env'],
+                                                      request['log_file_path'], cwd=request.get('cwd'))
+                    if request_id is not None:
+                        self._processes[request_id] = process
+            if process is None:
+                self.logger.info('Request {n} was cancelled before it started'.format(n=request_num))
+                return dict(ok=True, returncode=-signal.SIGTERM, resource_usage=None)
+            self.logger.info('Request {n}: {task} {args}'.format(n=request_num, task=request['task'],
+                                                                 args=' '.join(request['args'])))
+            returncode = process.wait()
+        except Exception as e:
+            self.logger.exception('Request {n} failed'.format(n=request_num), exc_info=e)
+            return dict(ok=False, error=traceback.format_exc())
+        finally:
+            if request_id is not None:
+                with self._lock:
+                    self._processes.pop(request_id, None)
+                    self._finished_requests[request_id] = None
+                    while len(self._finished_requests) > NUM_FINISHED_REQUESTS:
+                        self._finished_requests.popitem(last=False)
+        self.logger.info('Request {n} finished with exit status {rc}'.format(n=request_num, rc=returncode))
+        return dict(ok=True, returncode=returncode, resource_usage=process.resource_usage)
+
+    def cancel_request(self, request_id) -> dict:
+        """Terminate the job of a munge request, or make sure it never starts if it hasn't arrived yet."""
+        if request_id is None:
+            return dict(ok=False, error='No request id to cancel')
+        now = time.monotonic()
+        with self._lock:
+            # Cancels of requests which never arrived, e.g. because their client died, are dropped eventually
+            for cancelled_id, cancel_time in list(self._cancelled_requests.items()):
+                if now - cancel_time > CANCEL_WAIT_TIME:
+                    del self._cancelled_requests[cancelled_id]
+            process = self._processes.get(request_id)
+            if process is None and request_id not in self._finished_requests:
+                self._cancelled_requests[request_id] = now
+        if process is not None:
+            self.logger.info('Cancelling request {}'.format(request_id))
+            process.terminate()
+        return dict(ok=True)
+
+    def serve_forever(self):
+        if not hasattr(socket, 'AF_UNIX'):
+            raise OSError('The munge daemon requires Unix domain sockets, which this platform does not support')
+        if self.socket_path.exists():
+            if DaemonClient(self.socket_path).ping():
+                raise OSError('A munge daemon is already listening on {}'.format(self.socket_path))
+            self.socket_path.unlink()  # Left behind by a daemon which did not shut down cleanly
+        self.socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        _check_owner(self.socket_path.parent)
+
+        # Only the user may connect, from the moment the socket is bound
+        previous_umask = os.umask(0o177)
+        try:
+            self.server = _UnixServer(self.socket_path, self)
+        finally:
+            os.umask(previous_umask)
+        previous_sigterm_handler = signal.signal(signal.SIGTERM, lambda *_: threading.Thread(
+            target=self.server.shutdown, daemon=True).start())
+        self.logger.info('Listening on {} with up to {} workers'.format(self.socket_path, self.worker_pool.size))
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            signal.signal(signal.SIGTERM, previous_sigterm_handler)
+            self.logger.info('Stopping...')
+            self.server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+            self.worker_pool.shutdown()
+
+
+class DaemonProcess:
+    """A handle to a job running in a MungeDaemon, exposing the subset of the Popen interface used by jobs."""
+    def __init__(self, client, message: dict):
+        self.returncode = None
+        self.resource_usage = None
+        self.pid = None
+        self._client = client
+        self._message = message
+        self._finished = threading.Event()
+
+    def _run(self):
+        try:
+            response = self._client.request(self._message)
+            if not response.get('ok'):
+                raise RuntimeError(response.get('error'))
+            self.returncode = response['returncode']
+            self.resource_usage = response.get('resource_usage')
+        except Exception:
+            # The job's output goes to its log file, so that's where the reason for the failure should go too
+            with open(self._message['log_file_path'], 'a') as log_file:
+                log_file.write('Unable to run job in the munge daemon at {}:\n{}'
+                               .format(self._client.socket_path, traceback.format_exc()))
+            self.returncode = 1
+        self._finished.set()
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self, timeout=None):
+        self._finished.wait(timeout=timeout)
+        return self.returncode
+
+    def terminate(self):
+        if self.returncode is None:
+            self._client.cancel(self._message['request_id'])
+
+    kill = terminate
+
+
+class DaemonClient:
+    """
+    Sends munge requests to a MungeDaemon. It has the same submit() interface as WorkerPool, so it can stand in for
+    one in a JobRunner.
+    """
+    def __init__(self, socket_path: pathlib.Path, timeout=None):
+        self.socket_path = pathlib.Path(socket_path)
+        self.timeout = timeout
+        # The number of workers of the daemon, like WorkerPool.size, once ping() has learnt it
+        self.size = None
+
+    def request(self, message: dict) -> dict:
+        _check_owner(self.socket_path)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(str(self.socket_path))
+            with sock.makefile('rwb') as f:
+                _send_message(f, message)
+                return _recv_message(f)
+
+    def ping(self) -> bool:
+        try:
+            response = DaemonClient(self.socket_path, timeout=5.0).request(dict(command='ping'))
+        except (OSError, ValueError, ConnectionError):
+            return False
+        self.size = response.get('num_workers')
+        return response.get('ok', False)
+
+    def cancel(self, request_id: str) -> bool:
+        """Ask the daemon to terminate the job of a munge request sent by submit()."""
+        try:
+            return DaemonClient(self.socket_path, timeout=5.0).request(
+                dict(command='cancel', request_id=request_id)).get('ok', False)
+        except (OSError, ValueError, ConnectionError):
+            return False
+
+    def shutdown_daemon(self) -> bool:
+        try:
+            return DaemonClient(self.socket_path, timeout=5.0).request(dict(command='shutdown')).get('ok', False)
+        except (OSError, ValueError, ConnectionError):
+            return False
+
+    def submit(self, task: str, args: list, env: dict, log_file_path, cwd=None) -> DaemonProcess:
+        message = dict(command='munge', request_id=uuid.uuid4().hex, task=task, args=list(args), env=dict(env),
+                       log_file_path=str(log_file_path), cwd=str(cwd if cwd is not None else os.getcwd()))
+        process = DaemonProcess(self, message)
+        threading.Thread(target=process._run, daemon=True).start()
+        return process
+
+    def shutdown(self, timeout=None):
+        # The daemon outlives its clients, so there is nothing to shut down
+        ...
@@ -1,16 +1,75 @@
+import copy
+import json
 import pathlib
 import re
+import time
 from abc import ABC
 
 from jobs.JobBase import JobBase
+from mungers.MungerBase import MungerBaseConfig
+from mungers.util.FileIndex import get_file_index
 
 JOB_ID_REMOVE_INPUT_FILE_CHARS_RE = re.compile(r'[^\dA-Za-z_-]')
+# Characters with a special meaning in input file patterns, so that a path containing them can't be used as a pattern
+INPUT_PATTERN_SPECIAL_CHARS_RE = re.compile(r'^\$|[*?]')
 
 
 class MungeJob(JobBase, ABC):
+    # Whether each input file is munged into outputs of its own, so that the job can be split into shards of input files
+    shardable = False
+
     def __init__(self, input_files: list, source_dir, project_dir, platform):
         super().__init__(source_dir, project_dir, platform)
         self.input_files = input_files
+        self.shard = None
+        self.stats_file_path = None
+        self.stats = None
+
+    def job_id(self):
+        job_id = self.get_unsharded_job_id()
+        if self.shard is None:
+            return job_id
+        return '{}_shard{}of{}'.format(job_id, *self.shard)
+
+    def get_unsharded_job_id(self):
+        return super().job_id()
+
+    def count_input_files(self) -> int:
+        """Count the input files the munger will find, using the same pattern matching as the munger."""
+        if not self.source_dir.is_dir():
+            return 0
+        return len(get_file_index(self.source_dir).find_input_files(self.source_dir, self.input_files))
+
+    def get_watch_patterns(self) -> list:
+        """Get the input file patterns of every file whose changes affect the output of the job."""
+        return list(self.input_files)
+
+    def narrow(self, input_files: list):
+        """
+        Get a copy of the job which only munges the given input files (relative to the source directory), or None if the
+        job can't be narrowed down because its input files aren't munged separately.
+        """
+        if not self.shardable or self.shard is not None:
+            return None
+        input_files = [pathlib.PurePath(input_file).as_posix() for input_file in input_files]
+        if not input_files or any(INPUT_PATTERN_SPECIAL_CHARS_RE.search(input_file) for input_file in input_files):
+            return None
+        narrowed = copy.copy(self)
+        narrowed.dependencies = list(self.dependencies)
+        narrowed.input_files = input_files
+        return narrowed
+
+    def split(self, num_shards: int) -> list:
+        """Split the job into shards, each munging every num_shards-th input file. Returns [self] if it can't be."""
+        if not self.shardable or self.shard is not None or num_shards <= 1:
+            return [self]
+        shards = []
+        for index in range(1, num_shards + 1):
+            shard = copy.copy(self)
+            shard.dependencies = list(self.dependencies)
+            shard.shard = (index, num_shards)
+            shards.append(shard)
+        return shards
 
     def get_executable_path(self):
         return pathlib.Path(self.config.cwd, 'run-munger').with_suffix('.py')
@@ -20,10 +79,45 @@ class MungeJob(JobBase, ABC):
         name_prefix = self.__class__.__name__.replace(job, '')
         return name_prefix if name_prefix else job
 
-    def build_cli_args(self) -> list:
-        cli_args = super().build_cli_args()
-        cli_args.extend(['--input-files'] + self.input_files)
-        return cli_args
+    def build_task_args(self) -> list:
+        task_args = super().build_task_args()
+        task_args.extend(['--input-files'] + self.input_files)
+        if self.shard is not None:
+            task_args.extend(['--shard', '{}/{}'.format(*self.shard)])
+        return task_args
+
+    def build_env(self) -> dict:
+        env = super().build_env()
+        if self.stats_file_path is not None:
+            env[MungerBaseConfig(self.get_task()).get_option_as_env_var('stats_file')] = str(self.stats_file_path)
+        return env
+
+    def prepare(self, job_runner_log, worker_pool=None):
+        super().prepare(job_runner_log, worker_pool=worker_pool)
+        self.stats = None
+        self.stats_file_path = self.log_file_path.with_name('{j_id}.stats.json'.format(j_id=self.job_id()))
+        if self.stats_file_path.exists():
+            self.stats_file_path.unlink()
+
+    def update(self):
+        if self.stats is not None or self.stats_file_path is None:
+            return
+        try:
+            with self.stats_file_path.open('r') as f:
+                self.stats = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.stats_file_path.unlink(missing_ok=True)
+
+    def execute(self):
+        if self.worker_pool is None:
+            super().execute()
+            return
+        self.time_start = time.time()
+        task, *task_args = self.build_task_args()
+        self.runner_log.info('{j_id} args: {task} {args} (pooled)'.format(j_id=self.job_id(), task=task,
+                                                                         args=' '.join(task_args)))
+        self.process = self.worker_pool.submit(task, task_args, self.build_env(), self.log_file_path)
 
     def __str__(self):
         return self._get_name_prefix()
@@ -41,8 +135,8 @@ class ConfigMungeJob(MungeJob):
         self.extension = extension
         self.chunk_id = chunk_id
 
-    def job_id(self):
-        base_job_id = super().job_id()
+    def get_unsharded_job_id(self):
+        base_job_id = super().get_unsharded_job_id()
         clean_input_files = [re.sub(JOB_ID_REMOVE_INPUT_FILE_CHARS_RE, '_', str(f)) for f in self.input_files]
         input_files_str = '_'.join(clean_input_files)
         input_files_deduped = re.sub(r'(_)\1+', '\\1', input_files_str)  # De-duplicate underscores
@@ -51,17 +145,17 @@ class ConfigMungeJob(MungeJob):
             input_files_stripped += f'_{self.output_file.lower()}'
         return f'{base_job_id}_{input_files_stripped}'
 
-    def build_cli_args(self) -> list:
-        cli_args = super().build_cli_args()
+    def build_task_args(self) -> list:
+        task_args = super().build_task_args()
         if self.hash_strings:
-            cli_args.extend(['--hash-strings'])
+            task_args.extend(['--hash-strings'])
         if self.output_file is not None:
-            cli_args.extend(['--output-file', self.output_file])
+            task_args.extend(['--output-file', self.output_file])
         if self.extension is not None:
-            cli_args.extend(['--extension', self.extension])
+            task_args.extend(['--extension', self.extension])
         if self.chunk_id is not None:
-            cli_args.extend(['--chunk-id', self.chunk_id])
-        return cli_args
+            task_args.extend(['--chunk-id', self.chunk_id])
+        return task_args
 
     @staticmethod
     def get_task():
@@ -69,6 +163,8 @@ class ConfigMungeJob(MungeJob):
 
 
 class OdfMungeJob(MungeJob):
+    shardable = True
+
     @staticmethod
     def get_task():
         return 'odf'
@@ -81,12 +177,18 @@ class PlanningMungeJob(MungeJob):
 
 
 class WorldMungeJob(MungeJob):
+    shardable = True
+
     @staticmethod
     def get_task():
         return 'world'
 
-    def job_id(self):
-        base_job_id = super().job_id()
+    def get_watch_patterns(self) -> list:
+        # Worlds and layers include the region, hint and barrier files next to them
+        return super().get_watch_patterns() + ['$*.rgn', '$*.hnt', '$*.bar']
+
+    def get_unsharded_job_id(self):
+        base_job_id = super().get_unsharded_job_id()
         clean_input_files = [re.sub(JOB_ID_REMOVE_INPUT_FILE_CHARS_RE, '_', str(f)) for f in self.input_files]
         input_files_str = '_'.join(clean_input_files)
         input_files_deduped = re.sub(r'(_)\1+', '\\1', input_files_str)  # De-duplicate underscores
@@ -0,0 +1,112 @@
+import json
+import pathlib
+
+from util.constants import OPENMUNGE_VERSION
+from util.file_util import atomic_write
+
+STATS_KEYS = ('input_files', 'input_bytes', 'output_files', 'output_bytes', 'cached', 'parsed_files', 'parse_time')
+
+
+class RunReport:
+    """
+    A summary of where the time went in a run: per-job timings, resource usage and input/output sizes. It can be
+    written out as JSON, or as a Chrome trace to be opened with chrome://tracing or https://ui.perfetto.dev.
+    """
+    def __init__(self, finished_jobs: dict, time_start: float, time_finish: float):
+        self.time_start = time_start
+        self.time_finish = time_finish
+        self.jobs = [self.get_job_record(job, status) for job, status in finished_jobs.items()]
+        self.jobs.sort(key=lambda record: (record['time_start'] or record['time_finish'] or 0.0, record['job_id']))
+
+    @staticmethod
+    def get_job_record(job, status) -> dict:
+        def elapsed(start, finish):
+            return finish - start if start is not None and finish is not None else None
+
+        record = dict(job_id=job.job_id(),
+                      task=str(job.get_task()),
+                      status=getattr(status, 'value', str(status)),
+                      dependencies=[dependency.job_id() for dependency in job.dependencies],
+                      time_submit=job.time_submit,
+                      time_start=job.time_start,
+                      time_finish=job.time_finish,
+                      queued=elapsed(job.time_submit, job.time_start),
+                      duration=elapsed(job.time_start, job.time_finish),
+                      cpu_time=job.cpu_time,
+                      max_rss=job.max_rss)
+        stats = getattr(job, 'stats', None) or {}
+        for key in STATS_KEYS:
+            record[key] = stats.get(key)
+        return record
+
+    def get_summary(self) -> dict:
+        def total(key):
+            return sum(record[key] or 0 for record in self.jobs)
+
+        status_counts = dict()
+        for record in self.jobs:
+            status_counts[record['status']] = status_counts.get(record['status'], 0) + 1
+
+        return dict(version=OPENMUNGE_VERSION,
+                    time_start=self.time_start,
+                    time_finish=self.time_finish,
+                    wall_time=self.time_finish - self.time_start,
+                    jobs=len(self.jobs),
+                    statuses=status_counts,
+                    job_time=total('duration'),
+                    cpu_time=total('cpu_time'),
+                    max_rss=max((record['max_rss'] or 0 for record in self.jobs), default=0),
+                    input_bytes=total('input_bytes'),
+                    output_bytes=total('output_bytes'),
+                    parse_time=total('parse_time'),
+                    cached_jobs=sum(1 for record in self.jobs if record['cached']))
+
+    def get_slowest_jobs(self, n=5) -> list:
+        timed_jobs = [record for record in self.jobs if record['duration'] is not None]
+        return sorted(timed_jobs, key=lambda record: record['duration'], reverse=True)[:n]
+
+    def to_dict(self) -> dict:
+        return dict(summary=self.get_summary(), jobs=self.jobs)
+
+    def to_chrome_trace(self) -> dict:
+        """
+        Convert the report to the Chrome trace event format. Jobs are laid out on as few rows as possible without
+        overlapping, so that the rows show how busy the job slots were over the course of the run.
+        """
+        events = []
+        row_free_times = []
+        for record in self.jobs:
+            if record['time_start'] is None or record['time_finish'] is None:
+                continue
+            for row, free_time in enumerate(row_free_times):
+                if free_time <= record['time_start']:
+                    row_free_times[row] = record['time_finish']
+                    break
+            else:
+                row = len(row_free_times)
+                row_free_times.append(record['time_finish'])
+            args = {key: record[key] for key in ('status', 'queued', 'cpu_time', 'max_rss') + STATS_KEYS}
+            events.append(dict(name=record['job_id'],
+                               cat=record['task'],
+                               ph='X',
+                               ts=(record['time_start'] - self.time_start) * 1e6,
+                               dur=(record['time_finish'] - record['time_start']) * 1e6,
+                               pid=1,
+                               tid=row + 1,
+                               args=args))
+        events.append(dict(name='process_name', ph='M', pid=1, args=dict(name='openmunge')))
+        for row in range(len(row_free_times)):
+            events.append(dict(name='thread_name', ph='M', pid=1, tid=row + 1,
+                               args=dict(name='Slot {}'.format(row + 1))))
+        return dict(traceEvents=events, displayTimeUnit='ms')
+
+    @staticmethod
+    def _write_json(path: pathlib.Path, data: dict):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, json.dumps(data, indent=2))
+
+    def write_json(self, path: pathlib.Path):
+        self._write_json(path, self.to_dict())
+
+    def write_chrome_trace(self, path: pathlib.Path):
+        self._write_json(path, self.to_chrome_trace())
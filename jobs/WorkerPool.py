@@ -0,0 +1,253 @@
+import importlib
+import multiprocessing
+import os
+import pkgutil
+import queue
+import sys
+import threading
+import traceback
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+MUNGER_MODULE_SUFFIX = 'Munge'
+
+
+def _import_mungers():
+    """Import every munger module up front so that jobs only pay for munger init and start."""
+    import mungers
+    for module_info in pkgutil.iter_modules(mungers.__path__):
+        if module_info.name.endswith(MUNGER_MODULE_SUFFIX):
+            importlib.import_module('mungers.{}'.format(module_info.name))
+
+
+def run_munge_task(task: str, args: list, env: dict, log_file_path: str, cwd=None) -> int:
+    """
+    Run a single munger in the current process, the same way run-munger.py would, with stdout and stderr redirected to
+    the given log file. Returns the exit status that run-munger.py would have exited with.
+    """
+    from core.config import reset_global_config
+    from mungers.util.FileIndex import clear_shared_file_indexes
+    from mungers.util.ReqDatabase import ReqDatabase
+
+    munger_name = '{}Munge'.format(task.capitalize())
+    mod = importlib.import_module('mungers.{}'.format(munger_name))
+    munger_cls = getattr(mod, munger_name)
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_stdout_fd = os.dup(1)
+    saved_stderr_fd = os.dup(2)
+    saved_argv = sys.argv
+    saved_cwd = os.getcwd()
+    with open(log_file_path, 'a') as log_file:
+        os.dup2(log_file.fileno(), 1)
+        os.dup2(log_file.fileno(), 2)
+        try:
+            # Every job gets a fresh view of the environment, config and requirements db, as a new process would
+            os.environ.clear()
+            os.environ.update(env)
+            if cwd is not None:
+                os.chdir(cwd)
+            sys.argv = ['run-munger.py', task] + list(args)
+            reset_global_config()
+            ReqDatabase().clear()
+            clear_shared_file_indexes()
+
+            munger = munger_cls()
+            munger.init(args=list(args))
+            munger.start()
+            returncode = 0
+        except SystemExit as e:
+            if e.code is None:
+                returncode = 0
+            elif isinstance(e.code, int):
+                returncode = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                returncode = 1
+        except BaseException:
+            traceback.print_exc()
+            returncode = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            sys.argv = saved_argv
+            os.chdir(saved_cwd)
+            os.dup2(saved_stdout_fd, 1)
+            os.dup2(saved_stderr_fd, 2)
+            os.close(saved_stdout_fd)
+            os.close(saved_stderr_fd)
+    return returncode
+
+
+def get_resource_usage():
+    """Get the CPU time (in seconds) and peak RSS (in bytes) of the current process, or None if unsupported."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return dict(cpu_time=usage.ru_utime + usage.ru_stime, max_rss=max_rss_to_bytes(usage.ru_maxrss))
+
+
+def max_rss_to_bytes(max_rss: int) -> int:
+    # ru_maxrss is in bytes on macOS but in kilobytes everywhere else
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def _worker_main(conn):
+    _import_mungers()
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+        usage_before = get_resource_usage()
+        returncode = run_munge_task(*message)
+        usage_after = get_resource_usage()
+        usage = None
+        if usage_before is not None and usage_after is not None:
+            # Peak RSS can only be measured for the worker as a whole, across every job it has run so far
+            usage = dict(cpu_time=usage_after['cpu_time'] - usage_before['cpu_time'],
+                         max_rss=usage_after['max_rss'])
+        try:
+            conn.send((returncode, usage))
+        except (BrokenPipeError, OSError):
+            break
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        # Not a daemon process, so that mungers remain free to start processes of their own
+        self.process = context.Process(target=_worker_main, args=(child_conn,), name='MungeWorker')
+        self.process.start()
+        child_conn.close()
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def run(self, message) -> tuple:
+        """Run a job in the worker, returning its exit status and resource usage (which may be None)."""
+        self.conn.send(message)
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError):
+            # The worker died part-way through the job, so report it the same way Popen would
+            self.process.join()
+            exitcode = self.process.exitcode
+            return (exitcode if exitcode else 1), None
+
+    def terminate(self):
+        if self.process.is_alive():
+            self.process.terminate()
+
+    def stop(self, timeout=None):
+        if self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=timeout)
+            self.terminate()
+        self.conn.close()
+
+
+class PooledProcess:
+    """A handle to a job running in a WorkerPool, exposing the subset of the subprocess.Popen interface used by jobs."""
+    def __init__(self, pool, message):
+        self.returncode = None
+        self.resource_usage = None
+        self._pool = pool
+        self._message = message
+        self._worker = None
+        self._finished = threading.Event()
+
+    @property
+    def pid(self):
+        return self._worker.pid if self._worker is not None else None
+
+    def _run(self):
+        try:
+            self._worker = self._pool.acquire_worker()
+            returncode, self.resource_usage = self._worker.run(self._message)
+            self._pool.release_worker(self._worker)
+        except Exception:
+            traceback.print_exc()
+            returncode = 1
+        self.returncode = returncode
+        self._finished.set()
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self, timeout=None):
+        self._finished.wait(timeout=timeout)
+        return self.returncode
+
+    def terminate(self):
+        if self._worker is not None:
+            self._worker.terminate()
+
+    kill = terminate
+
+
+class WorkerPool:
+    """
+    A pool of long-lived worker processes which run munge jobs in-process, so that interpreter startup, imports and
+    parser construction are paid once per worker rather than once per job. Workers are started lazily, up to size.
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self._context = multiprocessing.get_context('spawn')
+        self._lock = threading.Lock()
+        self._idle = queue.Queue()
+        self._workers = []
+        self._closed = False
+
+    def submit(self, task: str, args: list, env: dict, log_file_path, cwd=None) -> PooledProcess:
+        process = PooledProcess(self, (task, list(args), dict(env), str(log_file_path),
+                                       str(cwd) if cwd is not None else None))
+        threading.Thread(target=process._run, daemon=True).start()
+        return process
+
+    def acquire_worker(self) -> _Worker:
+        with self._lock:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            if len(self._workers) < self.size:
+                worker = _Worker(self._context)
+                self._workers.append(worker)
+                return worker
+        return self._idle.get()
+
+    def release_worker(self, worker: _Worker):
+        with self._lock:
+            if worker.is_alive():
+                self._idle.put(worker)
+                return
+            # The worker died or was terminated, so replace it in case somebody is already waiting for an idle one
+            worker.stop()
+            self._workers.remove(worker)
+            if self._closed:
+                return
+            replacement = _Worker(self._context)
+            self._workers.append(replacement)
+            self._idle.put(replacement)
+
+    def shutdown(self, timeout=10.0):
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop(timeout=timeout)
@@ -1,5 +1,7 @@
-from jobs.BatchJob import WorldBatchJob, CommonBatchJob, SideBatchJob, LocalizeBatchJob
+from jobs.BatchJob import BatchJob, WorldBatchJob, CommonBatchJob, SideBatchJob, LocalizeBatchJob
+from jobs.MungeJob import MungeJob
 from core.config import get_global_config
+from mungers.util.FileIndex import get_subdirectories
 from util.constants import MUNGE_ALL
 
 
@@ -19,21 +21,22 @@ def get_side_jobs(args) -> list:
     sides_dir = args.project_dir / 'Sides'
 
     if args.sides[0] == MUNGE_ALL:
-        source_dirs = sorted(x.absolute() for x in sides_dir.iterdir() if x.is_dir())
-        for source_dir in source_dirs:
-            if source_dir.name == 'Common':
-                # Common must come first if applicable
-                jobs = [SideBatchJob(source_dir, args.project_dir, args.platform)] + jobs
-                continue
-            jobs.append(SideBatchJob(source_dir, args.project_dir, args.platform))
-        return jobs
+        source_dirs = [x.absolute() for x in get_subdirectories(sides_dir) if x.name != 'Common']
+    else:
+        source_dirs = [x.absolute() for x in get_subdirectories(sides_dir) if x.name.upper() in args.sides and
+                       x.name != 'Common']
 
-    source_dirs = sorted(x.absolute() for x in sides_dir.iterdir() if x.name.upper() in args.sides)
+    # Every other side depends on Sides/Common if applicable
     common_sides_dir = sides_dir / 'Common'
-    if common_sides_dir.exists():
-        jobs = [SideBatchJob(common_sides_dir.absolute(), args.project_dir, args.platform)]
+    common_job = None
+    if common_sides_dir.is_dir():
+        common_job = SideBatchJob(common_sides_dir.absolute(), args.project_dir, args.platform)
+        jobs.append(common_job)
     for source_dir in source_dirs:
-        jobs.append(SideBatchJob(source_dir, args.project_dir, args.platform))
+        job = SideBatchJob(source_dir, args.project_dir, args.platform)
+        if common_job is not None:
+            job.depends_on(common_job)
+        jobs.append(job)
 
     return jobs
 
@@ -43,47 +46,103 @@ def get_world_jobs(args) -> list:
     worlds_dir = args.project_dir / 'Worlds'
 
     if args.worlds[0] == MUNGE_ALL:
-        source_dirs = sorted(x.absolute() for x in worlds_dir.iterdir() if x.is_dir())
-        for source_dir in source_dirs:
-            if source_dir.name == 'Common':
-                # Common must come first if applicable
-                jobs = [WorldBatchJob(source_dir, args.project_dir, args.platform)] + jobs
-                continue
-            jobs.append(WorldBatchJob(source_dir, args.project_dir, args.platform))
-        return jobs
+        source_dirs = [x.absolute() for x in get_subdirectories(worlds_dir) if x.name != 'Common']
+    else:
+        source_dirs = [x.absolute() for x in get_subdirectories(worlds_dir) if x.name.upper() in args.worlds and
+                       x.name != 'Common']
 
-    source_dirs = sorted(x.absolute() for x in worlds_dir.iterdir() if x.name.upper() in args.worlds)
+    # Every other world depends on Worlds/Common if applicable
     common_world_dir = worlds_dir / 'Common'
-    if common_world_dir.exists():
-        jobs = [WorldBatchJob(common_world_dir.absolute(), args.project_dir, args.platform)]
+    common_job = None
+    if common_world_dir.is_dir():
+        common_job = WorldBatchJob(common_world_dir.absolute(), args.project_dir, args.platform)
+        jobs.append(common_job)
     for source_dir in source_dirs:
-        jobs.append(WorldBatchJob(source_dir, args.project_dir, args.platform))
+        job = WorldBatchJob(source_dir, args.project_dir, args.platform)
+        if common_job is not None:
+            job.depends_on(common_job)
+        jobs.append(job)
 
     return jobs
 
 
-def get_work_batches() -> list:
+def get_work_jobs() -> list:
+    """
+    Get every job needed for the munge described by the global config. Ordering constraints between jobs are declared
+    as job dependencies, so that the returned jobs can all be handed to a JobRunner at once.
+    """
     args = get_global_config()
 
-    batches = []
+    jobs = []
 
     if args.common:
-        batches.append(get_common_jobs(args))
+        jobs.extend(get_common_jobs(args))
 
-    side_jobs = []
     if args.sides:
-        side_jobs = get_side_jobs(args)
+        jobs.extend(get_side_jobs(args))
 
-    world_jobs = []
     if args.worlds:
-        world_jobs = get_world_jobs(args)
+        jobs.extend(get_world_jobs(args))
 
-    if side_jobs and world_jobs:
-        batches.append(side_jobs + world_jobs)
-    elif side_jobs:
-        batches.append(side_jobs)
-    elif world_jobs:
-        batches.append(world_jobs)
+    return jobs
+
+
+def replace_jobs(jobs: list, replacements: dict) -> list:
+    """
+    Replace jobs with the lists of jobs given for them in replacements, keeping the dependency graph intact: anything
+    which depended on a replaced job depends on all of its replacements instead, and the replacements depend on
+    everything the replaced job depended on.
+    """
+    def resolve(dependencies):
+        resolved = []
+        for dependency in dependencies:
+            resolved.extend(replacements.get(dependency, [dependency]))
+        return resolved
+
+    new_jobs = []
+    for job in jobs:
+        if job in replacements:
+            dependencies = resolve(job.dependencies)
+            for new_job in replacements[job]:
+                new_job.dependencies = resolve(new_job.dependencies)
+                new_job.depends_on(*dependencies)
+                new_jobs.append(new_job)
+        else:
+            job.dependencies = resolve(job.dependencies)
+            new_jobs.append(job)
+
+    return new_jobs
+
+
+def flatten_jobs(jobs: list) -> list:
+    """
+    Replace every batch job with the munge jobs its batch script would run, so that the whole munge shares a single job
+    runner and therefore a single concurrency limit. Batch jobs without a batch script are left as they are.
+    """
+    expanded = dict()
+    for job in jobs:
+        if isinstance(job, BatchJob):
+            sub_jobs = job.expand()
+            if sub_jobs is not None:
+                expanded[job] = sub_jobs
+
+    return replace_jobs(jobs, expanded)
+
+
+def shard_jobs(jobs: list, files_per_shard: int, max_shards: int) -> list:
+    """
+    Split munge jobs with per-file outputs into shards of at least files_per_shard input files each, up to max_shards,
+    so that a job with many input files can use more than one core. A files_per_shard of 0 disables sharding.
+    """
+    if files_per_shard <= 0 or max_shards <= 1:
+        return jobs
 
-    return batches
+    sharded = dict()
+    for job in jobs:
+        if not isinstance(job, MungeJob) or not job.shardable:
+            continue
+        num_shards = min(job.count_input_files() // files_per_shard, max_shards)
+        if num_shards > 1:
+            sharded[job] = job.split(num_shards)
 
+    return replace_jobs(jobs, sharded)
@@ -0,0 +1,215 @@
+import errno
+import pathlib
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+from core.config import setup_global_config
+from jobs.JobBase import JobBase
+from jobs.JobHistory import JobHistory
+from jobs.JobRunner import JobRunner, JobStatus
+from jobs.WorkerPool import WorkerPool
+from util.constants import FailurePolicy, EXIT_TRANSIENT_FAILURE, JobExecutor
+
+
+class FakeProcess:
+    def __init__(self, returncode):
+        self.returncode = None
+        self._returncode = returncode
+        self._finished = threading.Event()
+
+    def finish(self):
+        self.returncode = self._returncode
+        self._finished.set()
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self, timeout=None):
+        self._finished.wait(timeout=timeout)
+        return self.returncode
+
+
+class FakeJob(JobBase):
+    def __init__(self, name, order, returncode=0):
+        super().__init__(pathlib.Path(name), pathlib.Path('project'), 'pc')
+        self.name = name
+        self.order = order
+        # Either one exit status for every attempt, or a list with one per attempt
+        self.returncodes = returncode if isinstance(returncode, list) else None
+        self.returncode = returncode
+        self.final_status = None
+        self.start_times = []
+        # The number of attempts which fail to start, as if the system had run out of processes
+        self.failed_starts = 0
+
+    def get_executable_path(self):
+        ...
+
+    @staticmethod
+    def get_task():
+        return 'fake'
+
+    def _get_name_prefix(self):
+        return 'Fake'
+
+    def job_id(self):
+        return self.name
+
+    def prepare(self, job_runner_log, worker_pool=None):
+        self.runner_log = job_runner_log
+        self.attempts += 1
+        if self.returncodes is not None:
+            self.returncode = self.returncodes[self.attempts - 1]
+
+    def execute(self):
+        # Record the start, then finish straight away; the runner only learns of it through wait()
+        self.order.append(self.name)
+        self.time_start = time.time()
+        self.start_times.append(self.time_start)
+        if self.attempts <= self.failed_starts:
+            raise OSError(errno.EAGAIN, 'Resource temporarily unavailable')
+        self.process = FakeProcess(self.returncode)
+        self.process.finish()
+
+    def complete(self, status):
+        self.time_finish = time.time()
+        self.final_status = status
+
+
+class JobRunnerTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        setup_global_config(Mock())
+        self.order = []
+
+    def run_jobs(self, jobs, max_concurrent=1, history=None, **kwargs):
+        runner = JobRunner(max_concurrent=max_concurrent, history=history, **kwargs)
+        runner.add_jobs(jobs)
+        try:
+            runner.start()
+            runner.wait()
+        finally:
+            runner.stop()
+        return runner
+
+    def test_dependencies_run_first(self):
+        common = FakeJob('common', self.order)
+        side_a = FakeJob('a', self.order).depends_on(common)
+        side_b = FakeJob('b', self.order).depends_on(common)
+        world = FakeJob('world', self.order).depends_on(side_a, side_b)
+        self.run_jobs([world, side_b, side_a, common])
+        self.assertEqual(self.order, ['common', 'a', 'b', 'world'])
+        for job in (common, side_a, side_b, world):
+            self.assertEqual(job.final_status, JobStatus.SUCCESS)
+
+    def test_unlisted_dependency_is_added(self):
+        common = FakeJob('common', self.order)
+        side = FakeJob('side', self.order).depends_on(common)
+        self.run_jobs([side], max_concurrent=4)
+        self.assertEqual(self.order, ['common', 'side'])
+
+    def test_independent_jobs_keep_order(self):
+        jobs = [FakeJob(name, self.order) for name in 'abcd']
+        self.run_jobs(jobs)
+        self.assertEqual(self.order, list('abcd'))
+        self.assertEqual([job.concurrent_jobs for job in jobs], [1] * 4)
+
+    def test_failed_job_status(self):
+        job = FakeJob('bad', self.order, returncode=1)
+        self.run_jobs([job])
+        self.assertEqual(job.final_status, JobStatus.ERROR)
+
+    def test_circular_dependency_fails(self):
+        first = FakeJob('first', self.order)
+        second = FakeJob('second', self.order).depends_on(first)
+        first.depends_on(second)
+        self.run_jobs([first, second])
+        self.assertEqual(self.order, [])
+        self.assertEqual(first.final_status, JobStatus.ERROR)
+        self.assertEqual(second.final_status, JobStatus.ERROR)
+
+    def test_longest_chains_start_first(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            history = JobHistory(pathlib.Path(temp_dir) / 'job_history.json')
+            for name, duration in (('short', 1.0), ('long', 10.0), ('medium', 3.0), ('after_short', 20.0)):
+                history.record(name, duration)
+            short = FakeJob('short', self.order)
+            after_short = FakeJob('after_short', self.order).depends_on(short)
+            self.run_jobs([FakeJob('medium', self.order), FakeJob('long', self.order), short, after_short],
+                          history=history)
+            self.assertEqual(self.order, ['short', 'after_short', 'long', 'medium'])
+
+            # Finished jobs update their recorded durations, which survive a reload
+            history.save()
+            reloaded = JobHistory(history.path)
+            self.assertEqual(set(reloaded.durations), {'short', 'long', 'medium', 'after_short'})
+            self.assertLess(reloaded.estimate('long'), 10.0)
+            self.assertEqual(reloaded.estimate('unknown'), sum(reloaded.durations.values()) / 4)
+
+    def test_continue_after_failure(self):
+        bad = FakeJob('bad', self.order, returncode=1)
+        after = FakeJob('after', self.order).depends_on(bad)
+        runner = self.run_jobs([bad, after], on_failure=FailurePolicy.CONTINUE)
+        self.assertEqual(self.order, ['bad', 'after'])
+        self.assertEqual(runner.failed_jobs, {bad: JobStatus.ERROR})
+
+    def test_skip_dependants(self):
+        bad = FakeJob('bad', self.order, returncode=1)
+        after = FakeJob('after', self.order).depends_on(bad)
+        after_after = FakeJob('after_after', self.order).depends_on(after)
+        other = FakeJob('other', self.order)
+        runner = self.run_jobs([bad, after, after_after, other], on_failure=FailurePolicy.SKIP)
+        self.assertEqual(self.order, ['bad', 'other'])
+        self.assertEqual(after.final_status, JobStatus.SKIPPED)
+        self.assertEqual(after_after.final_status, JobStatus.SKIPPED)
+        self.assertEqual(set(runner.failed_jobs), {bad, after, after_after})
+
+    def test_cancel_pending(self):
+        bad = FakeJob('bad', self.order, returncode=1)
+        other = FakeJob('other', self.order)
+        self.run_jobs([bad, other], on_failure=FailurePolicy.CANCEL)
+        self.assertEqual(self.order, ['bad'])
+        self.assertEqual(other.final_status, JobStatus.CANCELLED)
+
+    def test_retry_transient_failure(self):
+        flaky = FakeJob('flaky', self.order, returncode=[EXIT_TRANSIENT_FAILURE, 0])
+        self.run_jobs([flaky], max_retries=2, retry_delay=0.01)
+        self.assertEqual(self.order, ['flaky', 'flaky'])
+        self.assertEqual(flaky.final_status, JobStatus.SUCCESS)
+
+        # Retries are bounded, and other failures are not retried at all
+        self.order.clear()
+        broken = FakeJob('broken', self.order, returncode=[EXIT_TRANSIENT_FAILURE] * 3)
+        bad = FakeJob('bad', self.order, returncode=[1, 0])
+        self.run_jobs([broken, bad], max_retries=1, retry_delay=0.05)
+        # Other jobs are started while a failed one waits to be retried
+        self.assertEqual(self.order, ['broken', 'bad', 'broken'])
+        self.assertEqual(broken.final_status, JobStatus.ERROR)
+        self.assertEqual(bad.final_status, JobStatus.ERROR)
+
+    def test_retry_backoff(self):
+        unstartable = FakeJob('unstartable', self.order)
+        unstartable.failed_starts = 2
+        after = FakeJob('after', self.order).depends_on(unstartable)
+        self.run_jobs([unstartable, after], max_retries=2, retry_delay=0.05)
+        self.assertEqual(self.order, ['unstartable'] * 3 + ['after'])
+        self.assertEqual(unstartable.final_status, JobStatus.SUCCESS)
+        self.assertEqual(after.final_status, JobStatus.SUCCESS)
+        # Each retry waits twice as long as the one before it
+        first, second, third = unstartable.start_times
+        self.assertGreaterEqual(second - first, 0.05)
+        self.assertGreaterEqual(third - second, 0.1)
+
+    def test_daemon_fallback(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            runner = JobRunner(executor=JobExecutor.DAEMON, daemon_socket=pathlib.Path(temp_dir) / 'missing.sock')
+        try:
+            self.assertIsInstance(runner.worker_pool, WorkerPool)
+        finally:
+            runner.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
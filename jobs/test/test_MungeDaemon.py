@@ -0,0 +1,106 @@
+import pathlib
+import signal
+import threading
+import unittest
+
+from jobs.MungeDaemon import MungeDaemon, DaemonClient
+
+
+class FakePooledProcess:
+    def __init__(self):
+        self.returncode = None
+        self.resource_usage = None
+        self.started = threading.Event()
+        self._finished = threading.Event()
+
+    def wait(self, timeout=None):
+        self.started.set()
+        self._finished.wait(timeout=timeout)
+        return self.returncode
+
+    def terminate(self):
+        self.returncode = -signal.SIGTERM
+        self._finished.set()
+
+
+class FakeWorkerPool:
+    size = 1
+
+    def __init__(self):
+        self.processes = []
+        # Called as each request is submitted, e.g. to cancel it from another thread while it is being submitted
+        self.on_submit = None
+
+    def submit(self, task, args, env, log_file_path, cwd=None):
+        if self.on_submit is not None:
+            self.on_submit()
+        self.processes.append(FakePooledProcess())
+        return self.processes[-1]
+
+
+class FakeDaemonClient(DaemonClient):
+    """Hands requests straight to a daemon instead of sending them over its socket."""
+    def __init__(self, munge_daemon):
+        super().__init__(pathlib.Path('unused.sock'))
+        self.munge_daemon = munge_daemon
+
+    def request(self, message: dict) -> dict:
+        return self.munge_daemon.handle_request(message)
+
+    def cancel(self, request_id: str) -> bool:
+        return self.request(dict(command='cancel', request_id=request_id)).get('ok', False)
+
+
+class MungeDaemonTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.munge_daemon = MungeDaemon(pathlib.Path('unused.sock'), 1)
+        self.munge_daemon.worker_pool = FakeWorkerPool()
+        self.client = FakeDaemonClient(self.munge_daemon)
+
+    def test_terminate_running_request(self):
+        process = self.client.submit('odf', [], {}, 'unused.log')
+        self.assertTrue(self.wait_for_worker_process().started.wait(timeout=5.0))
+        process.terminate()
+        self.assertEqual(process.wait(timeout=5.0), -signal.SIGTERM)
+
+    def test_cancel_before_request_arrives(self):
+        self.assertTrue(self.client.cancel('early'))
+        response = self.munge_daemon.handle_request(dict(command='munge', request_id='early', task='odf', args=[],
+                                                         env={}, log_file_path='unused.log'))
+        self.assertEqual(response['returncode'], -signal.SIGTERM)
+        self.assertEqual(self.munge_daemon.worker_pool.processes, [])
+
+    def test_cancel_while_submitting(self):
+        cancel_threads = []
+
+        def cancel_from_another_thread():
+            thread = threading.Thread(target=self.client.cancel, args=('racing',))
+            thread.start()
+            cancel_threads.append(thread)
+            # Give the cancel time to reach the daemon while the request is still being submitted
+            thread.join(timeout=0.1)
+
+        self.munge_daemon.worker_pool.on_submit = cancel_from_another_thread
+        response = self.munge_daemon.handle_request(dict(command='munge', request_id='racing', task='odf', args=[],
+                                                         env={}, log_file_path='unused.log'))
+        cancel_threads[0].join(timeout=5.0)
+        self.assertEqual(response['returncode'], -signal.SIGTERM)
+        self.assertEqual(self.munge_daemon._cancelled_requests, dict())
+
+    def test_cancel_after_request_finished(self):
+        process = self.client.submit('odf', [], {}, 'unused.log')
+        self.wait_for_worker_process().terminate()
+        process.wait(timeout=5.0)
+        self.assertTrue(self.client.cancel(process._message['request_id']))
+        self.assertEqual(self.munge_daemon._cancelled_requests, dict())
+
+    def wait_for_worker_process(self) -> FakePooledProcess:
+        for _ in range(500):
+            if self.munge_daemon.worker_pool.processes:
+                return self.munge_daemon.worker_pool.processes[0]
+            threading.Event().wait(0.01)
+        self.fail('The request never reached the worker pool')
+
+
+if __name__ == '__main__':
+    unittest.main()
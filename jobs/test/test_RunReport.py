@@ -0,0 +1,47 @@
+import unittest
+from unittest.mock import Mock
+
+from jobs.JobRunner import JobStatus
+from jobs.RunReport import RunReport
+
+
+def make_job(job_id, time_start, time_finish, stats=None, dependencies=()):
+    job = Mock(time_submit=0.0, time_start=time_start, time_finish=time_finish, cpu_time=0.5, max_rss=1024,
+               stats=stats, dependencies=list(dependencies))
+    job.job_id.return_value = job_id
+    job.get_task.return_value = 'odf'
+    return job
+
+
+class RunReportTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.job_a = make_job('a', 1.0, 3.0, stats=dict(input_bytes=10, output_bytes=20, cached=False,
+                                                        parse_time=0.25))
+        self.job_b = make_job('b', 1.5, 2.0, stats=dict(input_bytes=5, output_bytes=5, cached=True))
+        self.job_c = make_job('c', 3.0, 4.0, dependencies=[self.job_a])
+        finished_jobs = {self.job_c: JobStatus.ERROR, self.job_a: JobStatus.SUCCESS, self.job_b: JobStatus.SUCCESS}
+        self.report = RunReport(finished_jobs, 0.0, 5.0)
+
+    def test_summary(self):
+        summary = self.report.get_summary()
+        self.assertEqual(summary['jobs'], 3)
+        self.assertEqual(summary['statuses'], {'success': 2, 'error': 1})
+        self.assertEqual(summary['job_time'], 3.5)
+        self.assertEqual(summary['cpu_time'], 1.5)
+        self.assertEqual(summary['input_bytes'], 15)
+        self.assertEqual(summary['output_bytes'], 25)
+        self.assertEqual(summary['cached_jobs'], 1)
+        self.assertEqual(summary['parse_time'], 0.25)
+        self.assertEqual([record['job_id'] for record in self.report.jobs], ['a', 'b', 'c'])
+        self.assertEqual(self.report.jobs[2]['dependencies'], ['a'])
+        self.assertEqual([record['job_id'] for record in self.report.get_slowest_jobs(2)], ['a', 'c'])
+
+    def test_chrome_trace(self):
+        events = [event for event in self.report.to_chrome_trace()['traceEvents'] if event['ph'] == 'X']
+        self.assertEqual([(event['name'], event['tid']) for event in events], [('a', 1), ('b', 2), ('c', 1)])
+        self.assertEqual(events[0]['ts'], 1e6)
+        self.assertEqual(events[0]['dur'], 2e6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import pathlib
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from core.config import setup_global_config
+from jobs.BatchJob import BatchJob
+from jobs.MungeJob import OdfMungeJob, PlanningMungeJob
+from jobs.batching import flatten_jobs, shard_jobs
+
+
+class FakeBatchJob(BatchJob):
+    def __init__(self, name, sub_job_names=None):
+        super().__init__(pathlib.Path(name), pathlib.Path('project'), 'pc')
+        self.sub_job_names = sub_job_names
+
+    @staticmethod
+    def get_task():
+        return 'fake'
+
+    def expand(self):
+        if self.sub_job_names is None:
+            return None
+        return [OdfMungeJob([name], self.source_dir, self.project_dir, self.platform) for name in self.sub_job_names]
+
+
+class BatchingTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        setup_global_config(Mock())
+
+    def test_flatten_jobs(self):
+        common = FakeBatchJob('Common', ['a', 'b'])
+        side = FakeBatchJob('IMP', ['c']).depends_on(common)
+        localize = FakeBatchJob('Localize')
+        other = FakeBatchJob('Other').depends_on(side)
+        flat_jobs = flatten_jobs([common, side, localize, other])
+
+        self.assertEqual([job.input_files[0] if isinstance(job, OdfMungeJob) else job for job in flat_jobs],
+                         ['a', 'b', 'c', localize, other])
+        job_a, job_b, job_c = flat_jobs[:3]
+        self.assertEqual(job_a.dependencies, [])
+        self.assertEqual(job_c.dependencies, [job_a, job_b])
+        self.assertEqual(other.dependencies, [job_c])
+
+    def test_shard_jobs(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source_dir = pathlib.Path(temp_dir)
+            for i in range(5):
+                (source_dir / 'unit{}.odf'.format(i)).touch()
+                (source_dir / 'plan{}.pln'.format(i)).touch()
+            base_args = (source_dir, pathlib.Path('project'), 'pc')
+            common = FakeBatchJob('Common')
+            odf = OdfMungeJob(['$*.odf'], *base_args).depends_on(common)
+            planning = PlanningMungeJob(['$*.pln'], *base_args)
+            after = FakeBatchJob('After').depends_on(odf)
+
+            self.assertEqual(shard_jobs([common, odf, planning, after], 0, 4), [common, odf, planning, after])
+            self.assertEqual(shard_jobs([common, odf, planning, after], 10, 4), [common, odf, planning, after])
+
+            sharded = shard_jobs([common, odf, planning, after], 2, 4)
+            shards = sharded[1:3]
+            self.assertEqual(sharded, [common] + shards + [planning, after])
+            self.assertEqual([shard.shard for shard in shards], [(1, 2), (2, 2)])
+            self.assertEqual([shard.build_task_args()[-2:] for shard in shards],
+                             [['--shard', '1/2'], ['--shard', '2/2']])
+            self.assertEqual(shards[0].job_id(), odf.job_id() + '_shard1of2')
+            self.assertEqual(shards[1].dependencies, [common])
+            self.assertEqual(after.dependencies, shards)
+
+
+if __name__ == '__main__':
+    unittest.main()
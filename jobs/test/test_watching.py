@@ -0,0 +1,81 @@
+import pathlib
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from core.config import setup_global_config
+from jobs.MungeJob import OdfMungeJob, ConfigMungeJob, WorldMungeJob
+from jobs.watching import get_changed_files, get_changed_jobs
+from mungers.util.FileIndex import FileIndex
+
+
+class WatchingTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        setup_global_config(Mock())
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.temp_dir.name)
+        for rel_path in ('Sides/REP/odf/rep_inf.odf', 'Sides/REP/odf/rep_walk.odf', 'Sides/REP/effects/a.fx',
+                         'Worlds/ABC/world1/ABC.wld', 'Worlds/ABC/world1/ABC.rgn'):
+            self.write(rel_path, 'original')
+        self.file_index = FileIndex.scan(self.root)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def write(self, rel_path, content):
+        path = self.root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+    def get_jobs(self):
+        side_dir = self.root / 'Sides' / 'REP'
+        world_dir = self.root / 'Worlds' / 'ABC'
+        layer_job = WorldMungeJob(['$*.lyr'], world_dir, self.root, 'pc')
+        return [OdfMungeJob(['$*.odf'], side_dir, self.root, 'pc'),
+                ConfigMungeJob(['effects/*.fx'], side_dir, self.root, 'pc'),
+                layer_job,
+                WorldMungeJob(['$*.wld'], world_dir, self.root, 'pc').depends_on(layer_job)]
+
+    def test_get_changed_files(self):
+        self.write('Sides/REP/odf/rep_inf.odf', 'changed')
+        self.write('Sides/REP/odf/rep_new.odf', 'new')
+        (self.root / 'Sides' / 'REP' / 'effects' / 'a.fx').unlink()
+        new_index = FileIndex.scan(self.root)
+        self.assertEqual(get_changed_files(self.file_index, new_index),
+                         {'Sides/REP/odf/rep_inf.odf', 'Sides/REP/odf/rep_new.odf', 'Sides/REP/effects/a.fx'})
+        self.assertEqual(get_changed_files(new_index, new_index), set())
+
+    def test_changed_input_narrows_job(self):
+        self.write('Sides/REP/odf/rep_walk.odf', 'changed')
+        changed_jobs = get_changed_jobs(self.get_jobs(), FileIndex.scan(self.root), {'Sides/REP/odf/rep_walk.odf'})
+        self.assertEqual(len(changed_jobs), 1)
+        self.assertIsInstance(changed_jobs[0], OdfMungeJob)
+        self.assertEqual(changed_jobs[0].input_files, ['odf/rep_walk.odf'])
+
+    def test_changed_input_of_job_that_cannot_be_narrowed(self):
+        changed_jobs = get_changed_jobs(self.get_jobs(), self.file_index, {'Sides/REP/effects/a.fx'})
+        self.assertEqual([job.input_files for job in changed_jobs], [['effects/*.fx']])
+
+    def test_removed_input_reruns_whole_job(self):
+        (self.root / 'Sides' / 'REP' / 'odf' / 'rep_walk.odf').unlink()
+        changed_jobs = get_changed_jobs(self.get_jobs(), FileIndex.scan(self.root), {'Sides/REP/odf/rep_walk.odf'})
+        self.assertEqual([job.input_files for job in changed_jobs], [['$*.odf']])
+
+    def test_changed_include_reruns_world_jobs(self):
+        changed_jobs = get_changed_jobs(self.get_jobs(), self.file_index, {'Worlds/ABC/world1/ABC.rgn'})
+        self.assertEqual([job.input_files for job in changed_jobs], [['$*.lyr'], ['$*.wld']])
+        layer_job, world_job = changed_jobs
+        self.assertEqual(world_job.dependencies, [layer_job])
+
+    def test_dependencies_on_unchanged_jobs_are_dropped(self):
+        changed_jobs = get_changed_jobs(self.get_jobs(), self.file_index, {'Worlds/ABC/world1/ABC.wld'})
+        self.assertEqual(len(changed_jobs), 1)
+        self.assertEqual(changed_jobs[0].input_files, ['world1/ABC.wld'])
+        self.assertEqual(changed_jobs[0].dependencies, [])
+
+    def test_unrelated_changes(self):
+        self.assertEqual(get_changed_jobs(self.get_jobs(), self.file_index, {'Sides/REP/notes.txt'}), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
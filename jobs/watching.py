@@ -0,0 +1,72 @@
+import time
+
+from jobs.MungeJob import MungeJob
+from mungers.util.FileIndex import FileIndex
+from util.input_patterns import compile_input_patterns
+
+
+def get_changed_files(old_index: FileIndex, new_index: FileIndex) -> set:
+    """Get the paths, relative to the index root, of every file added, modified or removed between two indexes."""
+    old_files = {entry.path: (entry.size, entry.mtime) for entry in old_index.entries}
+    new_files = {entry.path: (entry.size, entry.mtime) for entry in new_index.entries}
+    changed = {path for path, stat in new_files.items() if old_files.get(path) != stat}
+    changed.update(path for path in old_files if path not in new_files)
+    return changed
+
+
+def watch_changes(file_index: FileIndex, interval: float):
+    """
+    Poll the tree covered by file_index for changes, yielding (new index, changed paths) once changes stop arriving.
+    Saves usually come in bursts (an editor writing several files, or one file in several steps), so nothing is
+    yielded until a poll finds no further changes.
+    """
+    while True:
+        time.sleep(interval)
+        new_index = FileIndex.scan(file_index.root, exclude=file_index.exclude)
+        if not get_changed_files(file_index, new_index):
+            continue
+        while True:
+            time.sleep(interval)
+            settled_index = FileIndex.scan(file_index.root, exclude=file_index.exclude)
+            if not get_changed_files(new_index, settled_index):
+                break
+            new_index = settled_index
+        # Compare against the last index yielded, so that files which changed and then changed back are left out
+        changed = get_changed_files(file_index, new_index)
+        if changed:
+            yield new_index, changed
+        file_index = new_index
+
+
+def get_changed_jobs(jobs: list, file_index: FileIndex, changed_files: set) -> list:
+    """
+    Select the munge jobs whose input files are among changed_files (paths relative to the root of file_index). Jobs
+    which munge each input file separately are narrowed down to only the changed files where possible. Dependencies on
+    jobs that were not selected are dropped, since their outputs are already up to date.
+    """
+    indexed_paths = {entry.path for entry in file_index.entries}
+
+    selected = dict()
+    for job in jobs:
+        if not isinstance(job, MungeJob):
+            continue
+        prefix = file_index.get_prefix(job.source_dir)
+        if prefix is None:
+            continue
+        changed_under_source = [path[len(prefix):] for path in changed_files if path.startswith(prefix)]
+        input_regex = compile_input_patterns(job.input_files)
+        watch_regex = compile_input_patterns(job.get_watch_patterns())
+        changed_inputs = [path for path in changed_under_source if input_regex.fullmatch(path)]
+        changed_includes = [path for path in changed_under_source
+                            if not input_regex.fullmatch(path) and watch_regex.fullmatch(path)]
+        if not changed_inputs and not changed_includes:
+            continue
+        narrowed = None
+        # Removed inputs and changed includes can't be traced back to the input files they affect
+        if not changed_includes and all(prefix + path in indexed_paths for path in changed_inputs):
+            narrowed = job.narrow(sorted(changed_inputs))
+        selected[job] = narrowed if narrowed is not None else job
+
+    for job in selected.values():
+        job.dependencies = [selected[dependency] for dependency in job.dependencies if dependency in selected]
+    return list(selected.values())
@@ -3,7 +3,7 @@ import pathlib
 from mungers.MungerBase import MungerBase
 from mungers.ast.ConfigDoc import ConfigDoc
 from mungers.chunks.Chunk import Chunk
-from mungers.parsers.ConfigParser import ConfigParser
+from mungers.chunks.config_writer import write_instance
 from mungers.parsers.ParserOptions import ParserOptions
 from mungers.util.ReqDatabase import ReqDatabase
 from core.config import Config
@@ -52,33 +52,33 @@ class ConfigMunge(MungerBase):
         else:
             extension = '.config'
 
-        parser_options = ParserOptions(document_cls=ConfigDoc)
-        config_parser = ConfigParser(parser_options)
-        self.logger.info('Parsing {} input files'.format(len(self.input_files)))
-        file_parse_data_map = {input_file: config_parser.parse_file(input_file) for input_file in self.input_files}
-
-        with Chunk('ucfb') as root:
-            for file_path, config in file_parse_data_map.items():
-                self.logger.info('Munging {file}...'.format(file=file_path))
-                config_name = file_path.stem
-                config.chunk_id = self.config.chunk_id
-                config.config_name = config_name
-                with root.open(inst=config):
-                    with config.open('NAME') as name:
-                        name.write_bytes(config.config_name)
-                    for instance in config.instances:
-                        instance.to_binary(config)
-
         root_config_file_name = pathlib.Path(output_name).with_suffix(extension)
         root_config_file_path = self.config.output_dir / root_config_file_name
 
-        with open(root_config_file_path, 'wb') as f:
-            num_written = f.write(root.binary)
-            self.logger.info('Wrote {nbytes} bytes to {path}'.format(nbytes=num_written, path=root_config_file_path))
+        parser_options = ParserOptions(document_cls=ConfigDoc)
+        config_parser = self.create_config_parser(parser_options)
+        self.logger.info('Munging {} input files'.format(len(self.input_files)))
+        # Each instance is written to the output file as soon as it has been parsed, so that only one of them is ever
+        # held in memory, however large the input files are
+        with self.open_output_file(root_config_file_path) as f:
+            with Chunk('ucfb').stream(f):
+                for file_path in self.input_files:
+                    self.logger.info('Munging {file}...'.format(file=file_path))
+                    config = ConfigDoc()
+                    config.chunk_id = self.config.chunk_id
+                    config.config_name = file_path.stem
+                    with config.stream(f):
+                        with config.open('NAME') as name:
+                            name.write_bytes(config.config_name)
+                        for instance in config_parser.iter_instances(file_path):
+                            write_instance(config, instance)
+                            config.flush(f)
+            num_written = f.tell()
+        self.logger.info('Wrote {nbytes} bytes to {path}'.format(nbytes=num_written, path=root_config_file_path))
 
         self.logger.info('Finished munging files. Writing output...')
         db = ReqDatabase()
 
         req_file_path = pathlib.Path(str(root_config_file_path) + '.req')
-        if db.write(req_file_path):
+        if self.write_req_file(db, req_file_path):
             self.logger.debug('Wrote requirements db to {}'.format(req_file_path))
@@ -174,7 +174,7 @@ class ModelMunge(MungerBase):
         extension = '.model'
 
         self.logger.info(f'Parsing {len(self.input_files)} input files')
-        file_parse_data_map = {input_file: parse_msh_file(input_file) for input_file in self.input_files}
+        file_parse_data_map = self.parse_files(self.input_files, parse_msh_file)
 
         for input_file, msh_data in file_parse_data_map.items():
             msh_name = input_file.stem
@@ -1,11 +1,22 @@
 import argparse
+import json
 import pathlib
 import sys
 from abc import abstractmethod
+from contextlib import contextmanager
 
 from core.ScriptBase import ScriptBase
 from core.config import Config
-from util.string_util import str_in_i
+from mungers.parsers.ConfigParser import ConfigParser
+from mungers.parsers.FastConfigParser import FastConfigParser
+from mungers.parsers.ParseCache import ParseCache, PARSE_CACHE_DIR_NAME
+from mungers.parsers.ParseStats import get_parse_stats
+from mungers.parsers.ParserOptions import ParserOptions
+from mungers.parsers.parse_pool import get_num_parse_processes, parse_all
+from mungers.util.BuildCache import BuildCache
+from mungers.util.FileIndex import get_file_index
+from util.arg_parsing import ShardArgumentType
+from util.constants import EXIT_TRANSIENT_FAILURE, TRANSIENT_ERRNOS, ParserEngine
 
 
 class MungerBaseConfig(Config):
@@ -18,6 +29,18 @@ class MungerBaseConfig(Config):
                         alts=['-o'],
                         type=pathlib.Path,
                         help='The location where fully munged files will be placed.')
+        self.add_option('shard',
+                        metavar='INDEX/COUNT',
+                        type=ShardArgumentType(),
+                        show_in_cfg=False,
+                        help='If specified, only munge every COUNT-th input file, starting from the INDEX-th '
+                             '(1-based). Running all COUNT shards produces the same output as running without '
+                             'sharding.')
+        self.add_option('stats_file',
+                        type=pathlib.Path,
+                        show_in_cfg=False,
+                        help='If specified, write the number and total size of the input and output files to this '
+                             'location as JSON once munging is done.')
 
 
 class MungerBase(ScriptBase):
@@ -27,6 +50,8 @@ class MungerBase(ScriptBase):
     def __init__(self, name):
         super().__init__(name)
         self.input_files = []
+        self.output_files = []
+        self.parse_cache = None
         self._display_help = False
 
     def create_base_args(self):
@@ -41,7 +66,8 @@ class MungerBase(ScriptBase):
                            required=True,
                            help='A set of files in SOURCE_DIR to be used as munge inputs. Can use a wildcard * pattern '
                                 'but ensure args using the wildcard are wrapped in quotes. Prefix any arg with $ to '
-                                'perform recursive search for matching files in the subdirectories of SOURCE_DIR.')
+                                'perform recursive search for matching files in the subdirectories of SOURCE_DIR. '
+                                'Matching is case-insensitive.')
         group.add_argument('-H', '--hash-strings',
                            action='store_true',
                            help='When specified, hash strings as magic numbers in the munged files.')
@@ -52,27 +78,131 @@ class MungerBase(ScriptBase):
         return base_config
 
     def get_input_files(self):
-        all_source_files = self.config.source_dir.glob('**/*')
-        result = []
-        for input_file_pattern in self.config.input_files:
-            result.extend([file for file in all_source_files if str_in_i(file.suffix, input_file_pattern) and
-                           file.is_file()])
+        file_index = get_file_index(self.config.source_dir, index_path=self.config.file_index)
+        result = sorted(file_index.find_input_files(self.config.source_dir, self.config.input_files))
+        if self.config.shard is not None:
+            index, count = self.config.shard
+            result = result[index - 1::count]
         str_result = list(map(str, result))
         self.logger.debug('Input files:\n\t- {}'.format('\n\t- '.join(str_result)))
-        return sorted(result)
+        return result
+
+    def get_dependency_files(self) -> list:
+        """
+        Get every file whose content affects the output of this munger. By default this is just the input files, but
+        mungers which read other files alongside their inputs should add those too.
+        """
+        return list(self.input_files)
+
+    def get_cache_options(self) -> dict:
+        """Get the options which affect the output of this munger, to be included in its build cache digest."""
+        return dict(platform=str(self.config.platform),
+                    args=list(self.job_args or []))
+
+    def get_parse_cache(self):
+        """Get the cache of parsed config files in the _BUILD directory of the project, or None if it is disabled."""
+        if self.parse_cache is None and self.config.parse_cache_size > 0 and self.config.project_dir is not None:
+            self.parse_cache = ParseCache(self.config.project_dir / '_BUILD' / PARSE_CACHE_DIR_NAME,
+                                          self.config.parse_cache_size * 2 ** 20)
+        return self.parse_cache
+
+    def create_config_parser(self, options: ParserOptions):
+        """Create a parser for config files with the engine chosen by the parser_engine option."""
+        if self.config.parser_engine == ParserEngine.PYPARSING:
+            return ConfigParser(options, parse_cache=self.get_parse_cache())
+        return FastConfigParser(options, parse_cache=self.get_parse_cache())
+
+    def parse_tasks(self, tasks: list) -> list:
+        """
+        Run a list of (parse, file) tasks, e.g. (parser.parse_file, input_file), returning their results in the same
+        order. Many or large files are parsed on a pool of processes, see the parse_processes option.
+        """
+        return parse_all(tasks, get_num_parse_processes(self.config.parse_processes, self.config.concurrent_jobs))
+
+    def parse_files(self, files: list, parse) -> dict:
+        """Parse each of the given files with parse(file), returning a dict of their results in the same order."""
+        return dict(zip(files, self.parse_tasks([(parse, file) for file in files])))
+
+    def write_output_file(self, path: pathlib.Path, data: bytes) -> int:
+        """Write a munged output file, recording it as an output of this munger. Returns the number of bytes written."""
+        with open(path, 'wb') as f:
+            num_written = f.write(data)
+        self.output_files.append(path)
+        return num_written
+
+    @contextmanager
+    def open_output_file(self, path: pathlib.Path):
+        """
+        Open a munged output file to be written piece by piece, recording it as an output of this munger once it is
+        complete. If writing it fails, the partial file is removed.
+        """
+        try:
+            with open(path, 'wb') as f:
+                yield f
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+        self.output_files.append(path)
+
+    def write_req_file(self, db, path: pathlib.Path) -> bool:
+        """Write a requirements db to a .req file, recording it as an output of this munger if anything was written."""
+        written = db.write(path)
+        if written:
+            self.output_files.append(path)
+        return bool(written)
+
+    def write_stats_file(self, output_files: list, cached=False):
+        if self.config.stats_file is None:
+            return
+
+        def total_size(files):
+            return sum(pathlib.Path(file).stat().st_size for file in files if pathlib.Path(file).is_file())
+
+        dependency_files = self.get_dependency_files()
+        stats = dict(input_files=len(dependency_files),
+                     input_bytes=total_size(dependency_files),
+                     output_files=len(output_files),
+                     output_bytes=total_size(output_files),
+                     cached=cached)
+        stats.update(get_parse_stats().to_dict())
+        with open(self.config.stats_file, 'w') as f:
+            json.dump(stats, f)
 
     def start(self):
         self.print_setup_info()
+        get_parse_stats().reset()
         try:
             self.input_files = self.get_input_files()
             if not self.input_files:
                 self.logger.info('No input files were found. Stopping...')
+                self.write_stats_file([])
                 return
             if not self.config.output_dir.exists():
                 self.config.output_dir.mkdir(parents=True)
+            build_cache = None
+            if self.config.build_cache:
+                build_cache = BuildCache(self.config.output_dir, self.name, self.get_cache_options())
+                if build_cache.is_up_to_date(self.get_dependency_files()):
+                    self.logger.info('Inputs and options are unchanged since the last run. Skipping...')
+                    self.write_stats_file(build_cache.outputs, cached=True)
+                    return
+                # A failed run may leave outputs half-written, so it must never be mistaken for an up-to-date one
+                build_cache.invalidate()
             self.run()
+            parse_stats = get_parse_stats()
+            if parse_stats.files or parse_stats.parse_cache_hits:
+                self.logger.info('Parsed {files} config files ({nbytes} bytes) in {time:.3f}s, loaded {hits} from the '
+                                 'parse cache'.format(files=parse_stats.files, nbytes=parse_stats.bytes,
+                                                      time=parse_stats.time, hits=parse_stats.parse_cache_hits))
+            if self.parse_cache is not None:
+                self.parse_cache.trim()
+            if build_cache is not None:
+                build_cache.store(self.output_files)
+            self.write_stats_file(self.output_files)
         except Exception as e:
             self.logger.exception('An error occurred while running {}.'.format(self.name), exc_info=e)
+            if isinstance(e, OSError) and e.errno in TRANSIENT_ERRNOS:
+                sys.exit(EXIT_TRANSIENT_FAILURE)
             sys.exit(1)
         self.logger.info('{} completed without errors.'.format(self.name))
 
@@ -1,16 +1,44 @@
 import pathlib
+from functools import lru_cache
 
-from core.util.hashing import magic
+from core.util.hashing import magic_many
 from mungers.MungerBase import MungerBase
 from mungers.chunks.Chunk import Chunk
+from mungers.parsers.FastOdfParser import FastOdfParser
 from mungers.parsers.OdfParser import OdfParser
 from mungers.util.ReqDatabase import ReqDatabase
+from util.constants import ParserEngine
 
 CLASS_KEY_STARTS_WITH = ('Class', 'ExplosionName', 'OrdnanceName', 'WeaponName')
 CLASS_KEY_CONTAINS = ('ODF',)
 MODEL_KEY_CONTAINS = ('Geometry',)
 CONFIG_KEY_CONTAINS = ('Effect',)
 TEXTURE_KEY_CONTAINS = ('Texture',)
+# The chunk each kind of class is written to, by the name of the section that declares it
+CLASS_SECTION_CHUNKS = (('WeaponClass', 'wpnc'), ('OrdnanceClass', 'ordc'), ('ExplosionClass', 'expc'))
+DEFAULT_CLASS_CHUNK = 'entc'
+KEY_SECTIONS_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=KEY_SECTIONS_CACHE_SIZE)
+def get_key_req_sections(key: str) -> tuple:
+    """Get the requirements db sections that the value of a property goes in, by its key."""
+    if key.startswith(CLASS_KEY_STARTS_WITH):
+        return 'class',
+    sections = []
+    for section, substrings in (('class', CLASS_KEY_CONTAINS), ('model', MODEL_KEY_CONTAINS),
+                                ('config', CONFIG_KEY_CONTAINS), ('texture', TEXTURE_KEY_CONTAINS)):
+        for substring in substrings:
+            if substring in key:
+                sections.append(section)
+    return tuple(sections)
+
+
+def get_class_chunk_name(odf_data: dict) -> str:
+    for section, chunk_name in CLASS_SECTION_CHUNKS:
+        if odf_data.get(section) is not None:
+            return chunk_name
+    return DEFAULT_CLASS_CHUNK
 
 
 class OdfMunge(MungerBase):
@@ -21,23 +49,15 @@ class OdfMunge(MungerBase):
         extension = '.class'
 
         self.logger.info('Parsing {} input files'.format(len(self.input_files)))
-        odf_parser = OdfParser()
-        file_parse_data_map = {input_file: odf_parser.parse_file(input_file) for input_file in self.input_files}
+        odf_parser = FastOdfParser() if self.config.parser_engine == ParserEngine.FAST else OdfParser()
+        file_parse_data_map = self.parse_files(self.input_files, odf_parser.parse_file)
 
         for file_path, odf_data in file_parse_data_map.items():
             db = ReqDatabase()
             self.logger.info('Munging {file}...'.format(file=file_path))
             odf_name = file_path.stem
             with Chunk('ucfb') as root:
-                if odf_data.get('WeaponClass') is not None:
-                    class_chunk_name = 'wpnc'
-                elif odf_data.get('OrdnanceClass') is not None:
-                    class_chunk_name = 'ordc'
-                elif odf_data.get('ExplosionClass') is not None:
-                    class_chunk_name = 'expc'
-                else:
-                    class_chunk_name = 'entc'
-                with root.open(class_chunk_name) as class_chunk:
+                with root.open(get_class_chunk_name(odf_data)) as class_chunk:
                     with class_chunk.open('BASE') as base:
                         class_name, req_parent = odf_data['__class_name']
                         base.write_str(class_name)
@@ -45,41 +65,25 @@ class OdfMunge(MungerBase):
                             db.get_section('class').append(class_name)
                     with class_chunk.open('TYPE') as type_:
                         type_.write_str(odf_name)
-                    for key, value in odf_data['Properties']:
+                    properties = odf_data['Properties']
+                    key_hashes = magic_many(key for key, _ in properties)
+                    for (key, value), key_hash in zip(properties, key_hashes):
                         with class_chunk.open('PROP') as prop:
-                            prop.write_bytes(magic(key))
+                            prop.write_bytes(key_hash)
                             prop.write_str(value)
-                        if key.startswith(CLASS_KEY_STARTS_WITH):
-                            db.get_section('class').append(value)
-                            continue
-                        for substring in CLASS_KEY_CONTAINS:
-                            if substring in key:
-                                db.get_section('class').append(value)
-                                continue
-                        for substring in MODEL_KEY_CONTAINS:
-                            if substring in key:
-                                db.get_section('model').append(value)
-                                continue
-                        for substring in CONFIG_KEY_CONTAINS:
-                            if substring in key:
-                                db.get_section('config').append(value)
-                                continue
-                        for substring in TEXTURE_KEY_CONTAINS:
-                            if substring in key:
-                                db.get_section('texture').append(value)
-                                continue
+                        for section in get_key_req_sections(key):
+                            db.get_section(section).append(value)
 
             output_file_name = pathlib.Path(odf_name).with_suffix(extension)
             output_file_path = self.config.output_dir / output_file_name
 
-            with open(output_file_path, 'wb') as f:
-                num_written = f.write(root.binary)
-                self.logger.info('Wrote {nbytes} bytes to {path}'.format(nbytes=num_written, path=output_file_path))
+            num_written = self.write_output_file(output_file_path, root.binary)
+            self.logger.info('Wrote {nbytes} bytes to {path}'.format(nbytes=num_written, path=output_file_path))
 
             self.logger.info('Finished munging files. Writing output...')
 
             req_file_path = pathlib.Path(str(output_file_path) + '.req')
-            if db.write(req_file_path):
+            if self.write_req_file(db, req_file_path):
                 self.logger.debug('Wrote requirements db to {}'.format(req_file_path))
             db.clear()  # Important so we don't write all the different odf data to the same db
 
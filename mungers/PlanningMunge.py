@@ -3,7 +3,6 @@ import pathlib
 from mungers.MungerBase import MungerBase
 from mungers.ast.PlanningDoc import PlanningDoc
 from mungers.chunks.Chunk import Chunk
-from mungers.parsers.ConfigParser import ConfigParser
 from mungers.parsers.ParserOptions import ParserOptions
 
 
@@ -16,9 +15,9 @@ class PlanningMunge(MungerBase):
         extension = '.congraph'
 
         parser_options = ParserOptions(document_cls=PlanningDoc)
-        config_parser = ConfigParser(parser_options)
+        config_parser = self.create_config_parser(parser_options)
         self.logger.info('Parsing {} input files'.format(len(self.input_files)))
-        file_parse_data_map = {input_file: config_parser.parse_file(input_file) for input_file in self.input_files}
+        file_parse_data_map = self.parse_files(self.input_files, config_parser.parse_file)
 
         for file_path, plan in file_parse_data_map.items():
             self.logger.info('Munging {file}...'.format(file=file_path))
@@ -38,9 +37,8 @@ class PlanningMunge(MungerBase):
             root_config_file_name = pathlib.Path(output_name).with_suffix(extension)
             root_config_file_path = self.config.output_dir / root_config_file_name
 
-            with open(root_config_file_path, 'wb') as f:
-                num_written = f.write(root.binary)
-                self.logger.info('Wrote {nbytes} bytes to {path}'
-                                 .format(nbytes=num_written, path=root_config_file_path))
+            num_written = self.write_output_file(root_config_file_path, root.binary)
+            self.logger.info('Wrote {nbytes} bytes to {path}'
+                             .format(nbytes=num_written, path=root_config_file_path))
 
             self.logger.info('Finished munging files.')
@@ -8,7 +8,6 @@ from mungers.ast.Region import Region
 from mungers.ast.WorldDoc import WorldDoc
 from mungers.chunks.Chunk import Chunk
 
-from mungers.parsers.ConfigParser import ConfigParser
 from mungers.parsers.ParserOptions import ParserOptions
 from mungers.util.ReqDatabase import ReqDatabase
 from util.string_util import str_in_i
@@ -43,30 +42,34 @@ class WorldMunge(MungerBase):
                 barrier_file = file
         return [region_file, hint_file, barrier_file]
 
+    def get_dependency_files(self) -> list:
+        dependency_files = super().get_dependency_files()
+        for input_file in self.input_files:
+            dependency_files.extend(x for x in self.get_included_files(input_file) if x is not None)
+        return dependency_files
+
     def run(self):
         extension = '.world'
 
         world_parser_options = ParserOptions(document_cls=WorldDoc,
                                              all_numbers_are_floats=False,
                                              all_values_are_strings=True)
-        world_parser = ConfigParser(world_parser_options)
+        world_parser = self.create_config_parser(world_parser_options)
 
         region_parser_options = ParserOptions(document_cls=GenericDoc,
-                                              all_numbers_are_floats=False)
-        region_parser = ConfigParser(region_parser_options)
+                                              all_numbers_are_floats=False,
+                                              all_values_are_strings=True)
+        region_parser = self.create_config_parser(region_parser_options)
 
         hint_parser_options = ParserOptions(document_cls=GenericDoc,
                                             all_numbers_are_floats=False,
                                             all_values_are_strings=True)
-        hint_parser = ConfigParser(hint_parser_options)
+        hint_parser = self.create_config_parser(hint_parser_options)
 
         barrier_parser_options = ParserOptions(document_cls=GenericDoc,
                                                all_numbers_are_floats=False,
-                                               all_values_are_strings=False)
-        barrier_parser = ConfigParser(barrier_parser_options)
-
-        self.logger.info('Parsing {} input files'.format(len(self.input_files)))
-        world_file_parse_data_map = {input_file: world_parser.parse_file(input_file) for input_file in self.input_files}
+                                               all_values_are_strings=True)
+        barrier_parser = self.create_config_parser(barrier_parser_options)
 
         self.logger.info('Searching for .bar, .rgn, and .hnt files')
         for input_file in self.input_files:
@@ -76,21 +79,32 @@ class WorldMunge(MungerBase):
         world_file_include_file_map = {input_file: tuple(self.get_included_files(input_file))
                                        for input_file in self.input_files}
 
+        # The world files and the files they include are parsed together, so that they can share a pool of processes
+        self.logger.info('Parsing {} input files'.format(len(self.input_files)))
+        include_parsers = (region_parser, hint_parser, barrier_parser)
+        parse_tasks = [(world_parser.parse_file, input_file) for input_file in self.input_files]
+        for include_files in world_file_include_file_map.values():
+            parse_tasks.extend((parser.parse_file, include_file)
+                               for parser, include_file in zip(include_parsers, include_files)
+                               if include_file is not None)
+        parse_results = iter(self.parse_tasks(parse_tasks))
+        world_file_parse_data_map = {input_file: next(parse_results) for input_file in self.input_files}
+
         for world_file, include_files in world_file_include_file_map.items():
             region_file, hint_file, barrier_file = include_files
             if region_file is not None:
-                self.logger.debug('Parsing region file {}'.format(region_file))
-                region_parse_data = region_parser.parse_file(region_file)
+                self.logger.debug('Parsed region file {}'.format(region_file))
+                region_parse_data = next(parse_results)
                 world_file_parse_data_map[world_file].regions = [x for x in region_parse_data.instances if
                                                                  isinstance(x, Region)]
             if hint_file is not None:
-                self.logger.debug('Parsing hint file {}'.format(hint_file))
-                hint_parse_data = hint_parser.parse_file(hint_file)
+                self.logger.debug('Parsed hint file {}'.format(hint_file))
+                hint_parse_data = next(parse_results)
                 world_file_parse_data_map[world_file].hints = [x for x in hint_parse_data.instances if
                                                                isinstance(x, Hint)]
             if barrier_file is not None:
-                self.logger.debug('Parsing barrier file {}'.format(barrier_file))
-                barrier_parse_data = barrier_parser.parse_file(barrier_file)
+                self.logger.debug('Parsed barrier file {}'.format(barrier_file))
+                barrier_parse_data = next(parse_results)
                 world_file_parse_data_map[world_file].barriers = [x for x in barrier_parse_data.instances if
                                                                   isinstance(x, Barrier)]
 
@@ -111,8 +125,8 @@ class WorldMunge(MungerBase):
                         info.write_int(len(world.regions))
                         info.write_int(len(world.instances))
                     for region in world.regions:
-                        with world.open(inst=region):
-                            with region.open('INFO') as info:
+                        with world.open('regn') as regn:
+                            with regn.open('INFO') as info:
                                 with info.open('TYPE') as type_:
                                     type_.write_str(region.region_type)
                                 with info.open('NAME') as name:
@@ -126,12 +140,12 @@ class WorldMunge(MungerBase):
                             for prop in region.body:
                                 if not str(prop.args[0]):
                                     continue
-                                with region.open(inst=prop):
-                                    prop.write_bytes(prop.name)
-                                    prop.write_str(prop.args[0])
+                                with regn.open('PROP') as prop_:
+                                    prop_.write_bytes(prop.name)
+                                    prop_.write_str(prop.args[0])
                     for instance in world.instances:
-                        with world.open(inst=instance):
-                            with instance.open('INFO') as info:
+                        with world.open('inst') as inst:
+                            with inst.open('INFO') as info:
                                 with info.open('TYPE') as type_:
                                     type_.write_str(instance.class_)
                                 with info.open('NAME') as name:
@@ -142,12 +156,12 @@ class WorldMunge(MungerBase):
                             for prop in instance.body:
                                 if not str(prop.args[0]):
                                     continue
-                                with instance.open(inst=prop):
-                                    prop.write_bytes(prop.name)
-                                    prop.write_str(prop.args[0])
+                                with inst.open('PROP') as prop_:
+                                    prop_.write_bytes(prop.name)
+                                    prop_.write_str(prop.args[0])
                     for hint in world.hints:
-                        with world.open(inst=hint):
-                            with hint.open('INFO') as info:
+                        with world.open('Hint') as hint_:
+                            with hint_.open('INFO') as info:
                                 with info.open('TYPE') as type_:
                                     type_.write_str(hint.hint_type)
                                 with info.open('NAME') as name:
@@ -158,12 +172,12 @@ class WorldMunge(MungerBase):
                             for prop in hint.body:
                                 if not str(prop.args[0]):
                                     continue
-                                with hint.open(inst=prop):
-                                    prop.write_bytes(prop.name)
-                                    prop.write_str(prop.args[0])
+                                with hint_.open('PROP') as prop_:
+                                    prop_.write_bytes(prop.name)
+                                    prop_.write_str(prop.args[0])
                     for barrier in world.barriers:
-                        with world.open(inst=barrier):
-                            with barrier.open('INFO') as info:
+                        with world.open('BARR') as barr:
+                            with barr.open('INFO') as info:
                                 with info.open('NAME') as name:
                                     name.write_str(barrier.barrier_name)
                                 with info.open('XFRM') as xfrm:
@@ -179,10 +193,9 @@ class WorldMunge(MungerBase):
             root_config_file_name = pathlib.Path(config_name).with_suffix(extension)
             root_config_file_path = self.config.output_dir / root_config_file_name
 
-            with open(root_config_file_path, 'wb') as f:
-                num_written = f.write(root.binary)
-                self.logger.info('Wrote {nbytes} bytes to {path}'
-                                 .format(nbytes=num_written, path=root_config_file_path))
+            num_written = self.write_output_file(root_config_file_path, root.binary)
+            self.logger.info('Wrote {nbytes} bytes to {path}'
+                             .format(nbytes=num_written, path=root_config_file_path))
 
             self.logger.info('Finished munging files. Writing output...')
             db = ReqDatabase()
@@ -195,5 +208,5 @@ class WorldMunge(MungerBase):
                 db.get_section('class').append(instance.get_class_name())
 
             req_file_path = pathlib.Path(str(root_config_file_path) + '.req')
-            if db.write(req_file_path):
+            if self.write_req_file(db, req_file_path):
                 self.logger.debug('Wrote requirements db to {}'.format(req_file_path))
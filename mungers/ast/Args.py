@@ -3,6 +3,8 @@ from abc import ABC, abstractmethod
 
 
 class Arg(ABC):
+    __slots__ = 'value', 'raw_value'
+
     def __init__(self, value):
         self.value = value
         super().__setattr__('raw_value', value)
@@ -18,6 +20,12 @@ class Arg(ABC):
             raise AttributeError('Modifying Arg.raw_value after construction is not allowed.')
         super().__setattr__(key, value)
 
+    def __setstate__(self, state):
+        # Unpickling would set raw_value through __setattr__
+        _, slots = state
+        for key, value in slots.items():
+            object.__setattr__(self, key, value)
+
     @abstractmethod
     def to_binary(self) -> bytes:
         ...
@@ -41,6 +49,8 @@ class NumberArgFactory:
 
 
 class IntArg(Arg):
+    __slots__ = ()
+
     def __init__(self, val):
         super().__init__(int(val))
 
@@ -57,6 +67,8 @@ class IntArg(Arg):
 
 
 class FloatArg(Arg):
+    __slots__ = ()
+
     def __init__(self, val):
         super().__init__(float(val))
 
@@ -76,6 +88,8 @@ class FloatArg(Arg):
 
 
 class StrArg(Arg):
+    __slots__ = ()
+
     def __init__(self, value):
         super().__init__(value)
         self.value = str(value)
@@ -1,15 +1,14 @@
-from core.util.hashing import magic
 from core.types.math import Vector3, Matrix33
-from mungers.chunks.Chunk import Chunk
+from mungers.ast.PropertyTable import PropertyTable
 
 
-class Barrier(Chunk):
-    CHILD_BLACKLIST = {magic(x) for x in ('Position', 'Rotation')}
+class Barrier:
+    __slots__ = ('name', 'args', 'body', 'barrier_name', 'flags', 'corners', 'rotation', 'position', 'size',
+                 'y_axis', 'side_0', 'side_1')
 
     def __init__(self):
-        super().__init__('BARR')
         self.name = None
-        self.args = []
+        self.args = ()
         self.body = None
         self.barrier_name = None
         self.flags = None
@@ -24,20 +23,29 @@ class Barrier(Chunk):
     def __str__(self):
         return 'Barrier({})'.format(self.barrier_name)
 
+    def _add_corner(self, prop):
+        coords = [float(arg) for arg in prop.args]
+        coords[1] = 0.0
+        self.corners.append(Vector3(*coords))
+
+    def _set_flags(self, prop):
+        self.flags = int(prop.args[0])
+
+    PROPERTIES = PropertyTable({'Corner': _add_corner,
+                                'Flag': _set_flags})
+
     @staticmethod
     def build(tok):
+        tok = tok[0]
+        return Barrier.from_parsed(tok.name, tok.args, tok.body.as_list() if tok.body else [])
+
+    @staticmethod
+    def from_parsed(name, args, body: list):
         inst = Barrier()
-        inst.name = tok[0].name
-        inst.barrier_name = tok[0].args[0]
+        inst.name = name
+        inst.barrier_name = args[0]
         inst.barrier_name.value = inst.barrier_name.value.lower()
-        body = tok[0].body.as_list() or []
-        for x in body:
-            if x.name == magic('Corner'):
-                coords = [float(arg) for arg in x.args]
-                coords[1] = 0.0
-                inst.corners.append(Vector3(*coords))
-            elif x.name == magic('Flag'):
-                inst.flags = int(x.args[0])
+        Barrier.PROPERTIES.route(inst, body)
         inst.setup_corners()
         return inst
 
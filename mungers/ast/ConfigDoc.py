@@ -23,6 +23,10 @@ class ConfigDoc(Chunk):
 
     @staticmethod
     def build(tok):
+        return ConfigDoc.from_instances(tok.as_list())
+
+    @staticmethod
+    def from_instances(instances: list):
         config = ConfigDoc()
-        config.instances = tok.as_list()
+        config.instances = instances
         return config
@@ -1,10 +1,13 @@
-from core.util.hashing import magic
+from mungers.ast.PropertyTable import PropertyTable
 from mungers.chunks.Chunk import Chunk
 
 CONNECTION_NAME_SIZE = 16
 
 
 class Connection:
+    __slots__ = ('name', 'connection_name', 'start_hub', 'end_hub', 'endpoints', 'flag', 'one_way', 'jump', 'jet_jump',
+                 'dynamic_group')
+
     def __init__(self):
         self.name = None
         self.connection_name = None
@@ -20,27 +23,46 @@ class Connection:
     def __str__(self):
         return 'Connection({})'.format(self.connection_name)
 
+    def _set_start_hub(self, prop):
+        self.start_hub = str(prop.args[0])
+
+    def _set_end_hub(self, prop):
+        self.end_hub = str(prop.args[0])
+
+    def _set_flag(self, prop):
+        self.flag = int(prop.args[0])
+
+    def _set_one_way(self, _prop):
+        self.one_way = True
+
+    def _set_jet_jump(self, _prop):
+        self.jet_jump = True
+
+    def _set_jump(self, _prop):
+        self.jump = True
+
+    def _set_dynamic_group(self, prop):
+        self.dynamic_group = int(prop.args[0])
+
+    PROPERTIES = PropertyTable({'Start': _set_start_hub,
+                                'End': _set_end_hub,
+                                'Flag': _set_flag,
+                                'OneWay': _set_one_way,
+                                'JetJump': _set_jet_jump,
+                                'Jump': _set_jump,
+                                'Dynamic': _set_dynamic_group})
+
     @staticmethod
     def build(tok):
+        tok = tok[0]
+        return Connection.from_parsed(tok.name, tok.args, tok.body.as_list() if tok.body else [])
+
+    @staticmethod
+    def from_parsed(name, args, body: list):
         inst = Connection()
-        inst.name = tok[0].name
-        inst.connection_name = tok[0].args[0]
-        body = tok[0].body.as_list() or []
-        for x in body:
-            if x.name == magic('Start'):
-                inst.start_hub = str(x.args[0])
-            elif x.name == magic('End'):
-                inst.end_hub = str(x.args[0])
-            elif x.name == magic('Flag'):
-                inst.flag = int(x.args[0])
-            elif x.name == magic('OneWay'):
-                inst.one_way = True
-            elif x.name == magic('JetJump'):
-                inst.jet_jump = True
-            elif x.name == magic('Jump'):
-                inst.jump = True
-            elif x.name == magic('Dynamic'):
-                inst.dynamic_group = int(x.args[0])
+        inst.name = name
+        inst.connection_name = args[0]
+        Connection.PROPERTIES.route(inst, body)
         return inst
 
     def to_binary(self, parent: Chunk):
@@ -4,6 +4,10 @@ class GenericDoc:
 
     @staticmethod
     def build(tok):
+        return GenericDoc.from_instances(tok.as_list())
+
+    @staticmethod
+    def from_instances(instances: list):
         doc = GenericDoc()
-        doc.instances = tok.as_list()
+        doc.instances = instances
         return doc
@@ -1,15 +1,13 @@
-from core.util.hashing import magic
 from core.util.math_util import mangle_quat, quat_to_rotation_matrix
-from mungers.chunks.Chunk import Chunk
+from mungers.ast.PropertyTable import PropertyTable
 
 
-class Hint(Chunk):
-    CHILD_BLACKLIST = {magic(x) for x in ('Position', 'Rotation')}
+class Hint:
+    __slots__ = 'name', 'args', 'body', 'hint_name', 'hint_type', 'rotation', 'position', 'size'
 
     def __init__(self):
-        super().__init__('Hint')
         self.name = None
-        self.args = []
+        self.args = ()
         self.body = None
         self.hint_name = None
         self.hint_type = None
@@ -20,21 +18,33 @@ class Hint(Chunk):
     def __str__(self):
         return 'Hint({})'.format(self.hint_name)
 
+    def _set_rotation(self, prop):
+        self.rotation = [float(arg) for arg in prop.args]
+
+    def _set_position(self, prop):
+        self.position = [float(arg) for arg in prop.args]
+
+    def _set_size(self, prop):
+        self.size = [float(arg) for arg in prop.args]
+
+    # Size is also written out as a property
+    PROPERTIES = PropertyTable({'Rotation': _set_rotation,
+                                'Position': _set_position,
+                                'Size': _set_size},
+                               blacklist=('Position', 'Rotation'))
+
     @staticmethod
     def build(tok):
+        tok = tok[0]
+        return Hint.from_parsed(tok.name, tok.args, tok.body.as_list() if tok.body else [])
+
+    @staticmethod
+    def from_parsed(name, args, body: list):
         inst = Hint()
-        inst.name = tok[0].name
-        inst.hint_name = tok[0].args[0]
-        inst.hint_type = tok[0].args[1]
-        body = tok[0].body.as_list() or []
-        for x in body:
-            if x.name == magic('Rotation'):
-                inst.rotation = [float(arg) for arg in x.args]
-            elif x.name == magic('Position'):
-                inst.position = [float(arg) for arg in x.args]
-            elif x.name == magic('Size'):
-                inst.size = [float(arg) for arg in x.args]
-        inst.body = [item for item in body if item.name not in Hint.CHILD_BLACKLIST]
+        inst.name = name
+        inst.hint_name = args[0]
+        inst.hint_type = args[1]
+        inst.body = Hint.PROPERTIES.route(inst, body)
         return inst
 
     def get_transform(self):
@@ -1,7 +1,7 @@
 from collections import defaultdict
 
 from core.types.math import Vector3
-from core.util.hashing import magic
+from mungers.ast.PropertyTable import PropertyTable
 from mungers.chunks.Chunk import Chunk
 
 HUB_MAX_ARCS = 8
@@ -10,6 +10,8 @@ NUM_TYPES = 5
 
 
 class Hub:
+    __slots__ = 'name', 'hub_name', 'position', 'radius'
+
     def __init__(self):
         self.name = None
         self.hub_name = None
@@ -19,18 +21,27 @@ class Hub:
     def __str__(self):
         return 'Hub({})'.format(self.hub_name)
 
+    def _set_position(self, prop):
+        self.position = Vector3(*[float(arg) for arg in prop.args])
+        self.position.z *= -1
+
+    def _set_radius(self, prop):
+        self.radius = float(prop.args[0])
+
+    PROPERTIES = PropertyTable({'Pos': _set_position,
+                                'Radius': _set_radius})
+
     @staticmethod
     def build(tok):
+        tok = tok[0]
+        return Hub.from_parsed(tok.name, tok.args, tok.body.as_list() if tok.body else [])
+
+    @staticmethod
+    def from_parsed(name, args, body: list):
         inst = Hub()
-        inst.name = tok[0].name
-        inst.hub_name = str(tok[0].args[0])
-        body = tok[0].body.as_list() or []
-        for x in body:
-            if x.name == magic('Pos'):
-                inst.position = Vector3(*[float(arg) for arg in x.args])
-                inst.position.z *= -1
-            elif x.name == magic('Radius'):
-                inst.radius = float(x.args[0])
+        inst.name = name
+        inst.hub_name = str(args[0])
+        Hub.PROPERTIES.route(inst, body)
         return inst
 
     def to_binary(self, parent: Chunk, plan_doc):
@@ -1,12 +1,12 @@
 from core.util.hashing import magic
-from mungers.chunks.Chunk import Chunk
 
 
-class InstProperty(Chunk):
+class InstProperty:
+    __slots__ = 'name', 'args', 'body'
+
     def __init__(self, name, args):
-        super().__init__('PROP')
         self.name = magic(name)
-        self.args = args
+        self.args = tuple(args)
         self.body = None
 
     @staticmethod
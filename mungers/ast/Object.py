@@ -1,15 +1,13 @@
-from core.util.hashing import magic
 from core.util.math_util import quat_to_rotation_matrix, mangle_quat
-from mungers.chunks.Chunk import Chunk
+from mungers.ast.PropertyTable import PropertyTable
 
 
-class Object(Chunk):
-    CHILD_BLACKLIST = {magic(x) for x in ('SeqNo', 'NetworkId', 'ChildPosition', 'ChildRotation')}
+class Object:
+    __slots__ = 'name', 'args', 'body', 'label', 'class_', 'rotation', 'position'
 
     def __init__(self):
-        super().__init__('inst')
         self.name = None
-        self.args = []
+        self.args = ()
         self.body = None
         self.label = None
         self.class_ = None
@@ -19,19 +17,28 @@ class Object(Chunk):
     def __str__(self):
         return 'Object({cls})'.format(cls=self.label)
 
+    def _set_rotation(self, prop):
+        self.rotation = [float(arg) for arg in prop.args]
+
+    def _set_position(self, prop):
+        self.position = [float(arg) for arg in prop.args]
+
+    PROPERTIES = PropertyTable({'ChildRotation': _set_rotation,
+                                'ChildPosition': _set_position},
+                               blacklist=('SeqNo', 'NetworkId', 'ChildPosition', 'ChildRotation'))
+
     @staticmethod
     def build(tok):
+        tok = tok[0]
+        return Object.from_parsed(tok.name, tok.args, tok.body.as_list() if tok.body else [])
+
+    @staticmethod
+    def from_parsed(name, args, body: list):
         inst = Object()
-        inst.name = tok[0].name
-        inst.label = tok[0].args[0]
-        inst.class_ = tok[0].args[1]
-        body = tok[0].body.as_list() or []
-        for x in body:
-            if x.name == magic('ChildRotation'):
-                inst.rotation = [float(arg) for arg in x.args]
-            elif x.name == magic('ChildPosition'):
-                inst.position = [float(arg) for arg in x.args]
-        inst.body = [item for item in body if item.name not in Object.CHILD_BLACKLIST]
+        inst.name = name
+        inst.label = args[0]
+        inst.class_ = args[1]
+        inst.body = Object.PROPERTIES.route(inst, body)
         return inst
 
     def get_transform(self):
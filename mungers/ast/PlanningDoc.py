@@ -28,8 +28,11 @@ class PlanningDoc(Chunk):
 
     @staticmethod
     def build(tok):
+        return PlanningDoc.from_instances(tok.as_list())
+
+    @staticmethod
+    def from_instances(instances: list):
         plan = PlanningDoc()
-        instances = tok.as_list()
 
         def get_hub_index(name: str) -> int:
             for h, hub in enumerate(plan.hubs):
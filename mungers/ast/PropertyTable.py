@@ -0,0 +1,30 @@
+from core.util.hashing import magic
+
+
+class PropertyTable:
+    """
+    Routes the body properties of an AST node to handlers by the hash of their name. Each node class declares one,
+    mapping property names to the methods that handle them, e.g.
+
+        PROPERTIES = PropertyTable({'Position': _set_position}, blacklist=('Position', 'SeqNo'))
+
+    The names are hashed once when the class is defined, and route() handles the properties and filters out the
+    blacklisted ones in a single pass over the body.
+    """
+    def __init__(self, handlers: dict, blacklist=()):
+        self.handlers = {magic(name): handler for name, handler in handlers.items()}
+        self.blacklist = frozenset(magic(name) for name in blacklist)
+
+    def route(self, inst, body: list) -> list:
+        """Call handler(inst, prop) for each property in body with a handler, returning those not blacklisted."""
+        get_handler = self.handlers.get
+        blacklist = self.blacklist
+        rest = []
+        for prop in body:
+            name = prop.name
+            handler = get_handler(name)
+            if handler is not None:
+                handler(inst, prop)
+            if name not in blacklist:
+                rest.append(prop)
+        return rest
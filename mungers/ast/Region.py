@@ -1,14 +1,13 @@
-from core.util.hashing import magic
 from core.util.math_util import mangle_quat, quat_to_rotation_matrix
-from mungers.chunks.Chunk import Chunk
+from mungers.ast.PropertyTable import PropertyTable
 
 
-class Region(Chunk):
-    CHILD_BLACKLIST = {magic(x) for x in ('Position', 'Rotation', 'Size')}
+class Region:
+    __slots__ = 'name', 'body', 'class_info', 'region_type', 'rotation', 'position', 'size'
     TYPE_MAP = ['box', 'sphere', 'cylinder']
 
     def __init__(self):
-        super().__init__('regn')
+        self.name = None
         self.body = []
         self.class_info = None
         self.region_type = None
@@ -19,21 +18,32 @@ class Region(Chunk):
     def __str__(self):
         return 'Region({cls})'.format(cls=self.class_info)
 
+    def _set_rotation(self, prop):
+        self.rotation = [float(arg) for arg in prop.args]
+
+    def _set_position(self, prop):
+        self.position = [float(arg) for arg in prop.args]
+
+    def _set_size(self, prop):
+        self.size = [float(arg) for arg in prop.args]
+
+    PROPERTIES = PropertyTable({'Rotation': _set_rotation,
+                                'Position': _set_position,
+                                'Size': _set_size},
+                               blacklist=('Position', 'Rotation', 'Size'))
+
     @staticmethod
     def build(tok):
+        tok = tok[0]
+        return Region.from_parsed(tok.name, tok.args, tok.body.as_list() if tok.body else [])
+
+    @staticmethod
+    def from_parsed(name, args, body: list):
         inst = Region()
-        inst.name = tok[0].name
-        inst.class_info = str(tok[0].args[0])
-        inst.region_type = Region.TYPE_MAP[int(tok[0].args[1])]
-        body = tok[0].body.as_list() or []
-        for x in body:
-            if x.name == magic('Rotation'):
-                inst.rotation = [float(arg) for arg in x.args]
-            elif x.name == magic('Position'):
-                inst.position = [float(arg) for arg in x.args]
-            elif x.name == magic('Size'):
-                inst.size = [float(arg) for arg in x.args]
-        inst.body = [item for item in body if item.name not in Region.CHILD_BLACKLIST]
+        inst.name = name
+        inst.class_info = str(args[0])
+        inst.region_type = Region.TYPE_MAP[int(args[1])]
+        inst.body = Region.PROPERTIES.route(inst, body)
         return inst
 
     def get_transform(self):
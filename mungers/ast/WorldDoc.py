@@ -1,10 +1,14 @@
 import pathlib
 
-from core.util.hashing import magic
 from mungers.ast.Object import Object
+from mungers.ast.PropertyTable import PropertyTable
 from mungers.chunks.Chunk import Chunk
 
 
+def _stem_of(name) -> str:
+    return pathlib.Path(str(name)).stem
+
+
 class WorldDoc(Chunk):
     def __init__(self):
         super().__init__('wrld')
@@ -37,22 +41,37 @@ class WorldDoc(Chunk):
     def get_path_name(self):
         return self.path_name or ''
 
+    def _set_light_name(self, instance):
+        self.light_name = _stem_of(instance.args[0])
+
+    def _set_terrain_name(self, instance):
+        self.terrain_name = _stem_of(instance.args[0])
+
+    def _set_sky_name(self, instance):
+        self.sky_name = _stem_of(instance.args[0])
+
+    def _set_path_name(self, instance):
+        self.path_name = _stem_of(instance.args[0])
+
+    PROPERTIES = PropertyTable({'LightName': _set_light_name,
+                                'TerrainName': _set_terrain_name,
+                                'SkyName': _set_sky_name,
+                                'PathName': _set_path_name})
+
     @staticmethod
     def build(tok):
+        return WorldDoc.from_instances(tok.as_list())
+
+    @staticmethod
+    def from_instances(instances: list):
         world = WorldDoc()
-        world.instances = tok.as_list()
-
-        def stem_of(name: str):
-            return pathlib.Path(str(name)).stem
-
-        for instance in world.instances:
-            if instance.name == magic('LightName'):
-                world.light_name = stem_of(instance.args[0])
-            elif instance.name == magic('TerrainName'):
-                world.terrain_name = stem_of(instance.args[0])
-            elif instance.name == magic('SkyName'):
-                world.sky_name = stem_of(instance.args[0])
-            elif instance.name == magic('PathName'):
-                world.path_name = stem_of(instance.args[0])
-        world.instances = [x for x in world.instances if isinstance(x, Object)]
+        get_handler = WorldDoc.PROPERTIES.handlers.get
+        # Only the objects are kept, the other top-level instances are handled in the same pass
+        for instance in instances:
+            if isinstance(instance, Object):
+                world.instances.append(instance)
+                continue
+            handler = get_handler(instance.name)
+            if handler is not None:
+                handler(world, instance)
         return world
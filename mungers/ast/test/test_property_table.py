@@ -0,0 +1,34 @@
+import unittest
+
+from mungers.ast.Args import StrArg
+from mungers.ast.Hint import Hint
+from mungers.ast.InstProperty import InstProperty
+from mungers.ast.PropertyTable import PropertyTable
+
+
+class PropertyTableTest(unittest.TestCase):
+    def test_route(self):
+        handled = []
+        table = PropertyTable({'Foo': lambda inst, prop: handled.append((inst, prop.args[0].value))},
+                              blacklist=('foo', 'Bar'))
+        body = [InstProperty('Foo', [StrArg('1')]), InstProperty('Bar', []), InstProperty('Baz', []),
+                InstProperty('FOO', [StrArg('2')])]
+        rest = table.route('inst', body)
+        self.assertEqual(handled, [('inst', '1'), ('inst', '2')])
+        self.assertEqual(rest, [body[2]])
+
+    def test_hint(self):
+        body = [InstProperty(name, [StrArg(value) for value in values]) for name, values in (
+            ('Position', ['1', '2', '3']),
+            ('Size', ['4', '5', '6']),
+            ('Mode', ['0']),
+        )]
+        hint = Hint.from_parsed('Hint', [StrArg('name'), StrArg('5')], body)
+        self.assertEqual(hint.position, [1.0, 2.0, 3.0])
+        self.assertEqual(hint.size, [4.0, 5.0, 6.0])
+        # The size of a hint is also written out as a property
+        self.assertEqual(hint.body, body[1:])
+
+
+if __name__ == '__main__':
+    unittest.main()
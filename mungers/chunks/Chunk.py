@@ -3,17 +3,24 @@ from contextlib import contextmanager
 
 
 class Chunk:
+    """
+    A chunk of a munged file, with the writers for its contents. The chunks opened in a root chunk, and in those, are
+    all written straight to the binary of the root: each one starts where it was opened and has the size in its header
+    patched in when it is closed, so nothing is copied into its parent. Write to a chunk only while none of the chunks
+    opened in it are open.
+    """
     def __init__(self, chunk_id: str, name: str = None):
         self._chunk_id = None
         self.chunk_id = chunk_id
         self.name = name
         self.size = 0
         self.binary = bytearray()
+        # Where the chunk starts in its binary, which is shared with its root if it was opened in another chunk
+        self._start = 0
 
     def __enter__(self):
         """Only used by root node, others use PARENT.open()"""
-        self.binary.extend(bytes(self.chunk_id, 'ascii'))
-        self.binary.extend([0]*4)
+        self._begin(self.binary)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -33,13 +40,20 @@ class Chunk:
         while len(self._chunk_id) % 4:
             self._chunk_id += '_'
 
+    def _begin(self, binary: bytearray):
+        """Start the chunk at the end of binary, writing its header with a size to be patched in by update_size()."""
+        self.binary = binary
+        self._start = len(binary)
+        binary.extend(bytes(self.chunk_id, 'ascii'))
+        binary.extend(bytes(4))
+
     def align(self, snap=4):
-        while len(self.binary) % snap:
-            self.binary.append(0)
+        """Pad the chunk to a multiple of snap bytes from its start."""
+        self.binary.extend(bytes(-(len(self.binary) - self._start) % snap))
 
     def update_size(self):
-        self.size = len(self.binary[8:])
-        self.binary[4:8] = struct.pack('<I', self.size)
+        self.size = len(self.binary) - self._start - 8
+        struct.pack_into('<I', self.binary, self._start + 4, self.size)
 
     def write(self, binary):
         self.binary.extend(binary)
@@ -99,12 +113,39 @@ class Chunk:
             child = Chunk(name)
         else:
             raise ValueError('name or instance kwarg must be provided to Chunk.open()')
-        child.binary.extend(bytes(child.chunk_id, 'ascii'))
-        child.binary.extend([0]*4)
-        yield child
+        child._begin(self.binary)
+        try:
+            yield child
+        except BaseException:
+            # Leave the parent as it was before the child was opened
+            del self.binary[child._start:]
+            raise
         child.update_size()
         child.align()
-        self.write(child.binary)
+
+    @contextmanager
+    def stream(self, f):
+        """
+        Like using the chunk as a context manager, but writing it to the binary file f as it is built. The header is
+        written first, flush() moves what has been written to the chunk so far to the file, and the size is patched
+        into the header when the chunk is closed. Chunks opened in it can be streamed as well, after a flush().
+        """
+        start = f.tell()
+        f.write(bytes(self.chunk_id, 'ascii'))
+        f.write(bytes(4))
+        yield self
+        self.flush(f)
+        self.size = f.tell() - start - 8
+        f.write(bytes(-self.size % 4))
+        end = f.tell()
+        f.seek(start + 4)
+        f.write(struct.pack('<I', self.size))
+        f.seek(end)
+
+    def flush(self, f):
+        """Write what has been written to a chunk opened by stream() so far to its file."""
+        f.write(self.binary)
+        self.binary.clear()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,36 @@
+import struct
+
+from core.util.hashing import magic
+from mungers.ast.Args import FloatArg
+from mungers.chunks.Chunk import Chunk
+from mungers.util.ReqDatabase import ReqDatabase
+
+TEXTURE = magic('Texture')
+GEOMETRY = magic('Geometry')
+
+
+def write_instance(parent: Chunk, instance):
+    """
+    Write a ConfigInstance to parent as a DATA chunk, followed by a SCOP chunk holding its body if it has one. Textures
+    and models it refers to are added to the ReqDatabase.
+    """
+    data = bytearray(instance.name)
+    args = instance.args
+    data.append(len(args))
+    for arg in args:
+        data.extend(arg.to_binary())
+    if not args or isinstance(args[-1], FloatArg):
+        data.extend(bytes(4))
+    # The size doesn't include the padding
+    parent.write(b'DATA')
+    parent.write(struct.pack('<I', len(data)))
+    parent.write(data)
+    parent.write(bytes(-len(data) % 4))
+    if instance.name == TEXTURE:
+        ReqDatabase().get_section('texture').append(str(args[0]))
+    elif instance.name == GEOMETRY:
+        ReqDatabase().get_section('model').append(str(args[0]))
+    if instance.body is not None:
+        with parent.open('SCOP') as scop:
+            for child in instance.body:
+                write_instance(scop, child)
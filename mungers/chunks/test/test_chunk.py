@@ -0,0 +1,57 @@
+import io
+import struct
+import unittest
+
+from mungers.chunks.Chunk import Chunk
+
+
+class ChunkTest(unittest.TestCase):
+    def test_stream(self):
+        with Chunk('ucfb') as root:
+            with root.open('INFO') as info:
+                info.write_str('name')
+            with root.open('cnfg') as config:
+                with config.open('DATA') as data:
+                    data.write_int(7)
+                    data.write_byte(1)
+                config.write_short(3)
+
+        f = io.BytesIO()
+        with Chunk('ucfb').stream(f) as streamed_root:
+            with streamed_root.open('INFO') as info:
+                info.write_str('name')
+            streamed_root.flush(f)
+            with Chunk('cnfg').stream(f) as streamed_config:
+                with streamed_config.open('DATA') as data:
+                    data.write_int(7)
+                    data.write_byte(1)
+                streamed_config.flush(f)
+                streamed_config.write_short(3)
+        self.assertEqual(f.getvalue(), bytes(root.binary))
+        self.assertEqual(streamed_config.size, 18)
+
+    def test_open(self):
+        with Chunk('ucfb') as root:
+            root.write_byte(1)
+            with root.open('INFO') as info:
+                info.write_str('name')
+                info.align()
+                with info.open('DATA') as data:
+                    data.write_byte(7)
+        data_chunk = b'DATA' + struct.pack('<I', 1) + b'\x07\x00\x00\x00'
+        info_chunk = b'INFO' + struct.pack('<I', 8 + len(data_chunk)) + b'name\x00\x00\x00\x00' + data_chunk
+        expected = b'ucfb' + struct.pack('<I', 1 + len(info_chunk)) + b'\x01' + info_chunk + b'\x00\x00\x00'
+        self.assertEqual(bytes(root.binary), expected)
+        self.assertEqual(info.size, len(info_chunk) - 8)
+
+    def test_open_error(self):
+        with Chunk('ucfb') as root:
+            with self.assertRaises(ValueError):
+                with root.open('INFO') as info:
+                    info.write_int(1)
+                    raise ValueError()
+        self.assertEqual(bytes(root.binary), b'ucfb' + bytes(4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from typing import Optional
+
+from parameterized import parameterized
+
+from mungers.ast.ConfigInstance import ConfigInstance
+from mungers.chunks.Chunk import Chunk
+from mungers.chunks.config_writer import write_instance
+from mungers.util.ReqDatabase import ReqDatabase
+
+
+class ConfigWriterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        ReqDatabase().sections.clear()
+
+    def tearDown(self) -> None:
+        ReqDatabase().sections.clear()
+
+    @parameterized.expand([
+        ('empty', ConfigInstance('Foo', []), None,
+         b'DATA\t\x00\x00\x00\xd7~\xf3\xa9\x00\x00\x00\x00\x00\x00\x00\x00'),
+        ('one int arg', ConfigInstance('Foo', [9]), None,
+         b'DATA\r\x00\x00\x00\xd7~\xf3\xa9\x01\x00\x00\x10A\x00\x00\x00\x00\x00\x00\x00'),
+        ('one float arg', ConfigInstance('Foo', [3.14]), None,
+         b'DATA\r\x00\x00\x00\xd7~\xf3\xa9\x01\xc3\xf5H@\x00\x00\x00\x00\x00\x00\x00'),
+        ('two float args', ConfigInstance('Foo', [3.14, 2.71]), None,
+         b'DATA\x11\x00\x00\x00\xd7~\xf3\xa9\x02\xc3\xf5H@\xa4p-@\x00\x00\x00\x00\x00\x00\x00'),
+        ('one str arg', ConfigInstance('Foo', ['Hermite']), None,
+         b'DATA\x15\x00\x00\x00\xd7~\xf3\xa9\x01\x04\x00\x00\x00\x08\x00\x00\x00Hermite\x00\x00\x00\x00'),
+        ('empty body', ConfigInstance('Foo', [3.14, 2.71, 1.41]), [],
+         b'DATA\x15\x00\x00\x00\xd7~\xf3\xa9\x03\xc3\xf5H@\xa4p-@\xe1z\xb4?\x00\x00\x00\x00\x00\x00\x00'
+         b'SCOP\x00\x00\x00\x00'),
+        ('nested', ConfigInstance('Foo', []), [ConfigInstance('Foo', [])],
+         b'DATA\t\x00\x00\x00\xd7~\xf3\xa9\x00\x00\x00\x00\x00\x00\x00\x00'
+         b'SCOP\x14\x00\x00\x00DATA\t\x00\x00\x00\xd7~\xf3\xa9\x00\x00\x00\x00\x00\x00\x00\x00'),
+    ])
+    def test_write_instance(self, _name: str, inst: ConfigInstance, body: Optional[list], expected_binary: bytes):
+        inst.body = body
+        parent = Chunk('test')
+        write_instance(parent, inst)
+        self.assertEqual(bytes(parent.binary), expected_binary)
+
+    def test_req_entries(self):
+        write_instance(Chunk('test'), ConfigInstance('Texture', ['foo']))
+        write_instance(Chunk('test'), ConfigInstance('Geometry', ['bar']))
+        self.assertEqual(ReqDatabase().get_section('texture'), ['foo'])
+        self.assertEqual(ReqDatabase().get_section('model'), ['bar'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,6 @@
+import dataclasses
+import time
+
 import pyparsing as pp
 from pyparsing import pyparsing_common as ppc
 
@@ -10,14 +13,25 @@ from mungers.ast.Hub import Hub
 from mungers.ast.InstProperty import InstProperty
 from mungers.ast.Object import Object
 from mungers.ast.Region import Region
+from mungers.parsers.ParseCache import ParseCache
+from mungers.parsers.ParseStats import get_parse_stats
 from mungers.parsers.ParserOptions import ParserOptions
+from util.constants import ParserEngine
 
+_WHITESPACE = ' \t\r\n'
+
+
+class ConfigGrammar:
+    """
+    The pyparsing grammar of config files for one set of ParserOptions. Building a grammar takes a while, so each one
+    is only built once per process and then shared by every ConfigParser with the same options, see get().
+    """
+    _cache = dict()
 
-class ConfigParser:
     def __init__(self, options: ParserOptions):
         lparen, rparen, lbrace, rbrace, semi, comma = map(pp.Suppress, map(pp.Literal, '(){};,'))
-        specials = ('Animation', 'Barrier', 'Hint', 'Object', 'Region')
-        special_keys = pp.MatchFirst([pp.Keyword(s) for s in specials])
+        # Same as a MatchFirst of Keywords, but checked with a single regex
+        special_keys = pp.Regex(r'(?:Animation|Barrier|Hint|Object|Region)(?![A-Za-z0-9_$])')
 
         self.args = pp.Forward()
         self.property_signature = pp.Forward()
@@ -37,23 +51,24 @@ class ConfigParser:
         self.connection_def = keyword_def('Connection')
 
         self.name = ~special_keys + ppc.identifier('name')
+        # The pyparsing_common expressions are shared by the whole process, so add parse actions to copies of them.
+        # Otherwise the actions of every parser created before this one would run as well.
+        string = pp.quoted_string.copy().set_parse_action(pp.remove_quotes, StrArg.build)
         if options.all_values_are_strings:
-            self.value = (ppc.number.add_parse_action(StrArg.build) |
-                          pp.quoted_string.set_parse_action(pp.remove_quotes, StrArg.build))
+            self.value = ppc.number.copy().add_parse_action(StrArg.build) | string
         elif options.all_numbers_are_floats:
-            self.value = (ppc.fnumber.add_parse_action(FloatArg.build) |
-                          pp.quoted_string.set_parse_action(pp.remove_quotes, StrArg.build))
+            self.value = ppc.fnumber.copy().add_parse_action(FloatArg.build) | string
         else:
-            self.value = (ppc.number.add_parse_action(NumberArgFactory.build) |
-                          pp.quoted_string.set_parse_action(pp.remove_quotes, StrArg.build))
+            self.value = ppc.number.copy().add_parse_action(NumberArgFactory.build) | string
         self.args <<= pp.DelimitedList(self.value)
         self.property_signature <<= self.name + lparen + pp.ZeroOrMore(self.args)('args') + rparen
-        instance_def = pp.Group(self.property_signature + semi)
         self.property_ = pp.Forward()
         scope_body = self.property_[1, ...]('body')
-        scoped_def = pp.Group(self.property_signature + lbrace + pp.Optional(scope_body) + rbrace)
-        self.property_ <<= (instance_def.set_parse_action(ConfigInstance.build_property) |
-                            scoped_def.set_parse_action(ConfigInstance.build_instance))
+        scope = pp.Literal('{')('scope') + pp.Optional(scope_body) + rbrace
+        # Instances and scopes share their signature, so that it is parsed only once rather than again for a scope
+        # after failing to parse it as an instance
+        self.property_ <<= pp.Group(self.property_signature + (semi | scope)).set_parse_action(
+            lambda tok: ConfigInstance.build_instance(tok) if tok[0].scope else ConfigInstance.build_property(tok))
 
         self.document = (self.object_def.set_parse_action(Object.build) |
                          self.region_def.set_parse_action(Region.build) |
@@ -62,10 +77,89 @@ class ConfigParser:
                          self.hub_def.set_parse_action(Hub.build) |
                          self.connection_def.set_parse_action(Connection.build) |
                          self.property_)
+        self.instance_list = self.document[...]
+        self.instance_list.streamline()
+
+    @staticmethod
+    def get(options: ParserOptions) -> 'ConfigGrammar':
+        # Copy the options into the key, since they may be modified after this
+        key = dataclasses.astuple(options)
+        grammar = ConfigGrammar._cache.get(key)
+        if grammar is None:
+            grammar = ConfigGrammar._cache[key] = ConfigGrammar(options)
+            get_parse_stats().grammars_built += 1
+        else:
+            get_parse_stats().grammar_cache_hits += 1
+        return grammar
+
+
+class ConfigParser:
+    def __init__(self, options: ParserOptions, parse_cache: ParseCache = None):
+        self.grammar = ConfigGrammar.get(options)
+        self.options = options
         self.document_cls = options.document_cls
+        self.parse_cache = parse_cache
+
+    def __reduce__(self):
+        # Pickled by its options, e.g. to parse in another process, which builds or reuses a grammar of its own
+        return ConfigParser, (self.options, self.parse_cache)
+
+    def __getattr__(self, name):
+        # Expose the expressions of the grammar, e.g. parser.value, so that fragments of config files can be parsed
+        return getattr(self.grammar, name)
 
-    # noinspection PyUnresolvedReferences
     def parse_file(self, file):
-        config_doc = self.document[...].set_parse_action(self.document_cls.build)
         with open(file, 'r') as f:
-            return config_doc.parse_string(f.read(), parse_all=True)[0]
+            text = f.read()
+        if self.parse_cache is None:
+            instances = self._parse_text(text)
+        else:
+            instances = self.parse_cache.get(text, self.options, ParserEngine.PYPARSING, lambda: self._parse_text(text))
+        return self.document_cls.from_instances(instances)
+
+    def _parse_text(self, text: str) -> list:
+        time_start = time.perf_counter()
+        instances = self.grammar.instance_list.parse_string(text, parse_all=True).as_list()
+        # parse_string() resets the packrat cache and its stats, so they only cover this file
+        packrat_hits, packrat_misses = pp.ParserElement.packrat_cache_stats[:2]
+        get_parse_stats().record_parse(len(text), time.perf_counter() - time_start, packrat_hits, packrat_misses)
+        return instances
+
+    def iter_instances(self, file):
+        """
+        Parse a config file one top-level instance at a time, yielding each one as soon as it has been parsed. Unlike
+        FastConfigParser, the whole text of the file is still read first.
+        """
+        if self.parse_cache is None:
+            yield from self._iter_file(file)
+        else:
+            yield from self.parse_cache.iter_instances(file, self.options, ParserEngine.PYPARSING,
+                                                       lambda: self._iter_file(file))
+
+    def _iter_file(self, file):
+        with open(file, 'r') as f:
+            # Expanded here like parse_string() does, so that the locations from scan_string() match the text
+            text = f.read().expandtabs()
+        parse_time = 0.0
+        time_start = time.perf_counter()
+        end = 0
+        error = None
+        try:
+            for tokens, start, match_end in self.grammar.document.scan_string(text):
+                if text[end:start].strip(_WHITESPACE):
+                    break
+                parse_time += time.perf_counter() - time_start
+                yield tokens[0]
+                time_start = time.perf_counter()
+                end = match_end
+        except Exception as e:
+            error = e
+        packrat_hits, packrat_misses = pp.ParserElement.packrat_cache_stats[:2]
+        get_parse_stats().record_parse(len(text), parse_time + time.perf_counter() - time_start, packrat_hits,
+                                       packrat_misses)
+        rest = text[end:].lstrip(_WHITESPACE)
+        if error is not None or rest:
+            # scan_string() skips anything it can't parse, and may run into other errors further on because of that.
+            # Parse the whole text instead, to raise the same error as parse_file().
+            self.grammar.instance_list.parse_string(text, parse_all=True)
+            raise error or pp.ParseException(text, len(text) - len(rest), 'Expected end of text')
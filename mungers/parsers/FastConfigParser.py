@@ -0,0 +1,298 @@
+import io
+import re
+import time
+
+from mungers.ast.Args import FloatArg, IntArg, StrArg
+from mungers.ast.Barrier import Barrier
+from mungers.ast.ConfigInstance import ConfigInstance
+from mungers.ast.Connection import Connection
+from mungers.ast.Hint import Hint
+from mungers.ast.Hub import Hub
+from mungers.ast.InstProperty import InstProperty
+from mungers.ast.Object import Object
+from mungers.ast.Region import Region
+from mungers.parsers.ParseCache import ParseCache
+from mungers.parsers.ParseStats import get_parse_stats
+from mungers.parsers.ParserOptions import ParserOptions
+from util.constants import ParserEngine
+
+# The tokens are matched exactly as ConfigParser's pyparsing grammar matches them, so that both produce the same AST.
+_WHITESPACE = r'[ \t\r\n]*'
+_QUOTED_STRING = (r'"(?:[^"\n\r\\]|""|\\(?:[^x]|x[0-9a-fA-F]+))*"(?!")|'
+                  r"'(?:[^'\n\r\\]|''|\\(?:[^x]|x[0-9a-fA-F]+))*'(?!')")
+_NUMBER = (r'[+-]?(?:\d+(?:[eE][+-]?\d+)|(?:\d+\.\d*|\.\d+)(?:[eE][+-]?\d+)?)|'  # pyparsing_common.sci_real
+           r'[+-]?(?:\d+\.\d*|\.\d+)|'  # pyparsing_common.real
+           r'[+-]?\d+')  # pyparsing_common.signed_integer
+_FNUMBER = r'[+-]?\d+\.?\d*(?:[eE][+-]?\d+)?'  # pyparsing_common.fnumber
+_IDENTIFIER = r'[A-Z_a-zªµºÀ-ÖØ-öø-ÿ][0-9A-Z_a-zªµ·ºÀ-ÖØ-öø-ÿ]*'  # pyparsing_common.identifier
+_PUNCTUATION = r'[(){};,]'
+# Anything else becomes a token of its own, which is never valid, so that the error is reported where it occurs
+_INVALID = r'[^ \t\r\n]'
+
+_NUMBER_TOKENS = re.compile('{ws}({str}|{num}|{ident}|{punc}|{inv})'.format(
+    ws=_WHITESPACE, str=_QUOTED_STRING, num=_NUMBER, ident=_IDENTIFIER, punc=_PUNCTUATION, inv=_INVALID))
+_FNUMBER_TOKENS = re.compile('{ws}({str}|{num}|{ident}|{punc}|{inv})'.format(
+    ws=_WHITESPACE, str=_QUOTED_STRING, num=_FNUMBER, ident=_IDENTIFIER, punc=_PUNCTUATION, inv=_INVALID))
+
+_IDENTIFIER_START = frozenset(chr(c) for c in range(256) if re.fullmatch(_IDENTIFIER, chr(c)))
+_NUMBER_START = frozenset('+-.')
+_QUOTES = frozenset('"\'')
+_KEYWORD_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_$')
+_SPECIALS = ('Animation', 'Barrier', 'Hint', 'Object', 'Region')
+_KEYWORD_DEFS = {
+    'Object': Object,
+    'Region': Region,
+    'Hint': Hint,
+    'Barrier': Barrier,
+    'Hub': Hub,
+    'Connection': Connection,
+}
+
+
+class _ParseFailure(Exception):
+    def __init__(self, token_index: int):
+        super().__init__(token_index)
+        self.token_index = token_index
+
+
+class _Backtrack(_ParseFailure):
+    """Raised when a keyword definition doesn't parse, so that it can be parsed as an ordinary instance instead."""
+
+
+class FastConfigParser:
+    """
+    A drop-in replacement for ConfigParser which produces the same AST, several times faster. The whole file is split
+    into tokens by a single regex, then parsed by recursive descent over the list of tokens, building the AST nodes
+    directly instead of going through pyparsing parse actions.
+    """
+    def __init__(self, options: ParserOptions, parse_cache: ParseCache = None):
+        self.options = options
+        self.document_cls = options.document_cls
+        self.parse_cache = parse_cache
+        if options.all_values_are_strings:
+            self.tokens_regex = _NUMBER_TOKENS
+            self.make_number = self._make_str_number
+        elif options.all_numbers_are_floats:
+            self.tokens_regex = _FNUMBER_TOKENS
+            self.make_number = FloatArg
+        else:
+            self.tokens_regex = _NUMBER_TOKENS
+            self.make_number = self._make_number
+
+    def __reduce__(self):
+        return FastConfigParser, (self.options, self.parse_cache)
+
+    @staticmethod
+    def _convert_number(token: str):
+        # Only pyparsing_common.signed_integer can match a number without a decimal point or exponent
+        if '.' in token or 'e' in token or 'E' in token:
+            return float(token)
+        return int(token)
+
+    @staticmethod
+    def _make_number(token: str):
+        if '.' in token or 'e' in token or 'E' in token:
+            return FloatArg(token)
+        return IntArg(token)
+
+    @staticmethod
+    def _make_str_number(token: str):
+        return StrArg(FastConfigParser._convert_number(token))
+
+    def parse_file(self, file):
+        with open(file, 'r') as f:
+            text = f.read()
+        if self.parse_cache is None:
+            instances = self._parse_file_text(text, file)
+        else:
+            instances = self.parse_cache.get(text, self.options, ParserEngine.FAST,
+                                             lambda: self._parse_file_text(text, file))
+        return self.document_cls.from_instances(instances)
+
+    def _parse_file_text(self, text: str, file) -> list:
+        time_start = time.perf_counter()
+        instances = list(self._iter_parse(lambda: io.StringIO(text), source=file))
+        get_parse_stats().record_parse(len(text), time.perf_counter() - time_start)
+        return instances
+
+    def parse_string(self, text: str, source=None):
+        return self.document_cls.from_instances(list(self._iter_parse(lambda: io.StringIO(text), source)))
+
+    def iter_instances(self, file):
+        """
+        Parse a config file one top-level instance at a time, yielding each one as soon as it has been parsed. Only the
+        current instance and line of the file are held in memory, rather than the whole file and its document.
+        """
+        if self.parse_cache is None:
+            yield from self._iter_file(file)
+        else:
+            yield from self.parse_cache.iter_instances(file, self.options, ParserEngine.FAST,
+                                                       lambda: self._iter_file(file))
+
+    def _iter_file(self, file):
+        parse_time = 0.0
+        time_start = time.perf_counter()
+        with open(file, 'r') as f:
+            for instance in self._iter_parse(lambda: open(file, 'r'), source=file, lines=f):
+                parse_time += time.perf_counter() - time_start
+                yield instance
+                time_start = time.perf_counter()
+            num_bytes = f.tell()
+        get_parse_stats().record_parse(num_bytes, parse_time + time.perf_counter() - time_start)
+
+    def _iter_tokens(self, lines):
+        # No token can span lines, since strings can't contain line breaks
+        findall = self.tokens_regex.findall
+        for line in lines:
+            # pyparsing expands tabs before parsing, which changes the value of strings containing them
+            yield from findall(line.expandtabs())
+
+    def _iter_parse(self, open_lines, source=None, lines=None):
+        """
+        Parse the lines of a config file, yielding its top-level instances. open_lines() opens them (again) as a
+        context manager, e.g. to find the line and column of an error; lines may be given if they are already open.
+        """
+        if lines is None:
+            with open_lines() as lines:
+                yield from self._iter_parse(open_lines, source, lines)
+            return
+        # Split the tokens into top-level statements by their braces and semicolons, then parse one at a time
+        statement = []
+        first_index = 0
+        depth = 0
+        for index, token in enumerate(self._iter_tokens(lines)):
+            statement.append(token)
+            if token == '{':
+                depth += 1
+            elif token == '}':
+                depth -= 1
+                if depth <= 0:
+                    yield self._parse_top_level(statement, first_index, open_lines, source)
+                    first_index = index + 1
+                    statement = []
+                    depth = 0
+            elif token == ';' and depth == 0:
+                yield self._parse_top_level(statement, first_index, open_lines, source)
+                first_index = index + 1
+                statement = []
+        if statement:
+            # Always an error, since every statement ends with a semicolon or brace
+            self._parse_top_level(statement, first_index, open_lines, source)
+
+    def _parse_top_level(self, tokens: list, first_index: int, open_lines, source):
+        tokens.append(None)  # Marks the end, so that looking ahead never runs off the list
+        try:
+            instance, i = self._parse_statement(tokens, 0)
+            if tokens[i] is not None:
+                raise _ParseFailure(i)
+        except _ParseFailure as e:
+            message = self._describe_error(open_lines, first_index + e.token_index, tokens[e.token_index], source)
+            raise ValueError(message) from None
+        return instance
+
+    def _describe_error(self, open_lines, token_index: int, token, source) -> str:
+        line = column = 1
+        with open_lines() as lines:
+            if token is None:
+                # The end of the file
+                for line, text in enumerate(lines, start=1):
+                    column = len(text.expandtabs()) + 1
+                    if text.endswith('\n'):
+                        line += 1
+                        column = 1
+            else:
+                n = 0
+                for line, text in enumerate(lines, start=1):
+                    matches = self.tokens_regex.findall(text.expandtabs())
+                    if n + len(matches) > token_index:
+                        match = list(self.tokens_regex.finditer(text.expandtabs()))[token_index - n]
+                        column = match.start(1) + 1
+                        break
+                    n += len(matches)
+        found = 'end of file' if token is None else repr(token)
+        return 'Unexpected {found} at line {line}, column {col}{src}'.format(
+            found=found, line=line, col=column, src='' if source is None else ' of {}'.format(source))
+
+    @staticmethod
+    def _is_name(token) -> bool:
+        """Check whether a token can be the name of an instance, i.e. it is an identifier but no special keyword."""
+        if token is None or token[0] not in _IDENTIFIER_START:
+            return False
+        for special in _SPECIALS:
+            # pyparsing only considers ASCII letters, digits, _ and $ to continue a keyword
+            if token.startswith(special) and (len(token) == len(special) or token[len(special)] not in _KEYWORD_CHARS):
+                return False
+        return True
+
+    def _parse_statement(self, tokens: list, i: int):
+        keyword_cls = _KEYWORD_DEFS.get(tokens[i])
+        if keyword_cls is not None:
+            try:
+                return self._parse_keyword_def(keyword_cls, tokens, i)
+            except _Backtrack:
+                if tokens[i] in _SPECIALS:
+                    raise
+        return self._parse_instance(tokens, i)
+
+    def _parse_keyword_def(self, keyword_cls, tokens: list, i: int):
+        name = tokens[i]
+        if tokens[i + 1] != '(':
+            raise _Backtrack(i + 1)
+        args, i = self._parse_args(tokens, i + 2, _Backtrack)
+        if tokens[i] != '{':
+            raise _Backtrack(i)
+        i += 1
+        body = []
+        while tokens[i] != '}':
+            prop_name = tokens[i]
+            if not self._is_name(prop_name) or tokens[i + 1] != '(':
+                raise _Backtrack(i)
+            prop_args, i = self._parse_args(tokens, i + 2, _Backtrack)
+            if tokens[i] != ';':
+                raise _Backtrack(i)
+            body.append(InstProperty(prop_name, prop_args))
+            i += 1
+        return keyword_cls.from_parsed(name, args, body), i + 1
+
+    def _parse_instance(self, tokens: list, i: int):
+        name = tokens[i]
+        if not self._is_name(name):
+            raise _ParseFailure(i)
+        if tokens[i + 1] != '(':
+            raise _ParseFailure(i + 1)
+        args, i = self._parse_args(tokens, i + 2, _ParseFailure)
+        token = tokens[i]
+        if token == ';':
+            return ConfigInstance.from_parsed(name, args), i + 1
+        if token != '{':
+            raise _ParseFailure(i)
+        i += 1
+        body = []
+        while tokens[i] != '}':
+            instance, i = self._parse_instance(tokens, i)
+            body.append(instance)
+        return ConfigInstance.from_parsed(name, args, body, force_body=True), i + 1
+
+    def _parse_args(self, tokens: list, i: int, error_cls):
+        """Parse the values up to the closing parenthesis at tokens[i:], separated by a comma or only whitespace."""
+        args = []
+        token = tokens[i]
+        if token == ')':
+            return args, i + 1
+        while True:
+            if token is None:
+                raise error_cls(i)
+            first = token[0]
+            if first in _QUOTES and len(token) > 1:
+                args.append(StrArg(token[1:-1]))
+            elif first.isdecimal() or (first in _NUMBER_START and len(token) > 1):
+                args.append(self.make_number(token))
+            else:
+                raise error_cls(i)
+            i += 1
+            token = tokens[i]
+            if token == ')':
+                return args, i + 1
+            if token == ',':
+                i += 1
+                token = tokens[i]
@@ -0,0 +1,50 @@
+import re
+
+# Each match is one line of the file, so that the whole file is split and matched by a single pass of findall()
+# instead of stripping and matching each line. Whitespace is matched as OdfParser strips it, so that both give the same
+# sections. The groups are the opening bracket and name of a section header, or the key, value and the slash after the
+# value of a property.
+_ODF_LINES_RE = re.compile(r'[ \t]*(?:(\[)(?:([A-Za-z0-9_]+)])?|([A-Za-z0-9_]+)[^\S\n]*=([^/\n]*)(/?))?[^\n]*\n?')
+_CLASS_NAME_KEYS = ('ClassLabel', 'ClassParent')
+
+
+class FastOdfParser:
+    """A drop-in replacement for OdfParser, which gives the same sections faster."""
+    def parse_file(self, file):
+        with open(file, 'r') as f:
+            text = f.read()
+        return self.parse_string(text, source=file)
+
+    @staticmethod
+    def _whitespace_value(value: str, ends_at_comment: bool) -> str:
+        # OdfParser strips spaces and tabs off the end of the line, then needs at least one character after the '=',
+        # which may be whitespace that isn't stripped off the value, like a form feed
+        if not ends_at_comment:
+            value = value.rstrip(' \t')
+        return value[-1:].strip('" \t\r\n')
+
+    def parse_string(self, text: str, source=None) -> dict:
+        sections = dict()
+        properties = None
+        for line, (bracket, section_name, key, value, slash) in enumerate(_ODF_LINES_RE.findall(text), start=1):
+            if key:
+                if properties is None:
+                    # Not in a section yet
+                    continue
+                stripped_value = value.lstrip()
+                if stripped_value:
+                    value = stripped_value.strip('" \t\r\n')
+                else:
+                    value = self._whitespace_value(value, bool(slash))
+                if not value:
+                    continue
+                if key in _CLASS_NAME_KEYS:
+                    sections['__class_name'] = (value, key == 'ClassParent')
+                    continue
+                properties.append((key, value))
+            elif bracket:
+                if not section_name:
+                    raise ValueError('Invalid section header at line {line}{src}'.format(
+                        line=line, src='' if source is None else ' of {}'.format(source)))
+                properties = sections[section_name] = []
+        return sections
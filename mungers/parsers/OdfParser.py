@@ -19,7 +19,10 @@ class OdfParser:
             if stripped_line.startswith(self.COMMENT_BEGIN):
                 continue
             if stripped_line.startswith(self.SECTION_BEGIN):
-                section_name = self.SECTION_NAME_RE.match(stripped_line).group('name')
+                section_match = self.SECTION_NAME_RE.match(stripped_line)
+                if section_match is None:
+                    raise ValueError('Invalid section header {!r} in {}'.format(stripped_line, file))
+                section_name = section_match.group('name')
                 if not section_name:
                     continue
                 sections[section_name] = []
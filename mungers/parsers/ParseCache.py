@@ -0,0 +1,172 @@
+import gzip
+import hashlib
+import io
+import itertools
+import os
+import pathlib
+import pickle
+import time
+
+from core.config import get_global_config
+from mungers.parsers.ParseStats import get_parse_stats
+from mungers.parsers.ParserOptions import ParserOptions
+from util.constants import OPENMUNGE_VERSION
+from util.file_util import TEMP_FILE_SUFFIX, atomic_write
+
+PARSE_CACHE_DIR_NAME = '.parsecache'
+# Bump this whenever the AST classes or the parsers change in a way that makes entries cached before invalid
+PARSE_CACHE_VERSION = 3
+ENTRY_SUFFIX = '.ast'
+COMPRESS_LEVEL = 6
+# Temporary files left behind by a process that was killed while writing an entry are removed after this long
+STALE_TEMP_FILE_SECONDS = 3600
+
+
+class ParseCache:
+    """
+    A persistent cache of parsed config files, shared by every munger process of a project. Entries are keyed by the
+    content of the file, the ParserOptions, the platform (platform conditional blocks are expanded while parsing), the
+    parser engine and the parser version. Each one holds the top-level instances of the file, pickled one after the
+    other into a gzip stream so that they can be written and read back one at a time, see iter_instances(). Documents
+    are built from them with the from_instances() method of their class.
+
+    Entries are written to a temporary file which is then renamed, so that other processes only ever see complete
+    entries. Loading an entry touches it, and trim() evicts the least recently used entries once the cache grows
+    beyond max_size bytes.
+    """
+    def __init__(self, cache_dir: pathlib.Path, max_size: int):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    @staticmethod
+    def make_key(content, options: ParserOptions, engine: str) -> str:
+        """Get the key of a config file, given its content as an iterable of strings, e.g. the open file or [text]."""
+        hasher = hashlib.sha256()
+        hasher.update('version={}/{}\n'.format(OPENMUNGE_VERSION, PARSE_CACHE_VERSION).encode('utf-8'))
+        hasher.update('engine={}\n'.format(engine).encode('utf-8'))
+        hasher.update('platform={}\n'.format(get_global_config().platform).encode('utf-8'))
+        hasher.update('document={0.__module__}.{0.__qualname__}\n'.format(options.document_cls).encode('utf-8'))
+        hasher.update('floats={} strings={}\n'.format(options.all_numbers_are_floats,
+                                                      options.all_values_are_strings).encode('utf-8'))
+        for part in content:
+            hasher.update(part.encode('utf-8', 'surrogatepass'))
+        return hasher.hexdigest()
+
+    def entry_path(self, key: str) -> pathlib.Path:
+        return self.cache_dir / (key + ENTRY_SUFFIX)
+
+    def _read_entry(self, key: str):
+        with gzip.open(self.entry_path(key), 'rb') as f:
+            # None marks the end, so that a truncated entry can't be mistaken for a complete one
+            while (instance := pickle.load(f)) is not None:
+                yield instance
+        self._touch(key)
+
+    def _touch(self, key: str):
+        try:
+            # Mark the entry as recently used. Access times are not reliable, since many systems don't update them
+            os.utime(self.entry_path(key))
+        except OSError:
+            pass
+
+    def _write_entry(self, key: str, instances):
+        """
+        Pass the given instances through, compressing each one into a new entry which is written once they all have
+        been. Failing to write never fails a parse.
+        """
+        buffer = io.BytesIO()
+        f = gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=COMPRESS_LEVEL)
+        for instance in instances:
+            pickle.dump(instance, f, protocol=pickle.HIGHEST_PROTOCOL)
+            yield instance
+        pickle.dump(None, f)
+        f.close()
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Other processes may store the same entry at the same time, which is fine since they write the same data
+            atomic_write(self.entry_path(key), buffer.getvalue())
+        except OSError:
+            pass
+
+    def load(self, key: str):
+        """Get the list of instances cached under the given key, or None if there is none."""
+        try:
+            return list(self._read_entry(key))
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # Missing, unreadable or written by an incompatible version of the AST classes; it will be replaced
+            return None
+
+    def store(self, key: str, instances: list):
+        for _ in self._write_entry(key, instances):
+            pass
+
+    def get(self, text: str, options: ParserOptions, engine: str, parse):
+        """
+        Get the cached instances of a config file with the given content, or parse it with parse() and cache the list
+        of instances it returns.
+        """
+        key = self.make_key([text], options, engine)
+        instances = self.load(key)
+        if instances is not None:
+            get_parse_stats().parse_cache_hits += 1
+            return instances
+        instances = parse()
+        self.store(key, instances)
+        return instances
+
+    def iter_instances(self, file, options: ParserOptions, engine: str, iter_parse):
+        """
+        Yield the cached instances of a config file one at a time, or those yielded by iter_parse() while caching
+        them, so that neither needs the whole list of instances in memory.
+        """
+        with open(file, 'r') as f:
+            key = self.make_key(f, options, engine)
+        num_loaded = 0
+        try:
+            for instance in self._read_entry(key):
+                num_loaded += 1
+                yield instance
+            get_parse_stats().parse_cache_hits += 1
+            return
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            pass
+        if num_loaded:
+            # The entry broke off after some of its instances were used, so parse the rest of them, but since the
+            # first ones are no longer around, leave it to the next run to replace it
+            yield from itertools.islice(iter_parse(), num_loaded, None)
+        else:
+            yield from self._write_entry(key, iter_parse())
+
+    def trim(self):
+        """Evict the least recently used entries until the cache is no larger than max_size."""
+        entries = []
+        total_size = 0
+        now = time.time()
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    if entry.name.endswith(ENTRY_SUFFIX):
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                        total_size += stat.st_size
+                    elif entry.name.endswith(TEMP_FILE_SUFFIX) and now - stat.st_mtime > STALE_TEMP_FILE_SECONDS:
+                        self._remove(entry.path)
+        except OSError:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            # Another process may have evicted or replaced the entry in the meantime, either way it no longer counts
+            self._remove(path)
+            total_size -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
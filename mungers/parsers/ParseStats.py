@@ -0,0 +1,47 @@
+class ParseStats:
+    """
+    Counts the config files parsed by this process, the time spent parsing them and how often the parse cache, the
+    pyparsing grammars and their packrat cache could be reused. Mungers reset them before each run and report them in
+    their stats file.
+    """
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.time = 0.0
+        self.parse_cache_hits = 0
+        self.grammars_built = 0
+        self.grammar_cache_hits = 0
+        self.packrat_hits = 0
+        self.packrat_misses = 0
+
+    def reset(self):
+        self.__init__()
+
+    def record_parse(self, num_bytes: int, seconds: float, packrat_hits=0, packrat_misses=0):
+        self.files += 1
+        self.bytes += num_bytes
+        self.time += seconds
+        self.packrat_hits += packrat_hits
+        self.packrat_misses += packrat_misses
+
+    def add(self, other: 'ParseStats'):
+        """Add the stats of another process, e.g. one which parsed files on behalf of this one."""
+        for name, value in vars(other).items():
+            setattr(self, name, getattr(self, name) + value)
+
+    def to_dict(self) -> dict:
+        return dict(parsed_files=self.files,
+                    parsed_bytes=self.bytes,
+                    parse_time=self.time,
+                    parse_cache_hits=self.parse_cache_hits,
+                    grammars_built=self.grammars_built,
+                    grammar_cache_hits=self.grammar_cache_hits,
+                    packrat_hits=self.packrat_hits,
+                    packrat_misses=self.packrat_misses)
+
+
+_parse_stats = ParseStats()
+
+
+def get_parse_stats() -> ParseStats:
+    return _parse_stats
@@ -0,0 +1,69 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from core.config import get_global_config
+from mungers.parsers.ParseStats import get_parse_stats
+
+# Starting the worker processes takes a while, so inputs are only parsed in parallel if there are enough of them
+PARALLEL_PARSE_MIN_FILES = 16
+PARALLEL_PARSE_MIN_BYTES = 4 << 20
+
+
+def _init_worker(platform):
+    # Workers are spawned with a fresh global config, but platform conditional blocks are expanded while parsing
+    get_global_config().platform = platform
+
+
+def _run_task(task: tuple):
+    parse, file = task
+    stats = get_parse_stats()
+    stats.reset()
+    result = parse(file)
+    return result, stats
+
+
+def should_parse_in_parallel(files: list, num_processes: int) -> bool:
+    if num_processes <= 1 or len(files) <= 1:
+        return False
+    if len(files) >= PARALLEL_PARSE_MIN_FILES:
+        return True
+    total_size = 0
+    for file in files:
+        try:
+            total_size += os.stat(file).st_size
+        except OSError:
+            pass
+    return total_size >= PARALLEL_PARSE_MIN_BYTES
+
+
+def parse_all(tasks: list, num_processes: int) -> list:
+    """
+    Run a list of (parse, file) tasks, returning the result of each parse(file) in the same order as the tasks. When
+    there are enough files, they are parsed on a pool of up to num_processes processes, so parse must be picklable,
+    e.g. the parse_file method of a parser. The parse stats of the workers are added to those of this process.
+    """
+    files = [file for _, file in tasks]
+    if not should_parse_in_parallel(files, num_processes):
+        return [parse(file) for parse, file in tasks]
+    results = []
+    # Spawned like the workers of WorkerPool: mungers may run in a process with other threads, which is unsafe to fork
+    with ProcessPoolExecutor(max_workers=min(num_processes, len(tasks)),
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker,
+                             initargs=(get_global_config().platform,)) as executor:
+        for result, stats in executor.map(_run_task, tasks):
+            results.append(result)
+            get_parse_stats().add(stats)
+    return results
+
+
+def get_num_parse_processes(setting: int, concurrent_jobs: int = 1) -> int:
+    """
+    Get the number of processes to parse with for the parse_processes option. 0 shares the CPUs between the munge jobs
+    that may run at once, so that a full build doesn't start one process per CPU for every one of them.
+    """
+    if setting > 0:
+        return setting
+    return max((os.cpu_count() or 1) // max(concurrent_jobs, 1), 1)
+
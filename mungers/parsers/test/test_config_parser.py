@@ -7,6 +7,7 @@ from mungers.ast.Args import IntArg, FloatArg, StrArg
 from mungers.ast.ConfigDoc import ConfigDoc
 from mungers.ast.ConfigInstance import ConfigInstance
 from mungers.parsers.ConfigParser import ConfigParser
+from mungers.parsers.ParseStats import get_parse_stats
 from mungers.parsers.ParserOptions import ParserOptions
 from core.config import setup_global_config
 
@@ -37,6 +38,22 @@ class ConfigParserTest(unittest.TestCase):
         parse_result = parser.parse_file(data_file)
         self.assertIsInstance(parse_result, ConfigDoc)
 
+    def test_grammar_cache(self):
+        parser = ConfigParser(self.options)
+        self.assertIs(ConfigParser(self.options).grammar, parser.grammar)
+        self.options.all_values_are_strings = True
+        self.assertIsNot(ConfigParser(self.options).grammar, parser.grammar)
+        self.assertIs(ConfigParser(ParserOptions(document_cls=ConfigDoc)).grammar, parser.grammar)
+
+    def test_parse_stats(self):
+        get_parse_stats().reset()
+        data_file = self.data_dir / 'path.pth'
+        ConfigParser(self.options).parse_file(data_file)
+        stats = get_parse_stats().to_dict()
+        self.assertEqual(stats['parsed_files'], 1)
+        self.assertEqual(stats['parsed_bytes'], len(data_file.read_text()))
+        self.assertGreater(stats['parse_time'], 0.0)
+
     @parameterized.expand([
         ('Path',),
         ('Properties',),
@@ -123,7 +140,7 @@ class ConfigParserTest(unittest.TestCase):
         parser = ConfigParser(self.options)
         result = parser.object_def.parse_string(string)[0]
 
-        self.assertListEqual(result.args, [])
+        self.assertTupleEqual(result.args, ())
         self.assertSequenceEqual(str(result.label), 'base_ctrl_1')
         self.assertSequenceEqual(str(result.class_), 'com_bldg_controlzone')
 
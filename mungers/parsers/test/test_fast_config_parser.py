@@ -0,0 +1,147 @@
+import pathlib
+import tempfile
+import unittest
+from parameterized import parameterized
+from unittest import mock
+
+from mungers.ast.Args import Arg, IntArg, FloatArg, StrArg
+from mungers.ast.ConfigInstance import ConfigInstance
+from mungers.ast.GenericDoc import GenericDoc
+from mungers.ast.Hub import Hub
+from mungers.ast.Object import Object
+from mungers.parsers.ConfigParser import ConfigParser
+from mungers.parsers.FastConfigParser import FastConfigParser
+from mungers.parsers.ParserOptions import ParserOptions
+from core.config import setup_global_config
+
+ALL_OPTIONS = [
+    ('floats', True, False),
+    ('strings', False, True),
+    ('numbers', False, False),
+    ('floats and strings', True, True),
+]
+
+
+def describe(node):
+    if isinstance(node, Arg):
+        return type(node).__name__, node.value
+    if isinstance(node, (list, tuple)):
+        return [describe(x) for x in node]
+    if isinstance(node, ConfigInstance):
+        return node.name, describe(node.args), None if node.body is None else describe(node.body)
+    return type(node).__name__, node.name, str(node)
+
+
+class FastConfigParserTest(unittest.TestCase):
+    def setUp(self) -> None:
+        setup_global_config(mock.Mock())
+        self.data_dir = pathlib.Path(__file__).parent / 'data'
+
+    @staticmethod
+    def get_parsers(all_numbers_are_floats, all_values_are_strings):
+        options = ParserOptions(document_cls=GenericDoc,
+                                all_numbers_are_floats=all_numbers_are_floats,
+                                all_values_are_strings=all_values_are_strings)
+        return ConfigParser(options), FastConfigParser(options)
+
+    def assertSameResult(self, text, all_numbers_are_floats=True, all_values_are_strings=False):
+        parser, fast_parser = self.get_parsers(all_numbers_are_floats, all_values_are_strings)
+        expected = parser.document[...].set_parse_action(GenericDoc.build).parse_string(text, parse_all=True)[0]
+        result = fast_parser.parse_string(text)
+        self.assertEqual(describe(result.instances), describe(expected.instances))
+        return result
+
+    @parameterized.expand([
+        (name + ' ' + filename, filename, floats, strings)
+        for filename in ('path.pth', 'region.rgn')
+        for name, floats, strings in ALL_OPTIONS
+    ])
+    def test_same_result_as_pyparsing(self, _, filename, floats, strings):
+        text = (self.data_dir / filename).read_text()
+        self.assertSameResult(text, floats, strings)
+
+    @parameterized.expand([
+        (name, floats, strings) for name, floats, strings in ALL_OPTIONS
+    ])
+    def test_values(self, _, floats, strings):
+        result = self.assertSameResult('Values(0, -1, +2, 007, 1.5, -0.000, 1., 1e5, 2.5E-2, "s", \'q\', "");\n'
+                                       'NoCommas(1 2"a""b" "c\\"d");', floats, strings)
+        self.assertEqual([str(arg) for arg in result.instances[1].args[2:]], ['a""b', 'c\\"d'])
+
+    def test_number_types(self):
+        _, fast_parser = self.get_parsers(False, False)
+        args = fast_parser.parse_string('A(1, 1.0, 1e1, "1");').instances[0].args
+        self.assertEqual([type(arg) for arg in args], [IntArg, FloatArg, FloatArg, StrArg])
+        _, fast_parser = self.get_parsers(False, True)
+        args = fast_parser.parse_string('A(1, 1.0, 1e1, "1");').instances[0].args
+        self.assertEqual([arg.value for arg in args], ['1', '1.0', '10.0', '1'])
+
+    def test_tabs_in_strings(self):
+        self.assertSameResult('A("a\tb");\n\tB("\tc");')
+
+    def test_scopes_and_platforms(self):
+        result = self.assertSameResult('Outer(1) {\n'
+                                       '    Inner();\n'
+                                       '    Empty() {}\n'
+                                       '    pc() { OnPC(1); }\n'
+                                       '    xbox() { OnXbox(2); }\n'
+                                       '}')
+        self.assertEqual(len(result.instances[0].body), 3)
+
+    def test_keyword_definitions(self):
+        result = self.assertSameResult('Object("a", "b", 1) { ChildPosition(1, 2, 3); SeqNo(4); }\n'
+                                       'Hub("h") { Pos(1, 2, 3); Radius(4); }\n'
+                                       'Hub("not a definition");\n'
+                                       'Hub("nested") { Scope() { A(); } }\n'
+                                       'Hubs("x");')
+        self.assertEqual([type(instance) for instance in result.instances],
+                         [Object, Hub, ConfigInstance, ConfigInstance, ConfigInstance])
+
+    @parameterized.expand([
+        ('missing semicolon', 'A() B();'),
+        ('trailing comma', 'A(1,);'),
+        ('double comma', 'A(1,,2);'),
+        ('unclosed scope', 'A() { B();'),
+        ('special name', 'Region();'),
+        ('unterminated string', 'A("abc);'),
+        ('float without integer part', 'A(.5);'),
+        ('keyword in scope', 'A() { Object("a", "b") { B(); } }'),
+        ('unexpected character', 'A(1); // comment'),
+    ])
+    def test_syntax_errors(self, _, text):
+        parser, fast_parser = self.get_parsers(True, False)
+        with self.assertRaises(Exception):
+            parser.document[...].parse_string(text, parse_all=True)
+        with self.assertRaises(ValueError):
+            fast_parser.parse_string(text)
+
+    def test_syntax_error_position(self):
+        _, fast_parser = self.get_parsers(True, False)
+        with self.assertRaisesRegex(ValueError, 'line 2, column 5'):
+            fast_parser.parse_string('A();\nB() C();')
+
+    @parameterized.expand([
+        ('valid', 'A(1);\nB() {\n\tC("\tx");\n}\nObject("o", "c") { P(1); }\n', None),
+        ('syntax error', 'A(1);\nB() {\n    C();\n  D() E();\n}\n', 'line 4, column 7'),
+        ('end of file', 'A(1);\nB() {\n    C();\n', 'end of file at line 4, column 1'),
+    ])
+    def test_iter_instances(self, _, text, error):
+        parser, fast_parser = self.get_parsers(False, False)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = pathlib.Path(temp_dir) / 'test.cfg'
+            path.write_text(text)
+            if error is None:
+                expected = describe(fast_parser.parse_file(path).instances)
+                self.assertEqual(describe(list(fast_parser.iter_instances(path))), expected)
+                self.assertEqual(describe(list(parser.iter_instances(path))), expected)
+            else:
+                with self.assertRaisesRegex(ValueError, error):
+                    fast_parser.parse_file(path)
+                with self.assertRaisesRegex(ValueError, error):
+                    list(fast_parser.iter_instances(path))
+                with self.assertRaises(Exception):
+                    list(parser.iter_instances(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import pathlib
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from mungers.parsers.FastOdfParser import FastOdfParser
+from mungers.parsers.OdfParser import OdfParser
+
+DATA_DIR = pathlib.Path(__file__).parent / 'data'
+
+
+class FastOdfParserTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.parser = FastOdfParser()
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    @parameterized.expand([
+        ('object.odf',),
+        ('object_with_duplicates.odf',),
+        ('object_with_parent.odf',),
+    ])
+    def test_parse_file(self, file_name: str):
+        self.assertEqual(self.parser.parse_file(DATA_DIR / file_name), OdfParser().parse_file(DATA_DIR / file_name))
+
+    @parameterized.expand([
+        ('comments', '[A]\n// B = 1\nC = 2 // 3\n  D=\t"4"\t\nE = /5\n'),
+        ('before any section', 'A = 1\n[B]\nC = 2\n'),
+        ('class name', '[A]\nClassLabel = "x"\nClassParent = "y"\n'),
+        ('repeated section', '[A]\nB = 1\n[A]\nC = 2\n[D]junk\n'),
+        ('whitespace values', '[A]\nB = \t\nC =\x0c \nD = \x0c /x\nE \x0c= "\x0c"\n'),
+        ('no key', '[A]\n = 1\nB C = 2\nD\n'),
+    ])
+    def test_parse_string(self, _name: str, text: str):
+        path = pathlib.Path(self.temp_dir.name) / 'test.odf'
+        path.write_text(text)
+        self.assertEqual(self.parser.parse_string(text), OdfParser().parse_file(path))
+
+    def test_invalid_section(self):
+        with self.assertRaisesRegex(ValueError, 'line 3'):
+            self.parser.parse_string('[A]\nB = 1\n[C D]\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from core.util.hashing import magic
+from mungers.ast.ConfigDoc import ConfigDoc
+from mungers.ast.GenericDoc import GenericDoc
+from mungers.parsers.FastConfigParser import FastConfigParser
+from mungers.parsers.ParseCache import ParseCache
+from mungers.parsers.ParseStats import get_parse_stats
+from mungers.parsers.ParserOptions import ParserOptions
+from core.config import get_global_config, setup_global_config
+from util.constants import ParserEngine, Platform
+
+TEXT = 'A(1, "a") {\n    pc() { B(2); }\n    ps2() { C(3); }\n}\nD();\n'
+
+
+class ParseCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        setup_global_config(mock.Mock())
+        get_global_config().platform = Platform.PC
+        get_parse_stats().reset()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.temp_dir.name)
+        self.cache = ParseCache(self.root / 'cache', max_size=1 << 20)
+        self.options = ParserOptions(document_cls=GenericDoc)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_parse_file(self):
+        path = self.root / 'test.pth'
+        path.write_text(TEXT)
+        parser = FastConfigParser(self.options, parse_cache=self.cache)
+        first = parser.parse_file(path)
+        second = parser.parse_file(path)
+        self.assertEqual(get_parse_stats().files, 1)
+        self.assertEqual(get_parse_stats().parse_cache_hits, 1)
+        self.assertIsNot(second, first)
+        self.assertEqual(repr(second.instances), repr(first.instances))
+        self.assertEqual([child.name for child in second.instances[0].body], [magic('B')])
+        # Only the complete entry is left behind
+        self.assertEqual([entry.suffix for entry in (self.root / 'cache').iterdir()], ['.ast'])
+
+    def test_iter_instances(self):
+        path = self.root / 'test.pth'
+        path.write_text(TEXT)
+        parser = FastConfigParser(self.options, parse_cache=self.cache)
+        parsed = list(parser.iter_instances(path))
+        loaded = list(parser.iter_instances(path))
+        self.assertEqual(get_parse_stats().parse_cache_hits, 1)
+        self.assertEqual(repr(loaded), repr(parsed))
+        # Both share their entries with parse_file()
+        self.assertEqual(repr(parser.parse_file(path).instances), repr(parsed))
+        self.assertEqual(get_parse_stats().parse_cache_hits, 2)
+        # An entry is only stored once all of the instances have been parsed
+        path.write_text(TEXT + 'E();\n')
+        next(parser.iter_instances(path))
+        self.assertEqual(len(list((self.root / 'cache').iterdir())), 1)
+
+    def test_key(self):
+        key = ParseCache.make_key([TEXT], self.options, ParserEngine.FAST)
+        self.assertEqual(ParseCache.make_key([TEXT], ParserOptions(document_cls=GenericDoc), ParserEngine.FAST), key)
+        # Files are hashed line by line while streaming them, which must give the same key as their whole text
+        self.assertEqual(ParseCache.make_key(TEXT.splitlines(keepends=True), self.options, ParserEngine.FAST), key)
+        self.assertNotEqual(ParseCache.make_key([TEXT + ' '], self.options, ParserEngine.FAST), key)
+        self.assertNotEqual(ParseCache.make_key([TEXT], self.options, ParserEngine.PYPARSING), key)
+        self.assertNotEqual(ParseCache.make_key([TEXT], ParserOptions(document_cls=ConfigDoc), ParserEngine.FAST), key)
+        self.assertNotEqual(ParseCache.make_key([TEXT], ParserOptions(document_cls=GenericDoc,
+                                                                    all_values_are_strings=True),
+                                                ParserEngine.FAST), key)
+        # Platform conditional blocks are expanded while parsing, so each platform needs its own entry
+        get_global_config().platform = Platform.PS2
+        self.assertNotEqual(ParseCache.make_key([TEXT], self.options, ParserEngine.FAST), key)
+
+    def test_invalid_entry(self):
+        key = ParseCache.make_key([TEXT], self.options, ParserEngine.FAST)
+        self.assertIsNone(self.cache.load(key))
+        self.cache.entry_path(key).parent.mkdir(parents=True)
+        self.cache.entry_path(key).write_bytes(b'not a cache entry')
+        self.assertIsNone(self.cache.load(key))
+        instances = self.cache.get(TEXT, self.options, ParserEngine.FAST,
+                                   lambda: FastConfigParser(self.options).parse_string(TEXT).instances)
+        self.assertEqual(repr(self.cache.load(key)), repr(instances))
+
+    def test_trim(self):
+        for i in range(4):
+            self.cache.store('key{}'.format(i), list(range(1000 * i, 1000 * i + 500)))
+            os.utime(self.cache.entry_path('key{}'.format(i)), (i, i))
+        entry_size = self.cache.entry_path('key0').stat().st_size
+        # Loading an entry makes it the most recently used one
+        self.assertIsNotNone(self.cache.load('key0'))
+        self.cache.max_size = 2 * entry_size + entry_size // 2
+        self.cache.trim()
+        self.assertEqual(sorted(path.stem for path in (self.root / 'cache').iterdir()), ['key0', 'key3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from core.util.hashing import magic
+from mungers.ast.GenericDoc import GenericDoc
+from mungers.parsers.ConfigParser import ConfigParser
+from mungers.parsers.FastConfigParser import FastConfigParser
+from mungers.parsers.ParseStats import get_parse_stats
+from mungers.parsers.ParserOptions import ParserOptions
+from mungers.parsers.parse_pool import get_num_parse_processes, parse_all, should_parse_in_parallel
+from core.config import get_global_config, setup_global_config
+from util.constants import Platform
+
+
+class ParsePoolTest(unittest.TestCase):
+    def setUp(self) -> None:
+        setup_global_config(mock.Mock())
+        get_global_config().platform = Platform.XBOX
+        get_parse_stats().reset()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.temp_dir.name)
+        self.files = []
+        for i in range(4):
+            path = self.root / 'test{}.cfg'.format(i)
+            path.write_text('A({i}) {{\n    pc() {{ OnPC(); }}\n    xbox() {{ OnXbox({i}); }}\n}}\n'.format(i=i))
+            self.files.append(path)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_should_parse_in_parallel(self):
+        self.assertFalse(should_parse_in_parallel(self.files, 1))
+        self.assertFalse(should_parse_in_parallel(self.files[:1], 4))
+        self.assertFalse(should_parse_in_parallel(self.files, 4))
+        with mock.patch('mungers.parsers.parse_pool.PARALLEL_PARSE_MIN_BYTES', 100):
+            self.assertTrue(should_parse_in_parallel(self.files, 4))
+        with mock.patch('mungers.parsers.parse_pool.PARALLEL_PARSE_MIN_FILES', 4):
+            self.assertTrue(should_parse_in_parallel(self.files, 4))
+
+    def test_get_num_parse_processes(self):
+        self.assertEqual(get_num_parse_processes(3, concurrent_jobs=8), 3)
+        with mock.patch('os.cpu_count', return_value=8):
+            self.assertEqual(get_num_parse_processes(0), 8)
+            self.assertEqual(get_num_parse_processes(0, concurrent_jobs=2), 4)
+            self.assertEqual(get_num_parse_processes(0, concurrent_jobs=8), 1)
+            self.assertEqual(get_num_parse_processes(0, concurrent_jobs=16), 1)
+
+    def test_parse_all(self):
+        options = ParserOptions(document_cls=GenericDoc)
+        tasks = [(parser.parse_file, file) for file in self.files
+                 for parser in (FastConfigParser(options), ConfigParser(options))]
+        expected = [repr(result.instances[0].body) for result in parse_all(tasks, 1)]
+        get_parse_stats().reset()
+        with mock.patch('mungers.parsers.parse_pool.PARALLEL_PARSE_MIN_FILES', 2):
+            results = parse_all(tasks, 2)
+        # In the same order as the tasks, and parsed for the platform of this process
+        self.assertEqual([repr(result.instances[0].body) for result in results], expected)
+        self.assertEqual([child.name for child in results[-1].instances[0].body], [magic('OnXbox')])
+        self.assertEqual(get_parse_stats().files, 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
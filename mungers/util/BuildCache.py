@@ -0,0 +1,74 @@
+import hashlib
+import json
+import pathlib
+
+from util.constants import OPENMUNGE_VERSION
+from util.file_util import atomic_write
+
+MANIFEST_DIR_NAME = '.buildcache'
+READ_CHUNK_SIZE = 1 << 20
+
+
+class BuildCache:
+    """
+    An incremental build cache for a single munger run. The digest of a run covers the content of every input file,
+    the munger options and the OpenMunge version; when it matches the manifest stored by the previous run and every
+    output recorded there still exists, the munger does not need to run again.
+    """
+    def __init__(self, output_dir: pathlib.Path, munger_name: str, options: dict):
+        self.output_dir = output_dir
+        self.munger_name = munger_name
+        self.options = options
+        self.digest = None
+        self.outputs = []
+
+        options_str = json.dumps(options, sort_keys=True, default=str)
+        options_digest = hashlib.sha256(options_str.encode('utf-8')).hexdigest()[:16]
+        self.manifest_path = output_dir / MANIFEST_DIR_NAME / '{}-{}.json'.format(munger_name, options_digest)
+
+    def compute_digest(self, input_files: list) -> str:
+        hasher = hashlib.sha256()
+        hasher.update('version={}\n'.format(OPENMUNGE_VERSION).encode('utf-8'))
+        hasher.update('munger={}\n'.format(self.munger_name).encode('utf-8'))
+        hasher.update('options={}\n'.format(json.dumps(self.options, sort_keys=True, default=str)).encode('utf-8'))
+        for input_file in sorted(input_files):
+            hasher.update('input={}\n'.format(input_file).encode('utf-8'))
+            with open(input_file, 'rb') as f:
+                while chunk := f.read(READ_CHUNK_SIZE):
+                    hasher.update(chunk)
+        self.digest = hasher.hexdigest()
+        return self.digest
+
+    def load_manifest(self):
+        try:
+            with self.manifest_path.open('r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_up_to_date(self, input_files: list) -> bool:
+        """Digest the given inputs, and check them against the manifest left by the last successful run."""
+        digest = self.compute_digest(input_files)
+        manifest = self.load_manifest()
+        if not manifest or manifest.get('digest') != digest:
+            return False
+        self.outputs = [self.output_dir / output for output in manifest.get('outputs', [])]
+        return all(output.is_file() for output in self.outputs)
+
+    def store(self, output_files: list):
+        """Record the outputs of a successful run against the digest computed by is_up_to_date."""
+        if self.digest is None:
+            raise ValueError('Cannot store a build cache manifest before its digest has been computed')
+        manifest = dict(version=OPENMUNGE_VERSION,
+                        munger=self.munger_name,
+                        digest=self.digest,
+                        outputs=sorted({str(pathlib.Path(output).relative_to(self.output_dir))
+                                        for output in output_files}))
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.manifest_path, json.dumps(manifest, indent=2))
+
+    def invalidate(self):
+        try:
+            self.manifest_path.unlink()
+        except FileNotFoundError:
+            pass
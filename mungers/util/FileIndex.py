@@ -0,0 +1,240 @@
+import bisect
+import json
+import os
+import pathlib
+import queue
+import threading
+from collections import namedtuple
+
+from util.file_util import atomic_write
+from util.input_patterns import compile_input_patterns, get_input_pattern_endings
+
+FILE_INDEX_FILE_NAME = 'file_index.json'
+FILE_INDEX_VERSION = 1
+# Scanning is bound by I/O rather than CPU (especially on network storage), so use more threads than there are cores
+DEFAULT_SCAN_THREADS = min(32, (os.cpu_count() or 1) * 4)
+# How many directories may wait to be scanned before workers scan the subdirectories they find themselves
+SCAN_QUEUE_SIZE = 1024
+
+# A file in the index. The path is relative to the root of the index and always uses / as its separator.
+FileIndexEntry = namedtuple('FileIndexEntry', ('path', 'suffix', 'size', 'mtime'))
+
+
+def _get_suffix(name: str) -> str:
+    # The same as pathlib.PurePath.suffix, without having to construct a path for every file
+    i = name.rfind('.')
+    if 0 < i < len(name) - 1:
+        return name[i:]
+    return ''
+
+
+def _scan_directory(rel_dir: str, abs_dir: str, exclude: tuple, entries: list, subdirectories: list):
+    """Add the files in a directory to entries, and its subdirectories to subdirectories as (rel_dir, abs_dir)."""
+    try:
+        with os.scandir(abs_dir) as it:
+            for dir_entry in it:
+                rel_path = rel_dir + dir_entry.name
+                try:
+                    # DirEntry caches what the OS reports while listing the directory, so only files need a stat
+                    if dir_entry.is_dir(follow_symlinks=False):
+                        if rel_dir or dir_entry.name not in exclude:
+                            subdirectories.append((rel_path + '/', dir_entry.path))
+                        continue
+                    if not dir_entry.is_file():
+                        continue
+                    stat = dir_entry.stat()
+                except OSError:
+                    continue
+                entries.append(FileIndexEntry(rel_path, _get_suffix(dir_entry.name), stat.st_size, stat.st_mtime))
+    except OSError:
+        pass
+
+
+def _scan_tree(root: str, exclude: tuple, num_threads: int) -> list:
+    """Get the entries of every file under root, scanning directories on up to num_threads threads at once."""
+    if num_threads <= 1:
+        entries = []
+        stack = [('', root)]
+        while stack:
+            _scan_directory(*stack.pop(), exclude, entries, stack)
+        return entries
+
+    pending = queue.Queue(maxsize=SCAN_QUEUE_SIZE)
+    pending.put(('', root))
+    results = []
+
+    def worker():
+        entries = []
+        results.append(entries)
+        while True:
+            directory = pending.get()
+            if directory is None:
+                break
+            try:
+                stack = [directory]
+                while stack:
+                    subdirectories = []
+                    _scan_directory(*stack.pop(), exclude, entries, subdirectories)
+                    for subdirectory in subdirectories:
+                        # Share subdirectories with the other threads while there is room, otherwise scan them here
+                        try:
+                            pending.put_nowait(subdirectory)
+                        except queue.Full:
+                            stack.append(subdirectory)
+            finally:
+                pending.task_done()
+
+    threads = [threading.Thread(target=worker, name='FileIndexScan', daemon=True) for _ in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    pending.join()
+    for _ in threads:
+        pending.put(None)
+    for thread in threads:
+        thread.join()
+    return [entry for entries in results for entry in entries]
+
+
+def get_subdirectories(directory: pathlib.Path) -> list:
+    """Get the directories in directory, sorted by name, without a stat for each of them."""
+    with os.scandir(directory) as it:
+        return sorted(pathlib.Path(directory, dir_entry.name) for dir_entry in it if dir_entry.is_dir())
+
+
+class FileIndex:
+    """
+    A snapshot of every file under a directory (normally the project directory), taken with a single walk of the tree.
+    openmunge.py builds one at the start of a munge and saves it to _BUILD, so that every munge job can find its input
+    files by querying the index rather than walking its source directory again.
+    """
+    _load_cache = dict()
+
+    def __init__(self, root: pathlib.Path, entries: list, exclude=(), path=None):
+        self.root = os.path.abspath(root)
+        self.entries = sorted(entries)
+        self.exclude = tuple(exclude)
+        self.path = path
+        self._entry_paths = [entry.path for entry in self.entries]
+
+    @classmethod
+    def scan(cls, root: pathlib.Path, exclude=(), num_threads=DEFAULT_SCAN_THREADS):
+        """Index every file under root, skipping any top-level directories named in exclude."""
+        exclude = tuple(exclude)
+        return cls(root, _scan_tree(os.path.abspath(root), exclude, num_threads), exclude=exclude)
+
+    @classmethod
+    def load(cls, path: pathlib.Path):
+        """Load a saved index, or return None if it can't be read. Indexes are only re-read once they've changed."""
+        path = pathlib.Path(path)
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        cache_key = (stat.st_mtime_ns, stat.st_size)
+        cached = cls._load_cache.get(path)
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+        try:
+            with path.open('r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('version') != FILE_INDEX_VERSION:
+            return None
+        file_index = cls(data['root'], [FileIndexEntry(*entry) for entry in data['files']],
+                         exclude=data.get('exclude', ()), path=path)
+        cls._load_cache[path] = (cache_key, file_index)
+        return file_index
+
+    def save(self, path: pathlib.Path):
+        data = dict(version=FILE_INDEX_VERSION,
+                    root=self.root,
+                    exclude=list(self.exclude),
+                    files=[list(entry) for entry in self.entries])
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, json.dumps(data, separators=(',', ':')))
+        self.path = path
+
+    def get_prefix(self, directory: pathlib.Path):
+        """Get the prefix of the paths of the entries under directory, or None if the index does not cover it."""
+        abs_dir = os.path.abspath(directory)
+        if abs_dir == self.root:
+            return ''
+        rel_dir = os.path.relpath(abs_dir, self.root)
+        if rel_dir.startswith(os.pardir):
+            return None
+        rel_dir = rel_dir.replace(os.sep, '/')
+        if rel_dir.split('/', 1)[0] in self.exclude:
+            return None
+        return rel_dir + '/'
+
+    def covers(self, directory: pathlib.Path) -> bool:
+        return self.get_prefix(directory) is not None
+
+    def get_entries(self, directory: pathlib.Path) -> list:
+        """Get the entries of every file under directory, in order of path. Their paths stay relative to the root."""
+        prefix = self.get_prefix(directory)
+        if prefix is None:
+            raise ValueError('{} is not covered by the file index of {}'.format(directory, self.root))
+        if not prefix:
+            return list(self.entries)
+        # Entries are sorted by path, so the ones under directory all lie between "dir/" and "dir0" ('0' follows '/')
+        start = bisect.bisect_left(self._entry_paths, prefix)
+        end = bisect.bisect_left(self._entry_paths, prefix[:-1] + '0', lo=start)
+        return self.entries[start:end]
+
+    def find(self, directory: pathlib.Path, match) -> list:
+        """Get the paths of the files under directory whose entries satisfy match, each relative to directory."""
+        prefix_len = len(self.get_prefix(directory) or '')
+        return [pathlib.Path(directory, entry.path[prefix_len:]) for entry in self.get_entries(directory)
+                if match(entry)]
+
+    def find_input_files(self, directory: pathlib.Path, input_file_patterns: list) -> list:
+        """Get the paths of the files under directory which match any of the given munger input file patterns."""
+        regex = compile_input_patterns(input_file_patterns)
+        endings = get_input_pattern_endings(tuple(input_file_patterns))
+        entries = self.get_entries(directory)
+        if endings is not None:
+            entries = [entry for entry in entries if entry.path.lower().endswith(endings)]
+        prefix_len = len(self.get_prefix(directory) or '')
+        # Match each path from the end of the directory prefix, to avoid slicing every path in the index
+        return [pathlib.Path(directory, entry.path[prefix_len:]) for entry in entries
+                if regex.fullmatch(entry.path, prefix_len)]
+
+
+_shared_file_indexes = []
+
+
+def share_file_index(file_index: FileIndex):
+    """Make an index available to everything in this process which looks for files under its root."""
+    if file_index not in _shared_file_indexes:
+        _shared_file_indexes.append(file_index)
+
+
+def clear_shared_file_indexes():
+    _shared_file_indexes.clear()
+
+
+def find_shared_file_index(directory: pathlib.Path):
+    for file_index in _shared_file_indexes:
+        if file_index.covers(directory):
+            return file_index
+    return None
+
+
+def get_file_index(directory: pathlib.Path, index_path=None) -> FileIndex:
+    """
+    Get an index of the files under directory. This is a shared index where one covers it, then the saved index at
+    index_path if given, and otherwise a new index of just the directory.
+    """
+    file_index = find_shared_file_index(directory)
+    if file_index is not None:
+        return file_index
+    if index_path is not None:
+        file_index = FileIndex.load(index_path)
+        if file_index is not None:
+            share_file_index(file_index)
+            if file_index.covers(directory):
+                return file_index
+    return FileIndex.scan(directory)
@@ -11,11 +11,12 @@ Key = pp.Keyword
 LBRACE, RBRACE = map(Sup, map(Lit, '{}'))
 UCFT, REQN = map(Sup, map(Key, ('ucft', 'REQN')))
 
-pp.dbl_quoted_string.add_parse_action(pp.remove_quotes)
+# A copy, so that the quotes aren't removed from the strings of every other grammar that uses pp.dbl_quoted_string
+quoted_string = pp.dbl_quoted_string.copy().add_parse_action(pp.remove_quotes)
 
-header = pp.dbl_quoted_string
+header = quoted_string
 # TODO there is an optional sub-header which has the format "platform=<PC|PS2|XBOX>"
-entry = pp.dbl_quoted_string
+entry = quoted_string
 entries = (header.set_results_name('header') +
            pp.Group(entry[0, ...], aslist=True).set_results_name('entries').set_parse_action(list))
 section = (REQN + LBRACE + entries + RBRACE).set_parse_action(ReqList.build)
@@ -0,0 +1,120 @@
+import re
+
+from mungers.ast.ReqList import ReqList
+
+# Matched exactly as the pyparsing grammar of req_parser matches them, so that both read the same sections. Strings
+# can't contain line breaks, so files are tokenized one line at a time.
+_REQ_TOKENS_RE = re.compile(r'[ \t\r\n]*(?:("(?:[^"\n\r\\]|""|\\(?:[^x]|x[0-9a-fA-F]+))*"(?!"))|'
+                            r'([A-Za-z0-9_$]+)|([^ \t\r\n]))')
+
+# What the reader expects next: ucft, its {, REQN or the } of the document, the { of a section, its header, its
+# entries or }, and nothing at all
+_START, _DOC_OPEN, _DOC, _SECTION_OPEN, _HEADER, _ENTRIES, _END = range(7)
+
+
+def _iter_tokens(lines):
+    findall = _REQ_TOKENS_RE.findall
+    for line_num, line in enumerate(lines, start=1):
+        if '\t' in line.lstrip():
+            # pyparsing expands tabs before parsing, which changes the value of strings containing them
+            line = line.expandtabs()
+        for string, word, other in findall(line):
+            yield line_num, string, word or other
+
+
+def iter_req_sections(file):
+    """
+    Read a .req file one section at a time, yielding a ReqList for each one as soon as it has been read. Gives the same
+    sections as req_parser.parse_req_file(), much faster and without holding the whole file in memory.
+    """
+    with open(file, 'r') as f:
+        yield from iter_req_sections_of_lines(f, source=file)
+
+
+def iter_req_sections_of_lines(lines, source=None):
+    """Like iter_req_sections(), but reading the lines of a .req file from an iterable, e.g. a file that is open."""
+    state = _START
+    header = None
+    entries = None
+    line_num = 0
+    for line_num, string, token in _iter_tokens(lines):
+        if string:
+            if state == _ENTRIES:
+                entries.append(string[1:-1])
+                continue
+            if state == _HEADER:
+                header = string[1:-1]
+                entries = []
+                state = _ENTRIES
+                continue
+        elif token == 'ucft' and state == _START:
+            state = _DOC_OPEN
+            continue
+        elif token == 'REQN' and state == _DOC:
+            state = _SECTION_OPEN
+            continue
+        elif token == '{' and state in (_DOC_OPEN, _SECTION_OPEN):
+            state = _DOC if state == _DOC_OPEN else _HEADER
+            continue
+        elif token == '}' and state in (_ENTRIES, _DOC):
+            if state == _ENTRIES:
+                yield ReqList(header, entries)
+                state = _DOC
+            else:
+                state = _END
+            continue
+        _raise_syntax_error(string or token, line_num, source)
+    if state != _END:
+        _raise_syntax_error(None, line_num, source)
+
+
+def _raise_syntax_error(token, line_num: int, source):
+    found = 'end of file' if token is None else repr(token)
+    raise ValueError('Unexpected {found} at line {line}{src}'.format(
+        found=found, line=line_num, src='' if source is None else ' of {}'.format(source)))
+
+
+def read_req_file(file) -> list:
+    """Read all of the sections of a .req file, as a list of ReqLists like req_parser.parse_req_file() returns."""
+    return list(iter_req_sections(file))
+
+
+class ReqIndex:
+    """
+    The requirements of many .req files merged together, indexed by section. Each entry is only kept once per section,
+    compared without regard to case like the names of the files it refers to, in the order it was first read.
+    """
+    def __init__(self):
+        self.sections = dict()
+
+    def add_section(self, header: str, entries):
+        section = self.sections.get(header)
+        if section is None:
+            section = self.sections[header] = dict()
+        for entry in entries:
+            section.setdefault(entry.lower(), entry)
+
+    def add_file(self, file):
+        for section in iter_req_sections(file):
+            self.add_section(section.header, section.entries)
+
+    def get_section(self, header: str) -> list:
+        section = self.sections.get(header)
+        return [] if section is None else list(section.values())
+
+    def __contains__(self, header: str) -> bool:
+        return header in self.sections
+
+    def __iter__(self):
+        """Iterate over (header, entries) pairs of each section, in the order they were first read."""
+        for header, section in self.sections.items():
+            yield header, list(section.values())
+
+
+def merge_req_files(files, index: ReqIndex = None) -> ReqIndex:
+    """Merge the sections of many .req files in a single pass, each file being read as it is merged."""
+    if index is None:
+        index = ReqIndex()
+    for file in files:
+        index.add_file(file)
+    return index
@@ -0,0 +1,58 @@
+import pathlib
+import tempfile
+import unittest
+
+from mungers.util.BuildCache import BuildCache
+
+
+class BuildCacheTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.temp_dir.name)
+        self.output_dir = self.root / 'MUNGED'
+        self.output_dir.mkdir()
+        self.input_file = self.root / 'test.odf'
+        self.input_file.write_text('[GameObjectClass]\nClassLabel = "prop"\n')
+        self.output_file = self.output_dir / 'test.class'
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def run_munger(self, options=None):
+        """Stand in for a munger run, returning True if the cache let it skip its work."""
+        cache = BuildCache(self.output_dir, 'OdfMunge', options or dict(args=['-i', '$*.odf']))
+        if cache.is_up_to_date([self.input_file]):
+            return True
+        cache.invalidate()
+        self.output_file.write_bytes(b'ucfb')
+        cache.store([self.output_file])
+        return False
+
+    def test_unchanged_inputs_are_skipped(self):
+        self.assertFalse(self.run_munger())
+        self.assertTrue(self.run_munger())
+
+    def test_changed_input_content(self):
+        self.run_munger()
+        self.input_file.write_text('[GameObjectClass]\nClassLabel = "door"\n')
+        self.assertFalse(self.run_munger())
+        self.assertTrue(self.run_munger())
+
+    def test_changed_options(self):
+        self.run_munger()
+        self.assertFalse(self.run_munger(dict(args=['-i', '$*.odf', '--hash-strings'])))
+        self.assertTrue(self.run_munger())
+
+    def test_missing_output(self):
+        self.run_munger()
+        self.output_file.unlink()
+        self.assertFalse(self.run_munger())
+
+    def test_invalidate(self):
+        self.run_munger()
+        BuildCache(self.output_dir, 'OdfMunge', dict(args=['-i', '$*.odf'])).invalidate()
+        self.assertFalse(self.run_munger())
+
+
+if __name__ == '__main__':
+    unittest.main()
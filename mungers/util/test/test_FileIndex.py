@@ -0,0 +1,115 @@
+import pathlib
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from mungers.util.FileIndex import FileIndex, get_file_index, get_subdirectories, share_file_index, \
+    clear_shared_file_indexes
+
+
+class FileIndexTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.temp_dir.name)
+        for rel_path in ('Sides/REP/odf/rep_inf.odf', 'Sides/REP/odf/rep_walk.odf', 'Sides/REP/rep.req',
+                         'Sides/REPublic/odf/other.odf', 'Worlds/ABC/world1/ABC.wld', '_BUILD/REP/MUNGED/x.odf'):
+            path = self.root / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(rel_path)
+
+    def tearDown(self) -> None:
+        clear_shared_file_indexes()
+        self.temp_dir.cleanup()
+
+    def test_scan(self):
+        file_index = FileIndex.scan(self.root, exclude=('_BUILD',))
+        self.assertEqual([entry.path for entry in file_index.entries],
+                         ['Sides/REP/odf/rep_inf.odf', 'Sides/REP/odf/rep_walk.odf', 'Sides/REP/rep.req',
+                          'Sides/REPublic/odf/other.odf', 'Worlds/ABC/world1/ABC.wld'])
+        entry = file_index.entries[0]
+        self.assertEqual(entry.suffix, '.odf')
+        self.assertEqual(entry.size, len('Sides/REP/odf/rep_inf.odf'))
+
+    def test_parallel_scan(self):
+        for i in range(200):
+            path = self.root / 'Worlds' / 'W{}'.format(i % 7) / 'd{}'.format(i % 23) / 'f{}.wld'.format(i)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+        sequential = FileIndex.scan(self.root, exclude=('_BUILD',), num_threads=1)
+        with patch('mungers.util.FileIndex.SCAN_QUEUE_SIZE', 2):
+            parallel = FileIndex.scan(self.root, exclude=('_BUILD',), num_threads=4)
+        self.assertEqual(len(sequential.entries), 205)
+        self.assertEqual(parallel.entries, sequential.entries)
+
+    def test_get_subdirectories(self):
+        (self.root / 'Sides' / 'not_a_side.txt').touch()
+        self.assertEqual(get_subdirectories(self.root / 'Sides'), [self.root / 'Sides' / 'REP',
+                                                                    self.root / 'Sides' / 'REPublic'])
+
+    def test_find(self):
+        file_index = FileIndex.scan(self.root, exclude=('_BUILD',))
+        side_dir = self.root / 'Sides' / 'REP'
+        # A sibling directory whose name starts with the same characters must not be included
+        self.assertEqual(file_index.find(side_dir, lambda entry: entry.suffix == '.odf'),
+                         [side_dir / 'odf' / 'rep_inf.odf', side_dir / 'odf' / 'rep_walk.odf'])
+        self.assertEqual(file_index.find(self.root, lambda entry: entry.suffix == '.wld'),
+                         [self.root / 'Worlds' / 'ABC' / 'world1' / 'ABC.wld'])
+
+    def test_find_input_files(self):
+        file_index = FileIndex.scan(self.root, exclude=('_BUILD',))
+        side_dir = self.root / 'Sides' / 'REP'
+        inf_odf = side_dir / 'odf' / 'rep_inf.odf'
+        walk_odf = side_dir / 'odf' / 'rep_walk.odf'
+        req = side_dir / 'rep.req'
+        self.assertEqual(file_index.find_input_files(side_dir, ['$*.odf']), [inf_odf, walk_odf])
+        self.assertEqual(file_index.find_input_files(side_dir, ['$*.ODF', '*.req']), [inf_odf, walk_odf, req])
+        # Without $, patterns only match relative to the source directory
+        self.assertEqual(file_index.find_input_files(side_dir, ['*.odf']), [])
+        self.assertEqual(file_index.find_input_files(side_dir, ['odf/*_inf.odf']), [inf_odf])
+        self.assertEqual(file_index.find_input_files(self.root / 'Sides', ['$odf/rep_????.odf']), [walk_odf])
+        # Suffixes must match in full, not just appear somewhere in the pattern
+        self.assertEqual(file_index.find_input_files(side_dir, ['$*.odfx', '$*.r']), [])
+        self.assertEqual(file_index.find_input_files(side_dir, []), [])
+        # Patterns without wildcards name files, which $ finds in any subdirectory
+        self.assertEqual(file_index.find_input_files(side_dir, ['$rep_inf.odf']), [inf_odf])
+        self.assertEqual(file_index.find_input_files(side_dir, ['$rep.req']), [req])
+        self.assertEqual(file_index.find_input_files(self.root, ['$ABC.wld']),
+                         [self.root / 'Worlds' / 'ABC' / 'world1' / 'ABC.wld'])
+        self.assertEqual(file_index.find_input_files(self.root, ['$world1\\ABC.wld']),
+                         [self.root / 'Worlds' / 'ABC' / 'world1' / 'ABC.wld'])
+
+    def test_covers(self):
+        file_index = FileIndex.scan(self.root / 'Sides', exclude=('_BUILD',))
+        self.assertTrue(file_index.covers(self.root / 'Sides'))
+        self.assertTrue(file_index.covers(self.root / 'Sides' / 'REP'))
+        self.assertFalse(file_index.covers(self.root / 'Worlds'))
+        self.assertFalse(FileIndex.scan(self.root, exclude=('_BUILD',)).covers(self.root / '_BUILD' / 'REP'))
+
+    def test_save_and_load(self):
+        file_index = FileIndex.scan(self.root, exclude=('_BUILD',))
+        index_path = self.root / '_BUILD' / 'file_index.json'
+        file_index.save(index_path)
+        loaded = FileIndex.load(index_path)
+        self.assertEqual(loaded.entries, file_index.entries)
+        self.assertEqual(loaded.exclude, ('_BUILD',))
+        self.assertEqual(loaded.path, index_path)
+        self.assertIs(FileIndex.load(index_path), loaded)
+        self.assertIsNone(FileIndex.load(self.root / 'missing.json'))
+
+    def test_get_file_index(self):
+        side_dir = self.root / 'Sides' / 'REP'
+        # Without a shared or saved index, the directory is scanned on its own
+        self.assertEqual(get_file_index(side_dir).root, str(side_dir))
+
+        file_index = FileIndex.scan(self.root, exclude=('_BUILD',))
+        index_path = self.root / '_BUILD' / 'file_index.json'
+        file_index.save(index_path)
+        self.assertEqual(get_file_index(side_dir, index_path=index_path).path, index_path)
+
+        clear_shared_file_indexes()
+        share_file_index(file_index)
+        self.assertIs(get_file_index(side_dir), file_index)
+
+
+if __name__ == '__main__':
+    unittest.main()
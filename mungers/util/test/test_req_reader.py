@@ -0,0 +1,92 @@
+import pathlib
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from mungers.util.ReqDatabase import ReqDatabase
+from mungers.util.req_parser import parse_req_file
+from mungers.util.req_reader import ReqIndex, iter_req_sections_of_lines, merge_req_files, read_req_file
+
+
+def as_tuples(sections) -> list:
+    return [(section.header, section.entries) for section in sections]
+
+
+class ReqReaderTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.temp_dir.name)
+
+    def tearDown(self) -> None:
+        ReqDatabase().clear()
+        self.temp_dir.cleanup()
+
+    def write_req(self, name: str, text: str) -> pathlib.Path:
+        path = self.root / name
+        path.write_text(text)
+        return path
+
+    @parameterized.expand([
+        ('empty doc', 'ucft { }'),
+        ('doc with one section', 'ucft { REQN { "config_1"\n"item_1" } }'),
+        ('doc with two sections', 'ucft { REQN { "config_1"\n"item_1" } REQN { "config_2"\n"item_1" } }'),
+        ('empty section', 'ucft\n{\n\tREQN\n\t{\n\t\t"config"\n\t}\n}'),
+        ('empty strings', 'ucft { REQN { ""\n"" } }'),
+        ('tabs and spaces in strings', 'ucft { REQN { "a b"\n\t"c\td" } }'),
+        ('escaped quotes', 'ucft { REQN { "a""b"\n"c\\"d" } }'),
+        ('no whitespace', 'ucft{REQN{"config""item_1""item_2"}}'),
+        ('windows line endings', '\r\nucft\r\n{\r\n\tREQN\r\n\t{\r\n\t\t"config"\r\n\t\t"item_1"\r\n\t}\r\n}'),
+    ])
+    def test_same_as_parser(self, _name, text):
+        path = self.write_req('test.req', text)
+        self.assertListEqual(as_tuples(read_req_file(path)), as_tuples(parse_req_file(path)))
+
+    def test_written_database(self):
+        database = ReqDatabase()
+        with database.open_section('texture') as section:
+            section.extend(['Tex_1', 'tex_2', 'Tex_1'])
+        with database.open_section('model') as section:
+            section.append('model_1')
+        path = self.root / 'test.req'
+        database.write(path)
+        self.assertListEqual(as_tuples(read_req_file(path)),
+                             [('texture', ['tex_1', 'tex_2']), ('model', ['model_1'])])
+
+    @parameterized.expand([
+        ('empty file', ''),
+        ('no document', 'REQN { "config" }'),
+        ('missing brace', 'ucft { REQN { "config" }'),
+        ('missing header', 'ucft { REQN { } }'),
+        ('unterminated string', 'ucft { REQN { "config } }'),
+        ('trailing text', 'ucft { } ucft { }'),
+        ('keyword prefix', 'ucftx { }'),
+    ])
+    def test_invalid(self, _name, text):
+        with self.assertRaises(ValueError):
+            list(iter_req_sections_of_lines(text.splitlines(keepends=True)))
+
+    def test_merge(self):
+        files = [
+            self.write_req('a.req', 'ucft { REQN { "texture" "tex_1" "tex_2" } REQN { "model" "model_1" } }'),
+            self.write_req('b.req', 'ucft { REQN { "texture" "TEX_2" "tex_3" } REQN { "class" "rep_inf" } }'),
+        ]
+        index = merge_req_files(files)
+        self.assertListEqual(list(index), [
+            ('texture', ['tex_1', 'tex_2', 'tex_3']),
+            ('model', ['model_1']),
+            ('class', ['rep_inf']),
+        ])
+        self.assertIn('model', index)
+        self.assertNotIn('config', index)
+        self.assertListEqual(index.get_section('config'), [])
+
+    def test_merge_into_index(self):
+        index = ReqIndex()
+        index.add_section('texture', ['tex_1'])
+        merge_req_files([self.write_req('a.req', 'ucft { REQN { "texture" "Tex_1" "tex_2" } }')], index=index)
+        self.assertListEqual(index.get_section('texture'), ['tex_1', 'tex_2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
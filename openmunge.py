@@ -1,5 +1,15 @@
+import argparse
+import sys
+import time
+from multiprocessing import cpu_count
+
+from jobs.JobHistory import JobHistory, JOB_HISTORY_FILE_NAME
 from jobs.JobRunner import JobRunner
-from jobs.batching import get_work_batches
+from jobs.MungeDaemon import MungeDaemon, DaemonClient
+from jobs.RunReport import RunReport
+from jobs.batching import get_work_jobs, flatten_jobs, shard_jobs
+from jobs.watching import watch_changes, get_changed_jobs
+from mungers.util.FileIndex import FileIndex, FILE_INDEX_FILE_NAME, share_file_index, clear_shared_file_indexes
 from util.arg_parsing import get_base_parser, handle_and_verify_base_config
 from core.config import setup_global_config
 from util.logs import setup_logger
@@ -11,43 +21,170 @@ def main():
     handle_and_verify_base_config(config)
     log = setup_logger('openmunge')
 
-    # Set up work batches
+    # Index project files
+    # Inputs: global args
+    # Effects: the project directory is walked once, and the path, size and modification time of every file in it are
+    #          saved to _BUILD, where every job can find its input files without walking the tree again
+    # Outputs: file index
+    time_index_start = time.time()
+    file_index = FileIndex.scan(config.project_dir, exclude=('_BUILD',))
+    file_index.save(config.project_dir / '_BUILD' / FILE_INDEX_FILE_NAME)
+    share_file_index(file_index)
+    log.info('Indexed {n} project files in {t:.2f}s'.format(n=len(file_index.entries),
+                                                          t=time.time() - time_index_start))
+
+    # Set up work jobs
     # Inputs: global args
     # Effects: from global args we form paths to the relevant munge-able data, and determine order of operations
-    # Outputs: work batches, each batch containing some number of jobs to be executed simultaneously, each batch after
-    #          the other
-    work_batches = get_work_batches()
-    log.info('Created {n} work batches'.format(n=len(work_batches)))
+    # Outputs: work jobs, each job declaring the jobs that must finish before it can start
+    work_jobs = get_work_jobs()
+    log.info('Created {n} work jobs'.format(n=len(work_jobs)))
+
+    # Flatten work jobs
+    # Inputs: work jobs
+    # Effects: batch jobs are replaced by the munge jobs of their batch scripts, so that every munge job draws from the
+    #          same concurrency limit rather than each batch running a job runner of its own
+    # Outputs: munge jobs, plus any batch jobs which have no batch script
+    work_jobs = flatten_jobs(work_jobs)
+    log.info('Flattened into {n} munge jobs'.format(n=len(work_jobs)))
+
+    # Shard work jobs
+    # Inputs: munge jobs, global args
+    # Effects: munge jobs with many input files, each of which is munged separately, are split into shards that can
+    #          run in parallel
+    # Outputs: munge jobs and shards of munge jobs
+    max_shards = min(config.max_concurrent_jobs or cpu_count(), cpu_count())
+    work_jobs = shard_jobs(work_jobs, config.files_per_shard, max_shards)
+    log.info('Sharded into {n} munge jobs'.format(n=len(work_jobs)))
+
+    # Run and report on jobs
+    # Inputs: munge jobs, global args
+    # Effects: see run_jobs
+    # Outputs: failed jobs
+    failed_jobs = run_jobs(config, work_jobs, log)
+
+    # Watch for changes
+    # Inputs: file index, global args
+    # Effects: with --watch, the munge jobs affected by each change to the project files are re-run until interrupted
+    # Outputs: none
+    if config.watch:
+        watch(config, file_index, log)
+    elif failed_jobs:
+        sys.exit(1)
+
+    # Copy results
+    # Inputs: paths to munged outputs
+    # Effects: outputs files are copied to their destinations
+    # Outputs: none
+
+    # Done?
 
+
+def run_jobs(config, work_jobs: list, log) -> dict:
+    """Run munge jobs in a single job runner, writing out a run report. Returns the jobs which did not succeed."""
     # Set up and configure job runner
     # Inputs: args
-    # Effects: settings like max number of concurrent jobs are recorded into a job runner instance
+    # Effects: settings like max number of concurrent jobs and the failure policy, and the durations of jobs in
+    #          previous runs, are recorded into a job runner instance
     # Outputs: a fully configured job runner instance
-    job_runner = JobRunner(max_concurrent=config.max_concurrent_jobs)
-    job_runner.add_batches(work_batches)
+    job_history = JobHistory(config.project_dir / '_BUILD' / JOB_HISTORY_FILE_NAME)
+    job_runner = JobRunner(max_concurrent=config.max_concurrent_jobs, executor=config.job_executor,
+                           history=job_history, daemon_socket=config.daemon_socket, on_failure=config.on_failure,
+                           max_retries=config.max_retries)
+    job_runner.add_jobs(work_jobs)
 
     # Run jobs
-    # Inputs: work batches and job runner
-    # Effects: each work batch is executed in sequence, munged files are output to their respective destinations
+    # Inputs: work jobs and job runner
+    # Effects: each job is started as soon as its dependencies have finished, longest chains of work first, munged
+    #          files are output to their respective destinations
     # Outputs: summary of job statuses and paths to munged outputs
+    time_start = time.time()
     try:
         job_runner.start()
         job_runner.wait()
     finally:
         job_runner.stop()
+    time_finish = time.time()
 
     # Process results
     # Inputs: job status summary, paths to munged outputs
-    # Effects: failed jobs are reported and cause failure if present, expected output files are confirmed to exist
+    # Effects: failed jobs are reported, expected output files are confirmed to exist,
+    #          a run report with per-job timings and resource usage is written out as JSON and as a Chrome trace
     # Outputs: none
+    run_report = RunReport(job_runner.finished_jobs, time_start, time_finish)
+    report_dir = config.cwd / 'logs'
+    run_report.write_json(report_dir / 'run_report.json')
+    run_report.write_chrome_trace(report_dir / 'run_trace.json')
+    summary = run_report.get_summary()
+    log.info('Ran {n} jobs in {wall:.2f}s ({job_time:.2f}s of job time, {cpu_time:.2f}s of CPU time): {statuses}'
+             .format(n=summary['jobs'], wall=summary['wall_time'], job_time=summary['job_time'],
+                     cpu_time=summary['cpu_time'],
+                     statuses=', '.join('{} {}'.format(n, s) for s, n in summary['statuses'].items())))
+    for record in run_report.get_slowest_jobs():
+        log.info('\t{job_id}: {duration:.2f}s'.format(**record))
+    log.info('Run report written to {}'.format(report_dir / 'run_report.json'))
 
-    # Copy results
-    # Inputs: paths to munged outputs
-    # Effects: outputs files are copied to their destinations
-    # Outputs: none
+    failed_jobs = job_runner.failed_jobs
+    if failed_jobs:
+        log.error('{n} of {total} jobs did not succeed:'.format(n=len(failed_jobs), total=summary['jobs']))
+        for job, status in failed_jobs.items():
+            log.error('\t{j_id}: {status}'.format(j_id=job.job_id(), status=status.value))
+    return failed_jobs
 
-    # Done?
+
+def watch(config, file_index: FileIndex, log):
+    """Re-run the munge jobs affected by each change to the project files, until interrupted."""
+    max_shards = min(config.max_concurrent_jobs or cpu_count(), cpu_count())
+    log.info('Watching {} for changes. Press Ctrl+C to stop.'.format(config.project_dir))
+    try:
+        for file_index, changed_files in watch_changes(file_index, config.watch_interval):
+            log.info('{n} project files changed: {files}'.format(n=len(changed_files),
+                                                                  files=', '.join(sorted(changed_files))))
+            file_index.save(config.project_dir / '_BUILD' / FILE_INDEX_FILE_NAME)
+            clear_shared_file_indexes()
+            share_file_index(file_index)
+
+            # Plan the munge from scratch, since changes may have added or removed worlds, sides or world files
+            work_jobs = get_changed_jobs(flatten_jobs(get_work_jobs()), file_index, changed_files)
+            if not work_jobs:
+                log.info('No munge jobs are affected by the changes')
+                continue
+            work_jobs = shard_jobs(work_jobs, config.files_per_shard, max_shards)
+            log.info('Re-running {n} munge jobs: {jobs}'.format(n=len(work_jobs),
+                                                                 jobs=', '.join(job.job_id() for job in work_jobs)))
+            run_jobs(config, work_jobs, log)
+            log.info('Watching {} for changes. Press Ctrl+C to stop.'.format(config.project_dir))
+    except KeyboardInterrupt:
+        log.info('Stopped watching')
+
+
+def serve(args):
+    arg_parser = argparse.ArgumentParser(prog='openmunge serve',
+                                         description='Run a resident munge daemon which keeps warm workers around to '
+                                                     'run munge jobs sent to it with --job-executor daemon.')
+    arg_parser.add_argument('--stop',
+                            action='store_true',
+                            help='Stop the daemon listening on DAEMON_SOCKET instead of starting one.')
+    config = setup_global_config(arg_parser, args=args)
+    log = setup_logger('openmunge')
+
+    if config.stop:
+        if DaemonClient(config.daemon_socket).shutdown_daemon():
+            log.info('Stopped the munge daemon at {}'.format(config.daemon_socket))
+            return
+        log.error('No munge daemon is listening on {}'.format(config.daemon_socket))
+        sys.exit(1)
+
+    num_workers = min(config.max_concurrent_jobs or cpu_count(), cpu_count())
+    try:
+        MungeDaemon(config.daemon_socket, num_workers).serve_forever()
+    except OSError as e:
+        log.error(str(e))
+        sys.exit(1)
 
 
 if __name__ == '__main__':
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        serve(sys.argv[2:])
+    else:
+        main()
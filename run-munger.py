@@ -1,12 +1,51 @@
 import argparse
 import importlib
+import os
+import shutil
 import sys
+import tempfile
 
+from util.constants import JobExecutor
 from util.logs import setup_logger
 
 log = setup_logger('run-munger')
 
 
+def forward_to_daemon(name: str, args: list):
+    """
+    Run the munger in the munge daemon if the daemon executor is configured and a daemon is listening, copying its
+    output to stdout. Returns the munger's exit status, or None if the munger should be run in this process instead.
+    """
+    from core.config import GlobalConfig
+
+    # A throwaway config, so that the global one is still available for the munger to set up as usual
+    config = GlobalConfig()
+    # Jobs are given their executor in the environment (see JobBase.build_env), so unless it or the command line asks
+    # for the daemon, there is no need to set up the config, which reads the config file, or to look for a daemon
+    env_executor = os.environ.get(config.get_option_as_env_var('job_executor'))
+    if env_executor != JobExecutor.DAEMON and not any(arg.startswith('--job-executor') for arg in args):
+        return None
+    config.setup(argparse.ArgumentParser(add_help=False), args=args, only_known=True)
+    if config.job_executor != JobExecutor.DAEMON:
+        return None
+
+    from jobs.MungeDaemon import DaemonClient
+    client = DaemonClient(config.daemon_socket)
+    if not client.ping():
+        log.warning('No munge daemon is listening on {}, running {} locally'.format(config.daemon_socket, name))
+        return None
+
+    log_fd, log_file_path = tempfile.mkstemp(prefix='openmunge-', suffix='.log')
+    os.close(log_fd)
+    try:
+        returncode = client.submit(name, args, os.environ, log_file_path, cwd=os.getcwd()).wait()
+        with open(log_file_path, 'r') as log_file:
+            shutil.copyfileobj(log_file, sys.stdout)
+    finally:
+        os.unlink(log_file_path)
+    return returncode
+
+
 def main():
     arg_parser = argparse.ArgumentParser(add_help=False)
     arg_parser.add_argument('name',
@@ -14,6 +53,9 @@ def main():
                             help='Name of the munger class to load. E.g. to load ConfigMunger call this '
                                  'script with name=config (case-insensitive).')
     meta_args, remaining_args = arg_parser.parse_known_args()
+    returncode = forward_to_daemon(meta_args.name, remaining_args)
+    if returncode is not None:
+        sys.exit(returncode)
     munger_name = '{}Munge'.format(meta_args.name.capitalize())
     munger_module = 'mungers.{}'.format(munger_name)
     mod = importlib.import_module(munger_module)
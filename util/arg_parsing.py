@@ -18,6 +18,42 @@ class PositiveNumberArgumentType:
         return x
 
 
+class ShardArgumentType:
+    """Parses a shard of the form INDEX/COUNT, e.g. 2/4 for the second of four shards, into an (index, count) tuple."""
+    def __init__(self):
+        pass
+
+    def __call__(self, x):
+        if isinstance(x, tuple):
+            return x
+        try:
+            index, count = (int(part) for part in str(x).split('/'))
+        except ValueError:
+            raise argparse.ArgumentTypeError('Must be of the form INDEX/COUNT, e.g. 2/4')
+        if count <= 0 or not 1 <= index <= count:
+            raise argparse.ArgumentTypeError('Must have 1 <= INDEX <= COUNT')
+        return index, count
+
+
+class BoolArgumentType:
+    TRUE_VALUES = ('1', 'true', 'yes', 'on')
+    FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+    def __init__(self):
+        pass
+
+    def __call__(self, x):
+        if isinstance(x, bool):
+            return x
+        x = str(x).strip().lower()
+        if x in BoolArgumentType.TRUE_VALUES:
+            return True
+        if x in BoolArgumentType.FALSE_VALUES:
+            return False
+        raise argparse.ArgumentTypeError('Must be one of {}'.format(', '.join(BoolArgumentType.TRUE_VALUES +
+                                                                             BoolArgumentType.FALSE_VALUES)))
+
+
 def get_base_parser():
     parser = argparse.ArgumentParser(prog='openmunge')
 
@@ -60,6 +96,10 @@ def get_base_parser():
                        help='When specified, munge every World and Side, as well as Common, Load, Shell, Movies, '
                             'Localization, and Sounds. Setting this option will override any values provided to '
                             'the above-mentioned munge options.')
+    group.add_argument('--watch',
+                       action='store_true',
+                       help='When specified, keep watching the project files after munging, and re-run the munge '
+                            'jobs affected by each change until interrupted.')
 
     return parser
 
@@ -1,3 +1,8 @@
+import errno
+import getpass
+import os
+import pathlib
+import tempfile
 from enum import Enum
 
 
@@ -27,9 +32,58 @@ class Language(StrEnum):
         return self.value
 
 
+class JobExecutor(StrEnum):
+    PROCESS = 'process'
+    POOL = 'pool'
+    DAEMON = 'daemon'
+
+    def __str__(self):
+        return self.value
+
+
+OPENMUNGE_VERSION = '0.1.0'
+
+
+class FailurePolicy(StrEnum):
+    CONTINUE = 'continue'
+    SKIP = 'skip'
+    CANCEL = 'cancel'
+    TERMINATE = 'terminate'
+
+    def __str__(self):
+        return self.value
+
+
+class ParserEngine(StrEnum):
+    FAST = 'fast'
+    PYPARSING = 'pyparsing'
+
+    def __str__(self):
+        return self.value
+
+
 MUNGE_ALL = 'EVERYTHING'
 ALL_PLATFORMS = (Platform.PC, Platform.PS2, Platform.XBOX)
 ALL_LANGUAGES = (Language.ENGLISH, Language.FRENCH, Language.GERMAN, Language.ITALIAN, Language.JAPANESE,
                  Language.SPANISH, Language.UK_ENGLISH)
+JOB_EXECUTORS = (JobExecutor.PROCESS, JobExecutor.POOL, JobExecutor.DAEMON)
+FAILURE_POLICIES = (FailurePolicy.CONTINUE, FailurePolicy.SKIP, FailurePolicy.CANCEL, FailurePolicy.TERMINATE)
+PARSER_ENGINES = (ParserEngine.FAST, ParserEngine.PYPARSING)
+
+# Exit status of a munger which failed in a way that may succeed if retried (EX_TEMPFAIL in sysexits.h)
+EXIT_TRANSIENT_FAILURE = 75
+TRANSIENT_ERRNOS = (errno.EAGAIN, errno.EBUSY, errno.EINTR, errno.EMFILE, errno.ENFILE, errno.ENOMEM, errno.ETIMEDOUT)
 
 ENV_VAR_PREFIX = 'MUNGE_'
+
+
+def _get_default_daemon_socket() -> pathlib.Path:
+    # Private to the user, so that nobody else can take over the path of the socket before the daemon binds it
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return pathlib.Path(runtime_dir) / 'openmunge.sock'
+    user_id = os.getuid() if hasattr(os, 'getuid') else getpass.getuser()
+    return pathlib.Path(tempfile.gettempdir()) / 'openmunge-{}'.format(user_id) / 'daemon.sock'
+
+
+DEFAULT_DAEMON_SOCKET = _get_default_daemon_socket()
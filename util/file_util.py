@@ -0,0 +1,25 @@
+import os
+import pathlib
+import threading
+
+TEMP_FILE_SUFFIX = '.tmp'
+
+
+def atomic_write(path: pathlib.Path, data):
+    """
+    Write data (str or bytes) to a file by writing a temporary file next to it first and then replacing the file with
+    it, so that readers never see a truncated file, even if the writer is interrupted. The temporary file is named after
+    the writing process and thread, so concurrent writers of the same file never write to each other's.
+    """
+    path = pathlib.Path(path)
+    tmp_path = path.with_name('.{}.{}.{}{}'.format(path.name, os.getpid(), threading.get_ident(), TEMP_FILE_SUFFIX))
+    try:
+        with open(tmp_path, 'wb' if isinstance(data, (bytes, bytearray)) else 'w') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
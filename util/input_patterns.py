@@ -0,0 +1,67 @@
+"""Matching of the --input-files patterns given to mungers."""
+import functools
+import re
+
+RECURSIVE_PREFIX = '$'
+
+
+def input_pattern_to_regex(pattern: str) -> str:
+    """
+    Translate an input file pattern into a regex matching paths relative to the source directory, with / as their
+    separator. * matches any run of characters and ? any single character, neither of them crossing a directory. A
+    pattern is anchored to the source directory unless it starts with $, in which case it may match in any of its
+    subdirectories too, e.g. $Effects/*.msh matches both Effects/a.msh and MSHs/Effects/b.msh.
+    """
+    recursive = pattern.startswith(RECURSIVE_PREFIX)
+    if recursive:
+        pattern = pattern[len(RECURSIVE_PREFIX):]
+    pattern = pattern.replace('\\', '/').lstrip('/')
+    while pattern.startswith('./'):
+        pattern = pattern[2:]
+
+    regex = []
+    for char in pattern:
+        if char == '*':
+            regex.append('[^/]*')
+        elif char == '?':
+            regex.append('[^/]')
+        else:
+            regex.append(re.escape(char))
+    if recursive:
+        regex.insert(0, '(?:[^/]+/)*')
+    return ''.join(regex)
+
+
+@functools.lru_cache(maxsize=None)
+def get_input_pattern_endings(patterns: tuple):
+    """
+    Get the lowercase literal text that every path matched by one of the patterns must end with, e.g. '.odf' for
+    '$*.odf', as a tuple to be passed to str.endswith(). This is a cheap way to rule out most paths before using the
+    regex. Returns None if any of the patterns ends with a wildcard.
+    """
+    endings = []
+    for pattern in patterns:
+        if pattern.startswith(RECURSIVE_PREFIX):
+            pattern = pattern[len(RECURSIVE_PREFIX):]
+        ending = re.split(r'[*?/]', pattern.replace('\\', '/'))[-1]
+        if not ending:
+            return None
+        endings.append(ending.lower())
+    return tuple(endings)
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_input_patterns(patterns: tuple) -> re.Pattern:
+    return re.compile('|'.join('(?:{})'.format(input_pattern_to_regex(pattern)) for pattern in patterns),
+                      re.IGNORECASE)
+
+
+def compile_input_patterns(patterns) -> re.Pattern:
+    """
+    Compile a set of input file patterns into a single case-insensitive regex, so that each file is checked against
+    all of them at once. Use fullmatch() on the path of a file relative to the source directory.
+    """
+    patterns = tuple(patterns)
+    if not patterns:
+        return re.compile(r'(?!)')  # Matches nothing
+    return _compile_input_patterns(patterns)
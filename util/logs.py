@@ -8,10 +8,14 @@ def setup_logger(name: str, file=None, level='INFO'):
     date_fmt = '%Y-%m-%d %H:%M:%S'
     formatter = logging.Formatter('%(asctime)s\t%(name)-16s\t%(levelname)8s:\t%(message)s', datefmt=date_fmt)
 
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    # Loggers are process-wide, so a long-lived process that sets up the same logger more than once (e.g. a worker
+    # running many munge jobs) must not stack up duplicate console handlers
+    if not any(getattr(handler, 'is_console_handler', False) for handler in logger.handlers):
+        console_handler = logging.StreamHandler()
+        console_handler.is_console_handler = True
+        console_handler.setLevel(level)
+        console_handler.setFormatter(formatter)
+        logger.addHandler(console_handler)
 
     if file is not None:
         file_handler = logging.FileHandler(file)